@@ -2,28 +2,50 @@
 import sys
 
 # local imports
-from src.pipelines import RankingsPipeline, ResultsPipeline
+from src.pipelines import RankingsPipeline, ResultsPipeline, SpiderOrchestrator
 
 # third party imports
 
 
 if __name__ == "__main__":
     # Command line arguments
-    assert len(sys.argv) == 2, "Must specify pipeline ID"
-    pipeline_id = sys.argv[1]
-
-    if pipeline_id == "RESET":
-        pass
-    elif pipeline_id == "RESULTS":
-        pipeline = ResultsPipeline()
-    elif pipeline_id == "RANKINGS":
-        pipeline = RankingsPipeline()
-    elif pipeline_id == "UPCOMING":
-        # pipeline = UpcomingEventPipeline()
-        pass
-    elif pipeline_id == "PREDICT":
-        pass
-    else:
-        raise ValueError(f"Invalid pipeline ID: {pipeline_id}")
-
-    pipeline()
+    assert len(sys.argv) >= 2, "Must specify at least one pipeline ID"
+    pipeline_ids = sys.argv[1:]
+
+    pipelines = []
+    for pipeline_id in pipeline_ids:
+        if pipeline_id == "RESET":
+            pass
+        elif pipeline_id == "RESULTS":
+            pipelines.append(ResultsPipeline())
+        elif pipeline_id == "RANKINGS":
+            pipelines.append(RankingsPipeline())
+        elif pipeline_id == "UPCOMING":
+            # pipelines.append(UpcomingEventPipeline())
+            pass
+        elif pipeline_id == "PREDICT":
+            pass
+        else:
+            raise ValueError(f"Invalid pipeline ID: {pipeline_id}")
+
+    # The spiders of every pipeline are run together, each in its own process
+    orchestrator = SpiderOrchestrator()
+    for pipeline in pipelines:
+        orchestrator.add_jobs(pipeline.get_spider_jobs())
+    results = orchestrator()
+
+    for spider_name, result in results.items():
+        print(
+            f"{spider_name:<32}exit code {result['exitcode']:<4}"
+            f"{result['finish_reason']!s:<24}"
+            f"{result['stats'].get('item_scraped_count', 0):>8} items"
+            f"{result['stats'].get('elapsed_time_seconds', 0.0):>10.1f}s"
+        )
+
+    if any(result["exitcode"] != 0 for result in results.values()):
+        sys.exit(1)
+
+    # Fighters are matched once every spider has stored its results
+    for pipeline in pipelines:
+        if isinstance(pipeline, ResultsPipeline):
+            pipeline.match_fighters()
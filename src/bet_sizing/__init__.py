@@ -0,0 +1 @@
+from .kelly import BatchSimultaneousKelly, SimultaneousKelly
@@ -0,0 +1,194 @@
+# standard library imports
+import argparse
+import os
+import sys
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# third party imports
+import cvxpy as cp
+import numpy as np
+
+# local imports
+from src.bet_sizing.kelly import SimultaneousKelly
+
+PATHS = ["closed form", "newton", "conic", "sub-card conic"]
+
+
+def create_card(
+    n: int, active: int, vig: float, rng: np.random.Generator
+) -> SimultaneousKelly:
+    """
+    Create a card of n bouts where the first active bouts have an edge on one
+    side and the book prices the rest at the true probabilities plus the vig
+    """
+
+    red_probs = rng.uniform(0.2, 0.8, n)
+    edges = rng.choice([-1, 1], n) * rng.uniform(0.06, 0.12, n)
+    edges[active:] = 0
+    implied_probs = np.clip(red_probs + edges, 0.1, 0.9)
+    red_decimal = 1 / (implied_probs * (1 + vig))
+    blue_decimal = 1 / ((1 - implied_probs) * (1 + vig))
+    red_odds = np.where(
+        red_decimal >= 2, (red_decimal - 1) * 100, -100 / (red_decimal - 1)
+    )
+    blue_odds = np.where(
+        blue_decimal >= 2, (blue_decimal - 1) * 100, -100 / (blue_decimal - 1)
+    )
+
+    return SimultaneousKelly(red_probs, 1 - red_probs, red_odds, blue_odds, 1000)
+
+
+def is_fair_book(sized_kelly: SimultaneousKelly) -> bool:
+    """
+    Whether any bout is priced without a vig, where the optimal fractions are
+    not unique (e.g. betting both sides of the bout only moves cash around)
+    and solvers can disagree on fractions with the same growth
+    """
+
+    red_decimal = sized_kelly.convert_american_to_decimal(sized_kelly.red_odds)
+    blue_decimal = sized_kelly.convert_american_to_decimal(sized_kelly.blue_odds)
+
+    return bool(np.any(1 / red_decimal + 1 / blue_decimal <= 1 + 1e-9))
+
+
+def get_path(sized_kelly: SimultaneousKelly, active: int) -> str:
+    """
+    Name the path calculate_optimal_wagers takes for a card with the first
+    active bouts worth betting
+    """
+
+    if active == 1:
+        return "closed form"
+    if active == 2 and sized_kelly.solve_newton(np.arange(2)) is not None:
+        return "newton"
+    if active == sized_kelly.n:
+        return "conic"
+
+    return "sub-card conic"
+
+
+def solve_reference(sized_kelly: SimultaneousKelly, tol: float) -> Optional[np.ndarray]:
+    """
+    Solve the full card with the conic solver at tightened tolerances, getting
+    None where the solver fails
+    """
+
+    R = sized_kelly.create_returns_matrix()
+    p = sized_kelly.create_probabilities_vector()
+    b = cp.Variable(2 * sized_kelly.n + 1)
+
+    objective = cp.Maximize(p @ cp.log(R @ b))
+    constraints = [
+        b[-1] >= 0,
+        b[:-1] >= sized_kelly.lower_bounds,
+        b[:-1] <= sized_kelly.upper_bounds,
+        cp.sum(b) == 1,
+    ]
+    problem = cp.Problem(objective, constraints)
+    try:
+        problem.solve(
+            solver=cp.CLARABEL,
+            tol_gap_abs=tol,
+            tol_gap_rel=tol,
+            tol_feas=tol,
+            max_iter=500,
+        )
+    except cp.error.SolverError:
+        return None
+
+    return b.value
+
+
+def compare(
+    sized_kelly: SimultaneousKelly, tol: float
+) -> Optional[Tuple[float, float]]:
+    """
+    Compare the fractions from calculate_optimal_wagers against the reference
+    solve, returning the largest absolute difference in fractions and the
+    expected log growth the reference gets over them
+    """
+
+    reference = solve_reference(sized_kelly, tol)
+    if reference is None:
+        return None
+    fractions = sized_kelly.calculate_optimal_wagers()
+
+    R = sized_kelly.create_returns_matrix()
+    p = sized_kelly.create_probabilities_vector()[0]
+    tiny = np.finfo(float).tiny
+    reference_growth = p @ np.log(np.maximum(R @ reference, tiny))
+    growth = p @ np.log(np.maximum(R @ fractions, tiny))
+
+    return (
+        float(np.max(np.abs(reference - fractions))),
+        float(reference_growth - growth),
+    )
+
+
+def check(
+    n: int, cards: int, vig: float, tol: float, seed: int
+) -> Tuple[Dict[str, Dict[str, float]], int]:
+    """
+    Compare every path of calculate_optimal_wagers against the reference on
+    random n-bout cards with every number of bouts worth betting, also getting
+    the number of fair-book cards skipped. The conic paths run the solver at
+    its default tolerances, so they only match the reference to about 1e-5
+    """
+
+    rng = np.random.default_rng(seed)
+    differences: Dict[str, List[Tuple[float, float]]] = {path: [] for path in PATHS}
+    failures = {path: 0 for path in PATHS}
+    skipped = 0
+    for active in range(1, n + 1):
+        for _ in range(cards):
+            sized_kelly = create_card(n, active, vig, rng)
+            if is_fair_book(sized_kelly):
+                skipped += 1
+                continue
+
+            path = get_path(sized_kelly, active)
+            result = compare(sized_kelly, tol)
+            if result is None:
+                failures[path] += 1
+            else:
+                differences[path].append(result)
+
+    results = {}
+    for path in PATHS:
+        fractions = [fractions for fractions, _ in differences[path]]
+        growths = [growth for _, growth in differences[path]]
+        results[path] = {
+            "cards": len(differences[path]),
+            "failures": failures[path],
+            "max_difference": max(fractions, default=np.nan),
+            "max_growth_gap": max(growths, default=np.nan),
+        }
+
+    return results, skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check the fractions of every Kelly solve path against the "
+        "conic solver at tightened tolerances"
+    )
+    parser.add_argument("--bouts", type=int, default=5)
+    parser.add_argument("--cards", type=int, default=20)
+    parser.add_argument("--vig", type=float, default=0.04)
+    parser.add_argument("--tol", type=float, default=1e-12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Solutions the solver flags as inaccurate still count as solved
+    warnings.simplefilter("ignore", UserWarning)
+    results, skipped = check(args.bouts, args.cards, args.vig, args.tol, args.seed)
+    print(f"{'path':<16}{'cards':>7}{'failed':>8}{'difference':>12}{'growth gap':>12}")
+    for path, result in results.items():
+        print(
+            f"{path:<16}{result['cards']:>7}{result['failures']:>8}"
+            f"{result['max_difference']:>12.1e}{result['max_growth_gap']:>12.1e}"
+        )
+    print(f"{skipped} fair-book cards skipped")
@@ -0,0 +1,126 @@
+# standard library imports
+import argparse
+import os
+import sys
+import time
+import warnings
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# third party imports
+import cvxpy as cp
+import numpy as np
+
+# local imports
+from src.bet_sizing import kelly
+from src.bet_sizing.kelly import SimultaneousKelly
+
+
+def create_cards(n: int, cards: int, seed: int) -> List[SimultaneousKelly]:
+    """
+    Create cards of n bouts with random probabilities and odds with a vig,
+    each bout with an edge on one side like the bouts the solver is given
+    """
+
+    rng = np.random.default_rng(seed)
+    kellys = []
+    for _ in range(cards):
+        red_probs = rng.uniform(0.2, 0.8, n)
+        edges = rng.choice([-1, 1], n) * rng.uniform(0.06, 0.12, n)
+        implied_probs = np.clip(red_probs + edges, 0.1, 0.9)
+        red_decimal = 1 / (implied_probs * 1.04)
+        blue_decimal = 1 / ((1 - implied_probs) * 1.04)
+        red_odds = np.where(
+            red_decimal >= 2, (red_decimal - 1) * 100, -100 / (red_decimal - 1)
+        )
+        blue_odds = np.where(
+            blue_decimal >= 2, (blue_decimal - 1) * 100, -100 / (blue_decimal - 1)
+        )
+        kellys.append(
+            SimultaneousKelly(red_probs, 1 - red_probs, red_odds, blue_odds, 1000)
+        )
+
+    return kellys
+
+
+def time_solves(
+    kellys: List[SimultaneousKelly], max_cached_bouts: int
+) -> Dict[str, List[Optional[float]]]:
+    """
+    Time the conic solve of every card, with cards up to max_cached_bouts
+    solved through the cached problem, getting None where the solver fails
+    """
+
+    kelly.MAX_CACHED_BOUTS = max_cached_bouts
+    seconds, fractions = [], []
+    for sized_kelly in kellys:
+        start = time.perf_counter()
+        try:
+            fractions.append(sized_kelly.solve_conic())
+            seconds.append(time.perf_counter() - start)
+        except cp.error.SolverError:
+            fractions.append(None)
+            seconds.append(None)
+
+    return {"seconds": seconds, "fractions": fractions}
+
+
+def benchmark(n: int, cards: int, seed: int) -> Dict[str, float]:
+    """
+    Time conic solves of n-bout cards with a problem built for every solve
+    (cold) and through the problem cached for the card size, which is
+    compiled on another card first as it would be by an earlier solve
+    """
+
+    kellys = create_cards(n, cards, seed)
+    max_cached_bouts = kelly.MAX_CACHED_BOUTS
+
+    cold = time_solves(kellys, 0)
+    kelly._PROBLEM_CACHE.clear()
+    time_solves(create_cards(n, 1, seed + 1), n)
+    cached = time_solves(kellys, n)
+    kelly._PROBLEM_CACHE.clear()
+    kelly.MAX_CACHED_BOUTS = max_cached_bouts
+
+    differences = [
+        np.max(np.abs(cold_fractions - cached_fractions))
+        for cold_fractions, cached_fractions in zip(
+            cold["fractions"], cached["fractions"]
+        )
+        if cold_fractions is not None and cached_fractions is not None
+    ]
+
+    results = {"max_difference": max(differences, default=np.nan)}
+    for name, timings in [("cold", cold), ("cached", cached)]:
+        seconds = [s for s in timings["seconds"] if s is not None]
+        results[f"{name}_seconds"] = np.median(seconds) if seconds else np.nan
+        results[f"{name}_failures"] = len(timings["seconds"]) - len(seconds)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark conic Kelly solves with and without the cached "
+        "problem per card size"
+    )
+    parser.add_argument("--bouts", type=int, nargs="+", default=list(range(4, 15)))
+    parser.add_argument("--cards", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Solutions the solver flags as inaccurate still count as solved
+    warnings.simplefilter("ignore", UserWarning)
+    print(
+        f"{'bouts':<7}{'cold':>10}{'failed':>8}{'cached':>10}{'failed':>8}"
+        f"{'speedup':>9}{'difference':>12}"
+    )
+    for n in args.bouts:
+        result = benchmark(n, args.cards, args.seed)
+        print(
+            f"{n:<7}{result['cold_seconds']:>9.3f}s{result['cold_failures']:>8}"
+            f"{result['cached_seconds']:>9.3f}s{result['cached_failures']:>8}"
+            f"{result['cold_seconds'] / result['cached_seconds']:>8.2f}x"
+            f"{result['max_difference']:>12.1e}"
+        )
@@ -1,6 +1,6 @@
 # standard library imports
-import itertools
-from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 # third party imports
 import cvxpy as cp
@@ -8,6 +8,51 @@ import numpy as np
 
 # local imports
 
+# Compiled problems for exhaustively enumerated cards, keyed by number of bouts,
+# reused across instances so re-solves with moved odds skip canonicalization
+_PROBLEM_CACHE: Dict[int, Tuple[cp.Problem, Dict[str, cp.Parameter], cp.Variable]] = {}
+
+# Past 11 bouts the solver dominates and the cached problem solves slower and
+# fails more often than one built directly over the fractions (see
+# benchmark.py), so larger cards are not cached
+MAX_CACHED_BOUTS = 11
+
+
+def build_problem(
+    variations: np.ndarray,
+) -> Tuple[cp.Problem, Dict[str, cp.Parameter], cp.Variable]:
+    """
+    Build the log-growth problem over the given outcome scenarios with the
+    inverse decimal odds, scenario probabilities and payout bounds as (DPP
+    compliant) parameters. The decision variable holds the gross payout of
+    each side followed by the risk free fraction, which keeps every parameter
+    out of the scenario matrix
+    """
+
+    num_scenarios, n = variations.shape
+    params = {
+        "inverse_odds": cp.Parameter(2 * n, nonneg=True),
+        "probs": cp.Parameter(num_scenarios, nonneg=True),
+        "lower_bounds": cp.Parameter(2 * n, nonneg=True),
+        "upper_bounds": cp.Parameter(2 * n, nonneg=True),
+    }
+    payouts = cp.Variable(2 * n + 1)
+
+    wins = np.zeros(shape=(num_scenarios, 2 * n + 1))
+    wins[:, :-1:2] = variations
+    wins[:, 1:-1:2] = 1 - variations
+    wins[:, -1] = 1
+
+    objective = cp.Maximize(params["probs"] @ cp.log(wins @ payouts))
+    constraints = [
+        payouts[-1] >= 0,
+        payouts[:-1] >= params["lower_bounds"],
+        payouts[:-1] <= params["upper_bounds"],
+        params["inverse_odds"] @ payouts[:-1] + payouts[-1] == 1,
+    ]
+
+    return cp.Problem(objective, constraints), params, payouts
+
 
 class SimultaneousKelly:
     """
@@ -25,22 +70,42 @@ class SimultaneousKelly:
         fraction: float = 0.1,
         min_bet: float = 0.10,
         max_payout: float = 100000,
+        red_max_wagers: Optional[np.ndarray] = None,
+        blue_max_wagers: Optional[np.ndarray] = None,
+        min_bet_mode: str = "round",
+        max_scenarios: int = 2**14,
+        sampling: str = "monte_carlo",
+        seed: Optional[int] = None,
     ):
         """
         Initialize the SimultaneousKelly object
         """
 
-        self.red_probs = red_probs
-        self.blue_probs = blue_probs
-        self.red_odds = red_odds
-        self.blue_odds = blue_odds
+        assert min_bet_mode in ["round", "integer"]
+        assert sampling in ["monte_carlo", "importance"]
+
+        self.red_probs = np.asarray(red_probs, dtype=float)
+        self.blue_probs = np.asarray(blue_probs, dtype=float)
+        self.red_odds = np.asarray(red_odds, dtype=float)
+        self.blue_odds = np.asarray(blue_odds, dtype=float)
         self.current_bankroll = current_bankroll
         self.fraction = fraction  # Default is 1/10
         self.min_bet = min_bet  # DraftKings requires a minimum $0.10 bet
         self.max_payout = max_payout
+        self.red_max_wagers = red_max_wagers  # Per-book wager limits, if any
+        self.blue_max_wagers = blue_max_wagers
+        self.min_bet_mode = min_bet_mode
+        self.max_scenarios = max_scenarios
+        self.sampling = sampling
+        self.seed = seed
 
         self.n = len(red_probs)
-        self.variations = np.array(list(itertools.product([1, 0], repeat=self.n)))
+        # Every outcome combination is enumerated while 2^n fits in the
+        # scenario budget, otherwise a fixed-size sample is drawn instead
+        self.exact = 2**self.n <= self.max_scenarios
+        self.variations, self.scenario_weights = self.create_scenarios()
+        self.upper_bounds = self.create_upper_bounds()
+        self.lower_bounds = np.zeros(2 * self.n)
 
     def convert_american_to_decimal(self, odds: np.ndarray) -> np.ndarray:
         """
@@ -56,6 +121,62 @@ class SimultaneousKelly:
 
         return np.where(odds > 0, odds / 100, -100 / odds)
 
+    def create_scenarios(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Create outcome scenarios (1 if red wins, 0 if blue wins) along with
+        the probability weight of each scenario
+        """
+
+        red_probs, blue_probs = self.red_probs, self.blue_probs
+
+        if self.exact:
+            # Same row order as itertools.product([1, 0], repeat=n)
+            indices = np.arange(2**self.n)[:, None]
+            shifts = np.arange(self.n - 1, -1, -1)
+            variations = 1 - ((indices >> shifts) & 1)
+            weights = np.prod(np.where(variations == 1, red_probs, blue_probs), axis=1)
+
+            return variations, weights
+
+        if self.sampling == "monte_carlo":
+            proposal = red_probs / (red_probs + blue_probs)
+        else:
+            # Defensive mixture with a fair coin so that upsets, which drive
+            # the worst case wealth, are sampled more often than they occur
+            proposal = 0.5 * red_probs / (red_probs + blue_probs) + 0.25
+
+        rng = np.random.default_rng(self.seed)
+        variations = (rng.random((self.max_scenarios, self.n)) < proposal).astype(int)
+        likelihood_ratios = np.where(
+            variations == 1, red_probs / proposal, blue_probs / (1 - proposal)
+        )
+        weights = np.prod(likelihood_ratios, axis=1) / self.max_scenarios
+
+        return variations, weights
+
+    def create_upper_bounds(self) -> np.ndarray:
+        """
+        Create the largest fraction allowed on each side, given DraftKing's
+        payout limits for MMA and any per-book wager limits
+        """
+
+        stake = self.fraction * self.current_bankroll
+        red_props = self.convert_american_to_proportion_gain(self.red_odds)
+        blue_props = self.convert_american_to_proportion_gain(self.blue_odds)
+        props = np.ravel([red_props, blue_props], "F")
+
+        upper_bounds = np.minimum(1, self.max_payout / (stake * props))
+        if self.red_max_wagers is not None:
+            upper_bounds[::2] = np.minimum(
+                upper_bounds[::2], np.asarray(self.red_max_wagers) / stake
+            )
+        if self.blue_max_wagers is not None:
+            upper_bounds[1::2] = np.minimum(
+                upper_bounds[1::2], np.asarray(self.blue_max_wagers) / stake
+            )
+
+        return upper_bounds
+
     def create_returns_matrix(self) -> np.ndarray:
         """
         Create returns matrix R
@@ -66,73 +187,409 @@ class SimultaneousKelly:
 
         returns_matrix = np.zeros(shape=(self.variations.shape[0], 2 * self.n + 1))
         returns_matrix[:, -1] = 1
-        for j in range(self.n):
-            returns_matrix[:, 2 * j] = np.where(
-                self.variations[:, j] == 1, red_odds_decimal[j], 0
-            )
-            returns_matrix[:, 2 * j + 1] = np.where(
-                self.variations[:, j] == 0, blue_odds_decimal[j], 0
-            )
+        returns_matrix[:, :-1:2] = self.variations * red_odds_decimal
+        returns_matrix[:, 1:-1:2] = (1 - self.variations) * blue_odds_decimal
 
         return returns_matrix
 
     def create_probabilities_vector(self) -> np.ndarray:
         """
         Create probabilities vector p, contains probability combinations
-        for all possible overall event outcomes
+        for all possible overall event outcomes (or the importance weights
+        of the sampled outcomes)
         """
 
-        prob_vector = np.ones(shape=(1, self.variations.shape[0]))
-        for j in range(self.n):
-            prob_vector[0, :] = np.where(
-                self.variations[:, j] == 1,
-                prob_vector * self.red_probs[j],
-                prob_vector * self.blue_probs[j],
-            )
+        return self.scenario_weights.reshape(1, -1)
 
-        return prob_vector
+    def solve_conic(self) -> Optional[np.ndarray]:
+        """
+        Calculate optimal fractions with the conic solver, returns None if the
+        bounds leave no feasible fractions
+        """
 
-    def calculate_optimal_wagers(self) -> np.ndarray:
+        if not self.exact or self.n > MAX_CACHED_BOUTS:
+            # Sampled scenario sets differ between instances and large cards
+            # are quicker to solve without parameters, so nothing is reused
+            R = self.create_returns_matrix()
+            p = self.create_probabilities_vector()
+            b = cp.Variable(2 * self.n + 1)
+
+            objective = cp.Maximize(p @ cp.log(R @ b))
+            constraints = [
+                b[-1] >= 0,
+                b[:-1] >= self.lower_bounds,
+                b[:-1] <= self.upper_bounds,
+                cp.sum(b) == 1,
+            ]
+            problem = cp.Problem(objective, constraints)
+            problem.solve(solver=cp.CLARABEL)
+
+            return b.value
+
+        if self.n not in _PROBLEM_CACHE:
+            _PROBLEM_CACHE[self.n] = build_problem(self.variations)
+        problem, params, payouts = _PROBLEM_CACHE[self.n]
+
+        red_odds_decimal = self.convert_american_to_decimal(self.red_odds)
+        blue_odds_decimal = self.convert_american_to_decimal(self.blue_odds)
+        inverse_odds = 1 / np.ravel([red_odds_decimal, blue_odds_decimal], "F")
+
+        params["inverse_odds"].value = inverse_odds
+        params["probs"].value = self.create_probabilities_vector()[0]
+        params["lower_bounds"].value = self.lower_bounds / inverse_odds
+        params["upper_bounds"].value = self.upper_bounds / inverse_odds
+        problem.solve(solver=cp.CLARABEL, warm_start=True)
+        if payouts.value is None:
+            return None
+
+        return np.append(payouts.value[:-1] * inverse_odds, payouts.value[-1])
+
+    def solve_mixed_integer(self) -> np.ndarray:
         """
-        Calculate optimal fractions
+        Calculate optimal fractions with every side either not bet or bet at
+        least the minimum, by branch and bound over conic relaxations
         """
 
+        stake = self.fraction * self.current_bankroll
+        min_fraction = self.min_bet / stake
         R = self.create_returns_matrix()
-        p = self.create_probabilities_vector()
-        b = cp.Variable(2 * self.n + 1)
+        p = self.scenario_weights
+        tiny = np.finfo(float).tiny
 
-        objective = cp.Maximize(p @ cp.log(R @ b))
-        constraints = [
-            b >= 0,
-            cp.sum(b) == 1,
-        ]
-        problem = cp.Problem(objective, constraints)
-        problem.solve(solver=cp.CLARABEL)
+        bounds = (self.lower_bounds, self.upper_bounds)
+        best_growth, best_fractions = -np.inf, None
+        nodes = [bounds]
+        try:
+            while nodes:
+                self.lower_bounds, self.upper_bounds = nodes.pop()
+                if np.any(self.lower_bounds > self.upper_bounds) or (
+                    np.sum(self.lower_bounds) >= 1
+                ):
+                    continue
 
-        return b.value
+                fractions = self.solve_conic()
+                if fractions is None:
+                    continue  # The forced minimums cannot all be met
 
-    def __call__(self) -> Tuple[np.ndarray, np.ndarray]:
+                # The relaxation bounds the growth of every solution in this branch
+                growth = p @ np.log(np.maximum(R @ fractions, tiny))
+                if growth <= best_growth:
+                    continue
+
+                wagers = stake * fractions[:-1]
+                below_min = (wagers >= 0.005) & (wagers < self.min_bet)
+                if not np.any(below_min):
+                    best_growth, best_fractions = growth, fractions
+                    continue
+
+                side = np.argmax(np.where(below_min, wagers, -np.inf))
+                barred, forced = self.upper_bounds.copy(), self.lower_bounds.copy()
+                barred[side], forced[side] = 0, min_fraction
+                nodes.append((self.lower_bounds, barred))
+                nodes.append((forced, self.upper_bounds))
+        finally:
+            self.lower_bounds, self.upper_bounds = bounds
+
+        return best_fractions
+
+    def solve_single_bout(self, bout: int) -> Optional[np.ndarray]:
         """
-        Calculate optimal wager amounts in dollars
+        Closed form fractions for a card with one bout worth betting, returns
+        None if the bout is not one-sided (i.e. the book leaves an arbitrage)
         """
 
-        fractions = self.calculate_optimal_wagers()
-        wagers = self.fraction * self.current_bankroll * fractions[:-1]
+        p, q = self.red_probs[bout], self.blue_probs[bout]
+        red_decimal = self.convert_american_to_decimal(self.red_odds[bout])
+        blue_decimal = self.convert_american_to_decimal(self.blue_odds[bout])
+        if 1 / red_decimal + 1 / blue_decimal < 1:
+            return None
 
-        red_props = self.convert_american_to_proportion_gain(self.red_odds)
-        blue_props = self.convert_american_to_proportion_gain(self.blue_odds)
-        props = np.ravel([red_props, blue_props], "F")
+        # Maximize p log(1 + f (d - 1)) + q log(1 - f) on the side with edge
+        if p * red_decimal > p + q and self.upper_bounds[2 * bout] > 0:
+            side, b, win, lose = 0, red_decimal - 1, p, q
+        else:
+            side, b, win, lose = 1, blue_decimal - 1, q, p
+
+        # Growth is concave in f, so the bounded optimum is the clipped one
+        fractions = np.zeros(2 * self.n + 1)
+        fractions[2 * bout + side] = min(
+            (win * b - lose) / (b * (win + lose)),
+            self.upper_bounds[2 * bout + side],
+        )
+        fractions[-1] = 1 - fractions[2 * bout + side]
+
+        return fractions
+
+    def solve_newton(
+        self, active: np.ndarray, tol: float = 1e-12, max_iter: int = 50
+    ) -> Optional[np.ndarray]:
+        """
+        Fractions for a card with a couple of bouts worth betting, found with
+        Newton's method on the expected log growth over the sides with edge.
+        Returns None if the result is not optimal for the full problem (e.g.
+        hedging the other side pays), leaving it to the conic solver
+        """
 
-        # Ensure we stay within DraftKing's payout limits for MMA
-        while True:
-            potential_payout = np.multiply(wagers, props)
-            if np.max(potential_payout) <= self.max_payout:
+        sub_kelly = SimultaneousKelly(
+            self.red_probs[active],
+            self.blue_probs[active],
+            self.red_odds[active],
+            self.blue_odds[active],
+            self.current_bankroll,
+        )
+        p = sub_kelly.scenario_weights
+        # Net return of each side per unit staked, cash column dropped
+        A = sub_kelly.create_returns_matrix()[:, :-1] - 1
+
+        upper_bounds = self.upper_bounds.reshape(-1, 2)[active].ravel()
+        red_decimal = self.convert_american_to_decimal(self.red_odds[active])
+        red_edge = self.red_probs[active] * red_decimal > (
+            self.red_probs[active] + self.blue_probs[active]
+        )
+        red_side = red_edge & (upper_bounds[::2] > 0)
+        sides = 2 * np.arange(len(active)) + np.where(red_side, 0, 1)
+
+        f = np.zeros(len(sides))
+        for _ in range(max_iter):
+            wealth = 1 + A[:, sides] @ f
+            gradient = A[:, sides].T @ (p / wealth)
+            hessian = -(A[:, sides].T * (p / wealth**2)) @ A[:, sides]
+            step = np.linalg.solve(hessian, -gradient)
+            # Backtrack so that wealth stays positive in every scenario
+            t = 1.0
+            while np.min(1 + A[:, sides] @ (f + t * step)) <= 0:
+                t /= 2
+            f += t * step
+            if np.max(np.abs(t * step)) < tol:
                 break
-            wagers /= 2.0
 
-        wagers_rounded = np.round(wagers, 2)
+        wealth = 1 + A[:, sides] @ f
+        gradient = A.T @ (p / wealth)
+        others = np.delete(np.arange(2 * len(active)), sides)
+        optimal = (
+            np.min(f) >= 0
+            and np.all(f <= upper_bounds[sides])
+            and np.all((gradient[others] <= 1e-9) | (upper_bounds[others] == 0))
+        )
+        if not optimal:
+            return None
+
+        fractions = np.zeros(2 * self.n + 1)
+        fractions[2 * active + sides % 2] = f
+        fractions[-1] = 1 - np.sum(f)
+
+        return fractions
+
+    def calculate_optimal_wagers(self) -> np.ndarray:
+        """
+        Calculate optimal fractions, dispatching small cards to analytic or
+        Newton solutions and only falling back to the conic solver if needed
+        """
+
+        red_probs, blue_probs = self.red_probs, self.blue_probs
+        red_odds_decimal = self.convert_american_to_decimal(self.red_odds)
+        blue_odds_decimal = self.convert_american_to_decimal(self.blue_odds)
+
+        # Outcomes of different bouts are independent, so a bout where neither
+        # side has positive expected value gets no money at the optimum
+        total_probs = red_probs + blue_probs
+        red_edge = red_probs * red_odds_decimal > total_probs
+        blue_edge = blue_probs * blue_odds_decimal > total_probs
+        active = np.flatnonzero(
+            (red_edge & (self.upper_bounds[::2] > 0))
+            | (blue_edge & (self.upper_bounds[1::2] > 0))
+        )
+
+        fractions = None
+        if len(active) == 0:
+            fractions = np.zeros(2 * self.n + 1)
+            fractions[-1] = 1
+        elif len(active) == 1:
+            fractions = self.solve_single_bout(active[0])
+        elif len(active) == 2:
+            fractions = self.solve_newton(active)
+
+        if fractions is not None:
+            return fractions
+
+        if len(active) == self.n:
+            return self.solve_conic()
+
+        sub_kelly = SimultaneousKelly(
+            self.red_probs[active],
+            self.blue_probs[active],
+            self.red_odds[active],
+            self.blue_odds[active],
+            self.current_bankroll,
+            max_scenarios=self.max_scenarios,
+            sampling=self.sampling,
+            seed=self.seed,
+        )
+        sub_kelly.upper_bounds = self.upper_bounds.reshape(-1, 2)[active].ravel()
+        sub_fractions = sub_kelly.solve_conic()
+
+        fractions = np.zeros(2 * self.n + 1)
+        fractions[2 * active] = sub_fractions[:-1:2]
+        fractions[2 * active + 1] = sub_fractions[1:-1:2]
+        fractions[-1] = sub_fractions[-1]
+
+        return fractions
+
+    def approximation_error(self) -> Tuple[float, float]:
+        """
+        Compare the fractions found on the sampled scenarios against the exact
+        solution, returning the largest absolute difference in fractions and
+        the loss in expected log growth. Only feasible for small cards
+        """
+
+        exact_kelly = SimultaneousKelly(
+            self.red_probs,
+            self.blue_probs,
+            self.red_odds,
+            self.blue_odds,
+            self.current_bankroll,
+            fraction=self.fraction,
+            min_bet=self.min_bet,
+            max_payout=self.max_payout,
+            red_max_wagers=self.red_max_wagers,
+            blue_max_wagers=self.blue_max_wagers,
+            max_scenarios=2**self.n,
+        )
+        exact_kelly.upper_bounds = self.upper_bounds
+        exact_fractions = exact_kelly.calculate_optimal_wagers()
+        fractions = self.calculate_optimal_wagers()
+
+        R = exact_kelly.create_returns_matrix()
+        p = exact_kelly.create_probabilities_vector()[0]
+        tiny = np.finfo(float).tiny
+        exact_growth = p @ np.log(np.maximum(R @ exact_fractions, tiny))
+        growth = p @ np.log(np.maximum(R @ fractions, tiny))
+
+        return (
+            float(np.max(np.abs(exact_fractions - fractions))),
+            float(exact_growth - growth),
+        )
+
+    def __call__(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate optimal wager amounts in dollars
+        """
+
+        stake = self.fraction * self.current_bankroll
+        if self.min_bet_mode == "integer":
+            wagers = stake * self.solve_mixed_integer()[:-1]
+        else:
+            wagers = stake * self.calculate_optimal_wagers()[:-1]
+            # Rather than zeroing sides below the minimum after the fact, bar
+            # them and re-solve so the remaining sides are sized accordingly.
+            # The bounds are restored after, so calling again starts afresh
+            upper_bounds = self.upper_bounds
+            try:
+                while np.any((wagers >= 0.005) & (wagers < self.min_bet)):
+                    self.upper_bounds = np.where(
+                        wagers < self.min_bet, 0, self.upper_bounds
+                    )
+                    wagers = stake * self.calculate_optimal_wagers()[:-1]
+            finally:
+                self.upper_bounds = upper_bounds
+
+        # Round down to the cent so that payout and wager limits still hold
+        wagers_rounded = np.floor(wagers * 100 + 1e-6) / 100
         wagers_clipped = np.where(wagers_rounded < self.min_bet, 0, wagers_rounded)
 
         red_wagers, blue_wagers = wagers_clipped[::2], wagers_clipped[1::2]
 
         return red_wagers, blue_wagers
+
+
+def _solve_event(args: Tuple[Any, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solve a single event of a batch, run inside a worker process
+    """
+
+    red_probs, blue_probs, red_odds, blue_odds, bankroll, kwargs = args
+    kelly = SimultaneousKelly(
+        red_probs, blue_probs, red_odds, blue_odds, bankroll, **kwargs
+    )
+
+    return kelly()
+
+
+class BatchSimultaneousKelly:
+    """
+    Simultaneous Kelly bet sizing for a ragged batch of events (e.g. every
+    historical card for a backtest), solved in parallel across processes
+    """
+
+    def __init__(
+        self,
+        red_probs: Sequence[np.ndarray],
+        blue_probs: Sequence[np.ndarray],
+        red_odds: Sequence[np.ndarray],
+        blue_odds: Sequence[np.ndarray],
+        bankrolls: Sequence[float],
+        max_workers: Optional[int] = None,
+        chunksize: int = 16,
+        **kwargs,
+    ):
+        """
+        Initialize the BatchSimultaneousKelly object, the bankroll path holds
+        the bankroll available before each event and any keyword arguments
+        are passed through to SimultaneousKelly
+        """
+
+        assert (
+            len(red_probs)
+            == len(blue_probs)
+            == len(red_odds)
+            == len(blue_odds)
+            == len(bankrolls)
+        )
+
+        self.red_probs = red_probs
+        self.blue_probs = blue_probs
+        self.red_odds = red_odds
+        self.blue_odds = blue_odds
+        self.bankrolls = bankrolls
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        self.kwargs = kwargs
+
+        self.offsets = np.concatenate(
+            [[0], np.cumsum([len(x) for x in red_probs])]
+        ).astype(int)
+
+    def __call__(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate optimal wager amounts in dollars for every event, returned
+        as contiguous arrays of red and blue wagers along with the offsets
+        delimiting each event (event i spans offsets[i]:offsets[i + 1])
+        """
+
+        # Events are handed out sorted by size, so the events of a chunk mostly
+        # share a size and its worker reuses the problem cached for it
+        order = np.argsort(np.diff(self.offsets), kind="stable")
+        tasks = [
+            (
+                np.asarray(self.red_probs[i]),
+                np.asarray(self.blue_probs[i]),
+                np.asarray(self.red_odds[i]),
+                np.asarray(self.blue_odds[i]),
+                self.bankrolls[i],
+                self.kwargs,
+            )
+            for i in order
+        ]
+
+        red_wagers = np.zeros(self.offsets[-1])
+        blue_wagers = np.zeros(self.offsets[-1])
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            results: List[Tuple[np.ndarray, np.ndarray]] = list(
+                executor.map(_solve_event, tasks, chunksize=self.chunksize)
+            )
+
+        for i, (red, blue) in zip(order, results):
+            red_wagers[self.offsets[i] : self.offsets[i + 1]] = red
+            blue_wagers[self.offsets[i] : self.offsets[i + 1]] = blue
+
+        return red_wagers, blue_wagers, self.offsets
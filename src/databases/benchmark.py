@@ -0,0 +1,223 @@
+# standard library imports
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# third party imports
+
+# local imports
+from src.databases import connection
+from src.databases.connection import (
+    connect_read_only,
+    get_connection,
+    retry_on_busy,
+)
+
+DATABASE = "benchmark"
+ROW_PAYLOAD = "x" * 200
+SEED_ROWS = 20000
+
+
+class BenchmarkWriter:
+    """
+    Writes like an item pipeline, staging rows in chunks that are each
+    committed on their own and moving them into the table when done, either
+    through the connection manager or a default sqlite3 connection
+    """
+
+    def __init__(self, writer_id: int, journal: str) -> None:
+        """
+        Initialize BenchmarkWriter class
+        """
+
+        self.writer_id = writer_id
+        if journal == "managed":
+            self.conn = get_connection(DATABASE)
+        else:
+            self.conn = sqlite3.connect(connection.get_database_path(DATABASE))
+        self.lock_errors = 0
+        self.worst_commit_seconds = 0.0
+
+    def write_chunk(self, chunk: int, chunk_size: int) -> None:
+        """
+        Stage a chunk of rows in one transaction
+        """
+
+        start = time.perf_counter()
+        self.conn.executemany(
+            "INSERT INTO ROWS_STAGING VALUES (?, ?, ?);",
+            [(self.writer_id, chunk, ROW_PAYLOAD)] * chunk_size,
+        )
+        self.conn.commit()
+        self.worst_commit_seconds = max(
+            self.worst_commit_seconds, time.perf_counter() - start
+        )
+
+    @retry_on_busy
+    def move_rows(self) -> None:
+        """
+        Move the staged rows into the table, like close_spider does
+        """
+
+        self.conn.execute(
+            "INSERT INTO ROWS SELECT * FROM ROWS_STAGING WHERE WRITER_ID = ?;",
+            (self.writer_id,),
+        )
+        self.conn.commit()
+
+    def __call__(self, chunks: int, chunk_size: int) -> None:
+        """
+        Stage every chunk, retrying chunks that fail on a lock, then move them
+        """
+
+        chunk = 0
+        while chunk < chunks:
+            try:
+                self.write_chunk(chunk, chunk_size)
+                chunk += 1
+            except sqlite3.OperationalError:
+                self.lock_errors += 1
+                self.conn.rollback()
+
+        while True:
+            try:
+                self.move_rows()
+                break
+            except sqlite3.OperationalError:
+                self.lock_errors += 1
+                self.conn.rollback()
+
+
+def run_writer(
+    data_dir: str, writer_id: int, journal: str, chunks: int, chunk_size: int
+) -> Dict[str, float]:
+    """
+    Run one writer in its own process
+    """
+
+    connection.DATA_DIR = data_dir
+    writer = BenchmarkWriter(writer_id, journal)
+    writer(chunks, chunk_size)
+
+    return {
+        "lock_errors": writer.lock_errors,
+        "worst_commit_seconds": writer.worst_commit_seconds,
+    }
+
+
+def run_reader(data_dir: str, journal: str, read_seconds: float, stop, results) -> None:
+    """
+    Read the seeded rows over and over until stopped, holding each read open
+    for read_seconds, like a long query of the app
+    """
+
+    connection.DATA_DIR = data_dir
+    if journal == "managed":
+        conn = connect_read_only(DATABASE)
+    else:
+        conn = sqlite3.connect(connection.get_database_path(DATABASE))
+
+    reads, lock_errors = 0, 0
+    while not stop.is_set():
+        try:
+            cur = conn.execute("SELECT WRITER_ID, CHUNK FROM ROWS_STAGING;")
+            cur.fetchmany(10)
+            time.sleep(read_seconds)
+            cur.fetchall()
+            reads += 1
+        except sqlite3.OperationalError:
+            lock_errors += 1
+    results.put({"reads": reads, "lock_errors": lock_errors})
+
+
+def benchmark(
+    journal: str, writers: int, chunks: int, chunk_size: int, read_seconds: float
+) -> Dict[str, float]:
+    """
+    Run concurrent writer processes against one database while a reader
+    process holds long reads open, in a fresh data directory
+    """
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        conn = sqlite3.connect(os.path.join(data_dir, f"{DATABASE}.db"))
+        conn.execute("CREATE TABLE ROWS_STAGING (WRITER_ID, CHUNK, PAYLOAD);")
+        conn.execute("CREATE TABLE ROWS (WRITER_ID, CHUNK, PAYLOAD);")
+        conn.executemany(
+            "INSERT INTO ROWS_STAGING VALUES (-1, ?, ?);",
+            [(chunk, ROW_PAYLOAD) for chunk in range(SEED_ROWS)],
+        )
+        conn.commit()
+        conn.close()
+
+        ctx = multiprocessing.get_context("spawn")
+        stop = ctx.Event()
+        reader_results = ctx.Queue()
+        reader = ctx.Process(
+            target=run_reader,
+            args=(data_dir, journal, read_seconds, stop, reader_results),
+        )
+        reader.start()
+        time.sleep(1.5)  # The reader holds a read before the writers start
+
+        start = time.perf_counter()
+        with ctx.Pool(writers) as pool:
+            writer_results: List[Dict[str, float]] = pool.starmap(
+                run_writer,
+                [
+                    (data_dir, writer_id, journal, chunks, chunk_size)
+                    for writer_id in range(writers)
+                ],
+            )
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        reads = reader_results.get()
+        reader.join()
+
+    rows = writers * chunks * chunk_size
+
+    return {
+        "elapsed_seconds": elapsed,
+        "rows_per_second": 2 * rows / elapsed,  # Staged, then moved
+        "lock_errors": sum(result["lock_errors"] for result in writer_results),
+        "worst_commit_seconds": max(
+            result["worst_commit_seconds"] for result in writer_results
+        ),
+        "reads": reads["reads"],
+        "read_lock_errors": reads["lock_errors"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark concurrent writers with the default journal and "
+        "with the connection manager"
+    )
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--chunks", type=int, default=60)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--read-seconds", type=float, nargs="+", default=[0, 0.5])
+    args = parser.parse_args()
+
+    print(
+        f"{'read held':<12}{'journal':<10}{'seconds':>10}{'rows/s':>10}"
+        f"{'lock errors':>13}{'worst commit':>14}{'reads':>7}"
+    )
+    for read_seconds in args.read_seconds:
+        for journal in ["default", "managed"]:
+            result = benchmark(
+                journal, args.writers, args.chunks, args.chunk_size, read_seconds
+            )
+            print(
+                f"{read_seconds:<12}{journal:<10}{result['elapsed_seconds']:>10.2f}"
+                f"{result['rows_per_second']:>10,.0f}{result['lock_errors']:>13}"
+                f"{result['worst_commit_seconds'] * 1000:>11.0f} ms"
+                f"{result['reads']:>7}"
+            )
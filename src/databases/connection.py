@@ -0,0 +1,251 @@
+# standard library imports
+import atexit
+import functools
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# third party imports
+
+# local imports
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+
+BUSY_TIMEOUT_SECONDS = 30
+BUSY_RETRIES = 5
+BUSY_RETRY_BACKOFF_SECONDS = 0.5
+
+# Applied to every connection, journal_mode = WAL is only set on writers as it
+# is stored in the database file
+PRAGMAS = {
+    "synchronous": "NORMAL",  # Safe with WAL, only checkpoints are synced
+    "cache_size": -65536,  # In KiB when negative, so 64 MiB of page cache
+    "mmap_size": 268435456,  # Read the first 256 MiB through a memory map
+    "temp_store": "MEMORY",
+}
+
+# Databases attached to the ufc database under their own names, so the
+# matchers and finders join across sources without copying their tables
+SOURCE_DATABASES = ["ufcstats", "fightoddsio", "sherdog", "fightmatrix"]
+
+# Tables the ufc database holds itself, derived from the attached sources
+STORE_TABLES = [
+    "LOCATION_ELEVATIONS",
+    "FIGHTODDSIO_FIGHTER_LINKAGE",
+    "FIGHTODDSIO_FUZZY_HOLDBACK",
+    "FIGHTODDSIO_MATCHER_WATERMARK",
+    "SHERDOG_FIGHTER_LINKAGE",
+    "FIGHTER_IDENTITY",
+    "FIGHTER_IDENTITY_LINKS",
+]
+
+
+class SharedConnection(sqlite3.Connection):
+    """
+    Connection shared by everything in a thread that uses the same database,
+    so the pipelines, matchers and finders of a process open each database
+    once instead of once per class. Each user commits its own work, close()
+    leaves the connection and anything uncommitted on it alone, and the
+    connection is only really closed when the process exits.
+    """
+
+    def close(self) -> None:
+        """
+        Hand the connection back for the next user, which does nothing as
+        other users may still have work on it
+        """
+
+
+connections: Dict[Tuple[int, int, str], SharedConnection] = {}
+
+
+def get_database_path(database: str) -> str:
+    """
+    Get the path of a database in the data directory, e.g. "ufcstats"
+    """
+
+    return os.path.join(DATA_DIR, f"{database}.db")
+
+
+def apply_pragmas(conn: sqlite3.Connection, schema: str = "main") -> None:
+    """
+    Set the per-connection pragmas, which are kept per schema for the
+    databases attached to a connection
+    """
+
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {schema}.{name} = {value};")
+
+
+def get_connection(database: str) -> SharedConnection:
+    """
+    Get the read-write connection to a database for this thread, opening it
+    in WAL mode the first time, so readers and writers in other processes do
+    not block each other
+    """
+
+    key = (os.getpid(), threading.get_ident(), database)
+    conn = connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(
+            get_database_path(database),
+            timeout=BUSY_TIMEOUT_SECONDS,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            factory=SharedConnection,
+        )
+        conn.execute("PRAGMA journal_mode = WAL;")
+        apply_pragmas(conn)
+        connections[key] = conn
+    elif conn.in_transaction:
+        # Left for its owner to commit, rolling it back would lose its work
+        logger.warning(f"Connection to {database} handed out mid-transaction")
+
+    return conn
+
+
+def attach_databases(conn: sqlite3.Connection, databases: Iterable[str]) -> None:
+    """
+    Attach databases of the data directory to a connection under their own
+    names, skipping those already attached. Unqualified table names resolve
+    to the temp schema first, then main, then the attached databases
+    """
+
+    attached = {row[1] for row in conn.execute("PRAGMA database_list;")}
+    for database in databases:
+        if database not in attached:
+            conn.execute(
+                f"ATTACH DATABASE ? AS {database};", (get_database_path(database),)
+            )
+            apply_pragmas(conn, database)
+
+
+def get_store_connection() -> SharedConnection:
+    """
+    Get the connection to the ufc database with every source database
+    attached, so cross-source joins run inside SQLite on the source tables
+    themselves. A transaction writing to several of the databases is only
+    atomic per database in WAL mode, which is why the derived tables are all
+    kept in the ufc database
+    """
+
+    conn = get_connection("ufc")
+    attach_databases(conn, SOURCE_DATABASES)
+
+    return conn
+
+
+def get_copied_tables(conn: sqlite3.Connection) -> List[str]:
+    """
+    Get the tables of main that an attached database also holds, i.e. copies
+    of source tables, which would shadow the attached ones
+    """
+
+    schemas = [row[1] for row in conn.execute("PRAGMA database_list;")]
+    source_tables = set()
+    for schema in schemas:
+        if schema not in ["main", "temp"]:
+            source_tables.update(
+                row[0]
+                for row in conn.execute(
+                    f"SELECT name FROM {schema}.sqlite_schema WHERE type = 'table';"
+                )
+            )
+
+    return [
+        row[0]
+        for row in conn.execute(
+            "SELECT name FROM main.sqlite_schema WHERE type = 'table';"
+        )
+        if row[0] in source_tables and row[0] not in STORE_TABLES
+    ]
+
+
+def connect_read_only(database: str) -> sqlite3.Connection:
+    """
+    Open a read-only connection to a database, e.g. for the app, which can
+    be shared between threads as it never writes
+    """
+
+    conn = sqlite3.connect(
+        f"{pathlib.Path(get_database_path(database)).as_uri()}?mode=ro",
+        uri=True,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        check_same_thread=False,
+    )
+    apply_pragmas(conn)
+
+    return conn
+
+
+def is_busy_error(error: sqlite3.OperationalError) -> bool:
+    """
+    Check whether an error is SQLite giving up on a lock
+    """
+
+    message = str(error).lower()
+
+    return "locked" in message or "busy" in message
+
+
+def retry_on_busy(method: Callable) -> Callable:
+    """
+    Decorator retrying a method of a class holding its connection in
+    self.conn when the database stays locked past the busy timeout, or when
+    WAL refuses to upgrade a stale read to a write, rolling back the failed
+    attempt first so the method runs against a clean transaction. Only an
+    attempt that opened the transaction itself is retried, as rolling back
+    a transaction opened before it would lose another user's work
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        for attempt in range(BUSY_RETRIES):
+            in_transaction = self.conn.in_transaction
+            try:
+                return method(self, *args, **kwargs)
+            except sqlite3.OperationalError as error:
+                if (
+                    not is_busy_error(error)
+                    or in_transaction
+                    or attempt == BUSY_RETRIES - 1
+                ):
+                    raise
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                time.sleep(BUSY_RETRY_BACKOFF_SECONDS * 2**attempt)
+
+    return wrapper
+
+
+@atexit.register
+def close_connections() -> None:
+    """
+    Close the connections opened by this process, checkpointing their WAL
+    """
+
+    for (pid, _, _), conn in list(connections.items()):
+        if pid == os.getpid():
+            sqlite3.Connection.close(conn)
+    connections.clear()
+
+
+if __name__ == "__main__":
+    # Drop the copies of source tables left in the ufc database by runs from
+    # before the sources were attached, and give their space back
+    conn = get_store_connection()
+    copied_tables = get_copied_tables(conn)
+    for table in copied_tables:
+        conn.execute(f"DROP TABLE main.{table};")
+        print(f"Dropped {table}")
+
+    # The watermark holds ROWIDs of the copies, so the matcher starts over
+    if copied_tables:
+        conn.execute("DROP TABLE IF EXISTS main.FIGHTODDSIO_MATCHER_WATERMARK;")
+        conn.commit()
+        conn.execute("VACUUM main;")
@@ -18,6 +18,30 @@ CREATE_UFCSTATS_FIGHTERS_TABLE = """
     );
 """
 
+CREATE_UFCSTATS_FIGHTER_NAME_KEYS_TABLE = """
+    CREATE TABLE IF NOT EXISTS UFCSTATS_FIGHTER_NAME_KEYS (
+        FIGHTER_ID TEXT PRIMARY KEY,
+        FOLDED_NAME TEXT,
+        FOLDED_NICKNAME TEXT,
+        SORTED_TOKENS TEXT,
+        PHONETIC_KEY TEXT,
+        DATE_OF_BIRTH DATE
+    );
+"""
+
+CREATE_UFCSTATS_FIGHTER_NAME_KEYS_INDEXES = """
+    CREATE INDEX IF NOT EXISTS UFCSTATS_NAME_KEYS_NAME_NICKNAME_IDX
+    ON UFCSTATS_FIGHTER_NAME_KEYS (FOLDED_NAME, FOLDED_NICKNAME);
+    CREATE INDEX IF NOT EXISTS UFCSTATS_NAME_KEYS_NAME_DOB_IDX
+    ON UFCSTATS_FIGHTER_NAME_KEYS (FOLDED_NAME, DATE_OF_BIRTH);
+    CREATE INDEX IF NOT EXISTS UFCSTATS_NAME_KEYS_NICKNAME_DOB_IDX
+    ON UFCSTATS_FIGHTER_NAME_KEYS (FOLDED_NICKNAME, DATE_OF_BIRTH);
+    CREATE INDEX IF NOT EXISTS UFCSTATS_NAME_KEYS_PHONETIC_DOB_IDX
+    ON UFCSTATS_FIGHTER_NAME_KEYS (PHONETIC_KEY, DATE_OF_BIRTH);
+    CREATE INDEX IF NOT EXISTS UFCSTATS_NAME_KEYS_SORTED_TOKENS_IDX
+    ON UFCSTATS_FIGHTER_NAME_KEYS (SORTED_TOKENS);
+"""
+
 CREATE_UFCSTATS_BOUTS_OVERALL_TABLE = """
     CREATE TABLE IF NOT EXISTS UFCSTATS_BOUTS_OVERALL (
         BOUT_ID TEXT PRIMARY KEY,
@@ -42,6 +66,19 @@ CREATE_UFCSTATS_BOUTS_OVERALL_TABLE = """
     );
 """
 
+CREATE_UFCSTATS_BOUTS_OVERALL_INDEXES = """
+    CREATE INDEX IF NOT EXISTS UFCSTATS_BOUTS_OVERALL_EVENT_IDX
+    ON UFCSTATS_BOUTS_OVERALL (EVENT_ID);
+    CREATE INDEX IF NOT EXISTS UFCSTATS_BOUTS_OVERALL_DATE_IDX
+    ON UFCSTATS_BOUTS_OVERALL (DATE, EVENT_ID, BOUT_ORDINAL);
+    CREATE INDEX IF NOT EXISTS UFCSTATS_BOUTS_OVERALL_RED_FIGHTER_IDX
+    ON UFCSTATS_BOUTS_OVERALL (RED_FIGHTER_ID, DATE, BLUE_FIGHTER_ID);
+    CREATE INDEX IF NOT EXISTS UFCSTATS_BOUTS_OVERALL_BLUE_FIGHTER_IDX
+    ON UFCSTATS_BOUTS_OVERALL (BLUE_FIGHTER_ID, DATE, RED_FIGHTER_ID);
+    CREATE INDEX IF NOT EXISTS UFCSTATS_BOUTS_OVERALL_LOCATION_IDX
+    ON UFCSTATS_BOUTS_OVERALL (LOCATION);
+"""
+
 CREATE_UFCSTATS_BOUTS_BY_ROUND_TABLE = """
     CREATE TABLE IF NOT EXISTS UFCSTATS_BOUTS_BY_ROUND (
         BOUT_ID TEXT NOT NULL,
@@ -142,6 +179,30 @@ CREATE_FIGHTODDSIO_FIGHTERS_TABLE = """
     );
 """
 
+CREATE_FIGHTODDSIO_FIGHTER_NAME_KEYS_TABLE = """
+    CREATE TABLE IF NOT EXISTS FIGHTODDSIO_FIGHTER_NAME_KEYS (
+        FIGHTER_ID INTEGER PRIMARY KEY,
+        FOLDED_NAME TEXT,
+        FOLDED_NICKNAME TEXT,
+        SORTED_TOKENS TEXT,
+        PHONETIC_KEY TEXT,
+        DATE_OF_BIRTH DATE
+    );
+"""
+
+CREATE_FIGHTODDSIO_FIGHTER_NAME_KEYS_INDEXES = """
+    CREATE INDEX IF NOT EXISTS FIGHTODDSIO_NAME_KEYS_NAME_NICKNAME_IDX
+    ON FIGHTODDSIO_FIGHTER_NAME_KEYS (FOLDED_NAME, FOLDED_NICKNAME);
+    CREATE INDEX IF NOT EXISTS FIGHTODDSIO_NAME_KEYS_NAME_DOB_IDX
+    ON FIGHTODDSIO_FIGHTER_NAME_KEYS (FOLDED_NAME, DATE_OF_BIRTH);
+    CREATE INDEX IF NOT EXISTS FIGHTODDSIO_NAME_KEYS_NICKNAME_DOB_IDX
+    ON FIGHTODDSIO_FIGHTER_NAME_KEYS (FOLDED_NICKNAME, DATE_OF_BIRTH);
+    CREATE INDEX IF NOT EXISTS FIGHTODDSIO_NAME_KEYS_PHONETIC_DOB_IDX
+    ON FIGHTODDSIO_FIGHTER_NAME_KEYS (PHONETIC_KEY, DATE_OF_BIRTH);
+    CREATE INDEX IF NOT EXISTS FIGHTODDSIO_NAME_KEYS_SORTED_TOKENS_IDX
+    ON FIGHTODDSIO_FIGHTER_NAME_KEYS (SORTED_TOKENS);
+"""
+
 CREATE_FIGHTODDSIO_BOUTS_TABLE = """
     CREATE TABLE IF NOT EXISTS FIGHTODDSIO_BOUTS (
         BOUT_SLUG TEXT PRIMARY KEY,
@@ -166,6 +227,17 @@ CREATE_FIGHTODDSIO_BOUTS_TABLE = """
     );
 """
 
+CREATE_FIGHTODDSIO_BOUTS_INDEXES = """
+    CREATE INDEX IF NOT EXISTS FIGHTODDSIO_BOUTS_EVENT_IDX
+    ON FIGHTODDSIO_BOUTS (EVENT_SLUG);
+    CREATE INDEX IF NOT EXISTS FIGHTODDSIO_BOUTS_DATE_IDX
+    ON FIGHTODDSIO_BOUTS (DATE, EVENT_SLUG, BOUT_ORDINAL);
+    CREATE INDEX IF NOT EXISTS FIGHTODDSIO_BOUTS_FIGHTER_1_IDX
+    ON FIGHTODDSIO_BOUTS (FIGHTER_1_ID, DATE, FIGHTER_2_ID);
+    CREATE INDEX IF NOT EXISTS FIGHTODDSIO_BOUTS_FIGHTER_2_IDX
+    ON FIGHTODDSIO_BOUTS (FIGHTER_2_ID, DATE, FIGHTER_1_ID);
+"""
+
 CREATE_FIGHTODDSIO_UPCOMING_TABLE = """
     CREATE TABLE IF NOT EXISTS FIGHTODDSIO_UPCOMING (
         BOUT_SLUG TEXT PRIMARY KEY,
@@ -181,6 +253,21 @@ CREATE_FIGHTODDSIO_UPCOMING_TABLE = """
     );
 """
 
+CREATE_FIGHTODDSIO_BACKFILL_STATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS FIGHTODDSIO_BACKFILL_STATE (
+        STATE_ID INTEGER PRIMARY KEY CHECK (STATE_ID = 1),
+        DATE_LT DATE,
+        END_CURSOR TEXT
+    );
+"""
+
+CREATE_FIGHTODDSIO_BACKFILL_EVENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS FIGHTODDSIO_BACKFILL_EVENTS (
+        EVENT_PK INTEGER PRIMARY KEY,
+        EVENT_SLUG TEXT NOT NULL
+    );
+"""
+
 CREATE_FIGHTODDSIO_FIGHTER_LINKAGE_TABLE = """
     CREATE TABLE IF NOT EXISTS FIGHTODDSIO_FIGHTER_LINKAGE (
         UFCSTATS_FIGHTER_ID TEXT PRIMARY KEY,
@@ -189,6 +276,26 @@ CREATE_FIGHTODDSIO_FIGHTER_LINKAGE_TABLE = """
     );
 """
 
+CREATE_FIGHTODDSIO_FUZZY_HOLDBACK_TABLE = """
+    CREATE TABLE IF NOT EXISTS FIGHTODDSIO_FUZZY_HOLDBACK (
+        UFCSTATS_FIGHTER_ID TEXT NOT NULL,
+        FIGHTODDSIO_FIGHTER_ID INTEGER NOT NULL,
+        SCORE REAL,
+        PRIMARY KEY (UFCSTATS_FIGHTER_ID, FIGHTODDSIO_FIGHTER_ID)
+    );
+"""
+
+CREATE_FIGHTODDSIO_MATCHER_WATERMARK_TABLE = """
+    CREATE TABLE IF NOT EXISTS FIGHTODDSIO_MATCHER_WATERMARK (
+        WATERMARK_ID INTEGER PRIMARY KEY CHECK (WATERMARK_ID = 1),
+        LAST_DATE DATE,
+        LAST_UFCSTATS_BOUT_ROWID INTEGER,
+        LAST_FIGHTODDSIO_BOUT_ROWID INTEGER,
+        LAST_UFCSTATS_FIGHTER_ROWID INTEGER,
+        LAST_FIGHTODDSIO_FIGHTER_ROWID INTEGER
+    );
+"""
+
 
 # All Sherdog tables
 CREATE_SHERDOG_FIGHTERS_TABLE = """
@@ -203,6 +310,30 @@ CREATE_SHERDOG_FIGHTERS_TABLE = """
     );
 """
 
+CREATE_SHERDOG_FIGHTER_NAME_KEYS_TABLE = """
+    CREATE TABLE IF NOT EXISTS SHERDOG_FIGHTER_NAME_KEYS (
+        FIGHTER_ID INTEGER PRIMARY KEY,
+        FOLDED_NAME TEXT,
+        FOLDED_NICKNAME TEXT,
+        SORTED_TOKENS TEXT,
+        PHONETIC_KEY TEXT,
+        DATE_OF_BIRTH DATE
+    );
+"""
+
+CREATE_SHERDOG_FIGHTER_NAME_KEYS_INDEXES = """
+    CREATE INDEX IF NOT EXISTS SHERDOG_NAME_KEYS_NAME_NICKNAME_IDX
+    ON SHERDOG_FIGHTER_NAME_KEYS (FOLDED_NAME, FOLDED_NICKNAME);
+    CREATE INDEX IF NOT EXISTS SHERDOG_NAME_KEYS_NAME_DOB_IDX
+    ON SHERDOG_FIGHTER_NAME_KEYS (FOLDED_NAME, DATE_OF_BIRTH);
+    CREATE INDEX IF NOT EXISTS SHERDOG_NAME_KEYS_NICKNAME_DOB_IDX
+    ON SHERDOG_FIGHTER_NAME_KEYS (FOLDED_NICKNAME, DATE_OF_BIRTH);
+    CREATE INDEX IF NOT EXISTS SHERDOG_NAME_KEYS_PHONETIC_DOB_IDX
+    ON SHERDOG_FIGHTER_NAME_KEYS (PHONETIC_KEY, DATE_OF_BIRTH);
+    CREATE INDEX IF NOT EXISTS SHERDOG_NAME_KEYS_SORTED_TOKENS_IDX
+    ON SHERDOG_FIGHTER_NAME_KEYS (SORTED_TOKENS);
+"""
+
 CREATE_SHERDOG_BOUTS_TABLE = """
     CREATE TABLE IF NOT EXISTS SHERDOG_BOUTS (
         EVENT_ID INTEGER NOT NULL,
@@ -225,6 +356,13 @@ CREATE_SHERDOG_BOUTS_TABLE = """
     );
 """
 
+CREATE_SHERDOG_BOUTS_INDEXES = """
+    CREATE INDEX IF NOT EXISTS SHERDOG_BOUTS_EVENT_IDX
+    ON SHERDOG_BOUTS (EVENT_ID);
+    CREATE INDEX IF NOT EXISTS SHERDOG_BOUTS_DATE_IDX
+    ON SHERDOG_BOUTS (DATE, EVENT_ID, BOUT_ORDINAL);
+"""
+
 CREATE_SHERDOG_BOUT_HISTORY_TABLE = """
     CREATE TABLE IF NOT EXISTS SHERDOG_BOUT_HISTORY (
         FIGHTER_ID INTEGER NOT NULL,
@@ -243,6 +381,11 @@ CREATE_SHERDOG_BOUT_HISTORY_TABLE = """
     );
 """
 
+CREATE_SHERDOG_BOUT_HISTORY_INDEXES = """
+    CREATE INDEX IF NOT EXISTS SHERDOG_BOUT_HISTORY_FIGHTER_IDX
+    ON SHERDOG_BOUT_HISTORY (FIGHTER_ID, FIGHTER_BOUT_ORDINAL);
+"""
+
 CREATE_SHERDOG_FIGHTER_LINKAGE_TABLE = """
     CREATE TABLE IF NOT EXISTS SHERDOG_FIGHTER_LINKAGE (
         UFCSTATS_FIGHTER_ID TEXT PRIMARY KEY,
@@ -292,6 +435,13 @@ CREATE_FIGHTMATRIX_BOUTS_TABLE = """
     )
 """
 
+CREATE_FIGHTMATRIX_BOUTS_INDEXES = """
+    CREATE INDEX IF NOT EXISTS FIGHTMATRIX_BOUTS_EVENT_IDX
+    ON FIGHTMATRIX_BOUTS (EVENT_ID);
+    CREATE INDEX IF NOT EXISTS FIGHTMATRIX_BOUTS_DATE_IDX
+    ON FIGHTMATRIX_BOUTS (DATE, EVENT_ID, BOUT_ORDINAL);
+"""
+
 CREATE_FIGHTMATRIX_RANKINGS_TABLE = """
     CREATE TABLE IF NOT EXISTS FIGHTMATRIX_RANKINGS (
         ISSUE_DATE DATE NOT NULL,
@@ -301,3 +451,34 @@ CREATE_FIGHTMATRIX_RANKINGS_TABLE = """
         POINTS INTEGER
     );
 """
+
+CREATE_FIGHTMATRIX_RANKINGS_INDEXES = """
+    CREATE INDEX IF NOT EXISTS FIGHTMATRIX_RANKINGS_ISSUE_DATE_IDX
+    ON FIGHTMATRIX_RANKINGS (ISSUE_DATE, FIGHTER_ID);
+"""
+
+
+# Cross-source tables
+CREATE_FIGHTER_IDENTITY_TABLE = """
+    CREATE TABLE IF NOT EXISTS FIGHTER_IDENTITY (
+        SOURCE TEXT NOT NULL,
+        SOURCE_FIGHTER_ID TEXT NOT NULL,
+        CANONICAL_ID INTEGER NOT NULL,
+        PRIMARY KEY (SOURCE, SOURCE_FIGHTER_ID)
+    );
+"""
+
+CREATE_FIGHTER_IDENTITY_INDEXES = """
+    CREATE INDEX IF NOT EXISTS FIGHTER_IDENTITY_CANONICAL_IDX
+    ON FIGHTER_IDENTITY (CANONICAL_ID, SOURCE);
+"""
+
+CREATE_FIGHTER_IDENTITY_LINKS_TABLE = """
+    CREATE TABLE IF NOT EXISTS FIGHTER_IDENTITY_LINKS (
+        SOURCE_1 TEXT NOT NULL,
+        FIGHTER_ID_1 TEXT NOT NULL,
+        SOURCE_2 TEXT NOT NULL,
+        FIGHTER_ID_2 TEXT NOT NULL,
+        PRIMARY KEY (SOURCE_1, FIGHTER_ID_1, SOURCE_2)
+    );
+"""
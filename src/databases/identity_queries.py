@@ -0,0 +1,91 @@
+# standard library imports
+
+# third party imports
+
+# local imports
+
+# Pairwise links between sources that are new or changed since the identity
+# table was last resolved, i.e. not in FIGHTER_IDENTITY_LINKS as they are
+UNRESOLVED_LINKS_QUERY = """
+WITH links AS (
+  SELECT 
+    'UFCSTATS' AS SOURCE_1, 
+    CAST(UFCSTATS_FIGHTER_ID AS TEXT) AS FIGHTER_ID_1, 
+    'FIGHTODDSIO' AS SOURCE_2, 
+    CAST(FIGHTODDSIO_FIGHTER_ID AS TEXT) AS FIGHTER_ID_2 
+  FROM 
+    FIGHTODDSIO_FIGHTER_LINKAGE 
+  UNION ALL 
+  SELECT 
+    'UFCSTATS' AS SOURCE_1, 
+    CAST(UFCSTATS_FIGHTER_ID AS TEXT) AS FIGHTER_ID_1, 
+    'SHERDOG' AS SOURCE_2, 
+    CAST(SHERDOG_FIGHTER_ID AS TEXT) AS FIGHTER_ID_2 
+  FROM 
+    SHERDOG_FIGHTER_LINKAGE 
+  UNION ALL 
+  SELECT 
+    'FIGHTMATRIX' AS SOURCE_1, 
+    CAST(FIGHTER_ID AS TEXT) AS FIGHTER_ID_1, 
+    'SHERDOG' AS SOURCE_2, 
+    CAST(SHERDOG_FIGHTER_ID AS TEXT) AS FIGHTER_ID_2 
+  FROM 
+    FIGHTMATRIX_FIGHTERS
+) 
+SELECT 
+  t1.SOURCE_1, 
+  t1.FIGHTER_ID_1, 
+  t1.SOURCE_2, 
+  t1.FIGHTER_ID_2 
+FROM 
+  links AS t1 
+  LEFT JOIN FIGHTER_IDENTITY_LINKS AS t2 ON t1.SOURCE_1 = t2.SOURCE_1 
+  AND t1.FIGHTER_ID_1 = t2.FIGHTER_ID_1 
+  AND t1.SOURCE_2 = t2.SOURCE_2 
+WHERE 
+  t2.FIGHTER_ID_2 IS NULL 
+  OR t1.FIGHTER_ID_2 != t2.FIGHTER_ID_2;
+"""
+
+# Resolved links that have since been deleted or changed, whose components
+# may have to be split
+REMOVED_LINKS_QUERY = """
+WITH links AS (
+  SELECT 
+    'UFCSTATS' AS SOURCE_1, 
+    CAST(UFCSTATS_FIGHTER_ID AS TEXT) AS FIGHTER_ID_1, 
+    'FIGHTODDSIO' AS SOURCE_2, 
+    CAST(FIGHTODDSIO_FIGHTER_ID AS TEXT) AS FIGHTER_ID_2 
+  FROM 
+    FIGHTODDSIO_FIGHTER_LINKAGE 
+  UNION ALL 
+  SELECT 
+    'UFCSTATS' AS SOURCE_1, 
+    CAST(UFCSTATS_FIGHTER_ID AS TEXT) AS FIGHTER_ID_1, 
+    'SHERDOG' AS SOURCE_2, 
+    CAST(SHERDOG_FIGHTER_ID AS TEXT) AS FIGHTER_ID_2 
+  FROM 
+    SHERDOG_FIGHTER_LINKAGE 
+  UNION ALL 
+  SELECT 
+    'FIGHTMATRIX' AS SOURCE_1, 
+    CAST(FIGHTER_ID AS TEXT) AS FIGHTER_ID_1, 
+    'SHERDOG' AS SOURCE_2, 
+    CAST(SHERDOG_FIGHTER_ID AS TEXT) AS FIGHTER_ID_2 
+  FROM 
+    FIGHTMATRIX_FIGHTERS
+) 
+SELECT 
+  t1.SOURCE_1, 
+  t1.FIGHTER_ID_1, 
+  t1.SOURCE_2, 
+  t1.FIGHTER_ID_2 
+FROM 
+  FIGHTER_IDENTITY_LINKS AS t1 
+  LEFT JOIN links AS t2 ON t1.SOURCE_1 = t2.SOURCE_1 
+  AND t1.FIGHTER_ID_1 = t2.FIGHTER_ID_1 
+  AND t1.SOURCE_2 = t2.SOURCE_2 
+  AND t1.FIGHTER_ID_2 = t2.FIGHTER_ID_2 
+WHERE 
+  t2.SOURCE_1 IS NULL;
+"""
@@ -4,67 +4,127 @@
 
 # local imports
 
+# Each name key links a pair only when it is the strongest key either fighter
+# matches on and the pair is one-to-one under it, so weaker keys never link a
+# fighter that a stronger key already linked or found ambiguous
 PRELIMINARY_WIDE_MATCHING_QUERY = """
 WITH cte1 AS (
   SELECT 
     MIN(FIGHTER_ID) AS FIGHTER_ID, 
-    FIGHTER_NAME
+    SORTED_TOKENS
   FROM 
-    UFCSTATS_FIGHTERS 
+    UFCSTATS_FIGHTER_NAME_KEYS 
   GROUP BY 
-    FIGHTER_NAME
+    SORTED_TOKENS
   HAVING 
-    COUNT(FIGHTER_NAME) = 1
+    COUNT(SORTED_TOKENS) = 1
 ), 
 cte2 AS (
   SELECT 
-    MIN(FIGHTER_SLUG) AS FIGHTER_SLUG, 
-    FIGHTER_NAME
+    MIN(FIGHTER_ID) AS FIGHTER_ID, 
+    SORTED_TOKENS
   FROM 
-    FIGHTODDSIO_FIGHTERS 
+    FIGHTODDSIO_FIGHTER_NAME_KEYS 
   GROUP BY 
-    FIGHTER_NAME
+    SORTED_TOKENS
   HAVING 
-    COUNT(FIGHTER_NAME) = 1
-)
-SELECT 
-  t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
-FROM 
-  UFCSTATS_FIGHTERS AS t1 
-  INNER JOIN FIGHTODDSIO_FIGHTERS AS t2 ON (
-    t1.FIGHTER_NAME = t2.FIGHTER_NAME 
-    AND t1.FIGHTER_NICKNAME = t2.FIGHTER_NICKNAME
-  )
-UNION 
-SELECT 
-  t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
-FROM 
-  UFCSTATS_FIGHTERS AS t1 
-  INNER JOIN FIGHTODDSIO_FIGHTERS AS t2 ON (
-    t1.FIGHTER_NAME = t2.FIGHTER_NAME 
-    AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
-  )
-UNION 
-SELECT 
-  t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
-FROM 
-  UFCSTATS_FIGHTERS AS t1 
-  INNER JOIN FIGHTODDSIO_FIGHTERS AS t2 ON (
-    t1.FIGHTER_NICKNAME = t2.FIGHTER_NICKNAME
-    AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
-  )
-UNION 
+    COUNT(SORTED_TOKENS) = 1
+), 
+candidates AS (
+  SELECT 
+    t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
+    t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID, 
+    1 AS KEY_RANK 
+  FROM 
+    UFCSTATS_FIGHTER_NAME_KEYS AS t1 
+    INNER JOIN FIGHTODDSIO_FIGHTER_NAME_KEYS AS t2 ON (
+      t1.FOLDED_NAME = t2.FOLDED_NAME 
+      AND t1.FOLDED_NICKNAME = t2.FOLDED_NICKNAME
+    )
+  UNION ALL 
+  SELECT 
+    t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
+    t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID, 
+    2 AS KEY_RANK 
+  FROM 
+    UFCSTATS_FIGHTER_NAME_KEYS AS t1 
+    INNER JOIN FIGHTODDSIO_FIGHTER_NAME_KEYS AS t2 ON (
+      t1.FOLDED_NAME = t2.FOLDED_NAME 
+      AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
+    )
+  UNION ALL 
+  SELECT 
+    t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
+    t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID, 
+    3 AS KEY_RANK 
+  FROM 
+    UFCSTATS_FIGHTER_NAME_KEYS AS t1 
+    INNER JOIN FIGHTODDSIO_FIGHTER_NAME_KEYS AS t2 ON (
+      t1.FOLDED_NICKNAME = t2.FOLDED_NICKNAME
+      AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
+    )
+  UNION ALL 
+  SELECT 
+    t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
+    t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID, 
+    4 AS KEY_RANK 
+  FROM 
+    UFCSTATS_FIGHTER_NAME_KEYS AS t1 
+    INNER JOIN FIGHTODDSIO_FIGHTER_NAME_KEYS AS t2 ON (
+      t1.PHONETIC_KEY = t2.PHONETIC_KEY
+      AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
+    )
+  UNION ALL 
+  SELECT 
+    t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
+    t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID, 
+    5 AS KEY_RANK 
+  FROM 
+    cte1 AS t1 
+    INNER JOIN cte2 AS t2 ON (
+      t1.SORTED_TOKENS = t2.SORTED_TOKENS
+    )
+), 
+strongest AS (
+  SELECT 
+    UFCSTATS_FIGHTER_ID, 
+    FIGHTODDSIO_FIGHTER_ID, 
+    KEY_RANK, 
+    MIN(KEY_RANK) OVER (PARTITION BY UFCSTATS_FIGHTER_ID) AS UFCSTATS_KEY_RANK, 
+    MIN(KEY_RANK) OVER (PARTITION BY FIGHTODDSIO_FIGHTER_ID) AS FIGHTODDSIO_KEY_RANK 
+  FROM 
+    (
+      SELECT 
+        UFCSTATS_FIGHTER_ID, 
+        FIGHTODDSIO_FIGHTER_ID, 
+        MIN(KEY_RANK) AS KEY_RANK 
+      FROM 
+        candidates 
+      GROUP BY 
+        UFCSTATS_FIGHTER_ID, 
+        FIGHTODDSIO_FIGHTER_ID
+    )
+), 
+one_to_one AS (
+  SELECT 
+    UFCSTATS_FIGHTER_ID, 
+    FIGHTODDSIO_FIGHTER_ID, 
+    COUNT(*) OVER (PARTITION BY UFCSTATS_FIGHTER_ID) AS UFCSTATS_COUNT, 
+    COUNT(*) OVER (PARTITION BY FIGHTODDSIO_FIGHTER_ID) AS FIGHTODDSIO_COUNT 
+  FROM 
+    strongest 
+  WHERE 
+    KEY_RANK = UFCSTATS_KEY_RANK 
+    AND KEY_RANK = FIGHTODDSIO_KEY_RANK
+) 
 SELECT 
-  t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
+  UFCSTATS_FIGHTER_ID, 
+  FIGHTODDSIO_FIGHTER_ID 
 FROM 
-  cte1 AS t1 
-  INNER JOIN cte2 AS t2 ON (
-    t1.FIGHTER_NAME = t2.FIGHTER_NAME
-  );
+  one_to_one 
+WHERE 
+  UFCSTATS_COUNT = 1 
+  AND FIGHTODDSIO_COUNT = 1;
 """
 
 MATCHING_QUERY_UPCOMING_BOUTS = """
@@ -72,59 +132,59 @@ WITH unmatched_ufcstats AS (
   SELECT 
     RED_FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
     DATE, 
-    t3.FIGHTODDSIO_FIGHTER_SLUG AS KNOWN_OPPONENT_SLUG 
+    t3.FIGHTODDSIO_FIGHTER_ID AS KNOWN_OPPONENT_ID 
   FROM 
     UFCSTATS_UPCOMING AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
   WHERE 
-    t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL 
-    AND t3.FIGHTODDSIO_FIGHTER_SLUG IS NOT NULL 
+    t2.FIGHTODDSIO_FIGHTER_ID IS NULL 
+    AND t3.FIGHTODDSIO_FIGHTER_ID IS NOT NULL 
   UNION 
   SELECT 
     BLUE_FIGHTER_ID AS FIGHTER_ID, 
     DATE, 
-    t2.FIGHTODDSIO_FIGHTER_SLUG AS KNOWN_OPPONENT_SLUG 
+    t2.FIGHTODDSIO_FIGHTER_ID AS KNOWN_OPPONENT_ID 
   FROM 
     UFCSTATS_UPCOMING AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
   WHERE 
-    t3.FIGHTODDSIO_FIGHTER_SLUG IS NULL 
-    AND t2.FIGHTODDSIO_FIGHTER_SLUG IS NOT NULL
+    t3.FIGHTODDSIO_FIGHTER_ID IS NULL 
+    AND t2.FIGHTODDSIO_FIGHTER_ID IS NOT NULL
 ), 
 unmatched_fightoddsio AS (
   SELECT 
-    FIGHTER_1_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
+    FIGHTER_1_ID AS FIGHTODDSIO_FIGHTER_ID, 
     DATE, 
-    FIGHTER_2_SLUG AS KNOWN_OPPONENT_SLUG 
+    FIGHTER_2_ID AS KNOWN_OPPONENT_ID 
   FROM 
     FIGHTODDSIO_UPCOMING AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTODDSIO_FIGHTER_SLUG 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTODDSIO_FIGHTER_ID 
   WHERE 
     t2.UFCSTATS_FIGHTER_ID IS NULL 
     AND t3.UFCSTATS_FIGHTER_ID IS NOT NULL 
   UNION 
   SELECT 
-    FIGHTER_2_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
+    FIGHTER_2_ID AS FIGHTODDSIO_FIGHTER_ID, 
     DATE, 
-    FIGHTER_1_SLUG AS KNOWN_OPPONENT_SLUG 
+    FIGHTER_1_ID AS KNOWN_OPPONENT_ID 
   FROM 
     FIGHTODDSIO_UPCOMING AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTODDSIO_FIGHTER_SLUG 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTODDSIO_FIGHTER_ID 
   WHERE 
     t3.UFCSTATS_FIGHTER_ID IS NULL 
     AND t2.UFCSTATS_FIGHTER_ID IS NOT NULL
 ) 
 SELECT 
   UFCSTATS_FIGHTER_ID, 
-  FIGHTODDSIO_FIGHTER_SLUG 
+  FIGHTODDSIO_FIGHTER_ID 
 FROM 
   unmatched_ufcstats AS t1 
-  LEFT JOIN unmatched_fightoddsio AS t2 ON t1.DATE = t2.DATE 
-  AND t1.KNOWN_OPPONENT_SLUG = t2.KNOWN_OPPONENT_SLUG;
+  INNER JOIN unmatched_fightoddsio AS t2 ON t1.DATE = t2.DATE 
+  AND t1.KNOWN_OPPONENT_ID = t2.KNOWN_OPPONENT_ID;
 """
 
 MATCHING_QUERY_COMPLETED_BOUTS_STRICT = """
@@ -153,63 +213,63 @@ unmatched_ufcstats AS (
   SELECT 
     RED_FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
     DATE, 
-    t3.FIGHTODDSIO_FIGHTER_SLUG AS KNOWN_OPPONENT_SLUG 
+    t3.FIGHTODDSIO_FIGHTER_ID AS KNOWN_OPPONENT_ID 
   FROM 
     UFCSTATS_BOUTS_OVERALL AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
     INNER JOIN latest_bout_dates_by_fighter AS t4 ON t1.RED_FIGHTER_ID = t4.FIGHTER_ID 
     AND t1.DATE = t4.latest_date 
   WHERE 
-    t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL 
-    AND t3.FIGHTODDSIO_FIGHTER_SLUG IS NOT NULL 
+    t2.FIGHTODDSIO_FIGHTER_ID IS NULL 
+    AND t3.FIGHTODDSIO_FIGHTER_ID IS NOT NULL 
   UNION 
   SELECT 
     BLUE_FIGHTER_ID AS FIGHTER_ID, 
     DATE, 
-    t2.FIGHTODDSIO_FIGHTER_SLUG AS KNOWN_OPPONENT_SLUG 
+    t2.FIGHTODDSIO_FIGHTER_ID AS KNOWN_OPPONENT_ID 
   FROM 
     UFCSTATS_BOUTS_OVERALL AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
     INNER JOIN latest_bout_dates_by_fighter AS t4 ON t1.BLUE_FIGHTER_ID = t4.FIGHTER_ID 
     AND t1.DATE = t4.latest_date 
   WHERE 
-    t3.FIGHTODDSIO_FIGHTER_SLUG IS NULL 
-    AND t2.FIGHTODDSIO_FIGHTER_SLUG IS NOT NULL
+    t3.FIGHTODDSIO_FIGHTER_ID IS NULL 
+    AND t2.FIGHTODDSIO_FIGHTER_ID IS NOT NULL
 ), 
 unmatched_fightoddsio AS (
   SELECT 
-    FIGHTER_1_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
+    FIGHTER_1_ID AS FIGHTODDSIO_FIGHTER_ID, 
     DATE, 
-    FIGHTER_2_SLUG AS KNOWN_OPPONENT_SLUG 
+    FIGHTER_2_ID AS KNOWN_OPPONENT_ID 
   FROM 
     FIGHTODDSIO_BOUTS AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTODDSIO_FIGHTER_SLUG 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTODDSIO_FIGHTER_ID 
   WHERE 
     t2.UFCSTATS_FIGHTER_ID IS NULL 
     AND t3.UFCSTATS_FIGHTER_ID IS NOT NULL 
   UNION 
   SELECT 
-    FIGHTER_2_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
+    FIGHTER_2_ID AS FIGHTODDSIO_FIGHTER_ID, 
     DATE, 
-    FIGHTER_1_SLUG AS KNOWN_OPPONENT_SLUG 
+    FIGHTER_1_ID AS KNOWN_OPPONENT_ID 
   FROM 
     FIGHTODDSIO_BOUTS AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTODDSIO_FIGHTER_SLUG 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTODDSIO_FIGHTER_ID 
   WHERE 
     t3.UFCSTATS_FIGHTER_ID IS NULL 
     AND t2.UFCSTATS_FIGHTER_ID IS NOT NULL
 ) 
 SELECT 
   UFCSTATS_FIGHTER_ID, 
-  FIGHTODDSIO_FIGHTER_SLUG 
+  FIGHTODDSIO_FIGHTER_ID 
 FROM 
   unmatched_ufcstats AS t1 
-  LEFT JOIN unmatched_fightoddsio AS t2 ON t1.DATE = t2.DATE 
-  AND t1.KNOWN_OPPONENT_SLUG = t2.KNOWN_OPPONENT_SLUG;
+  INNER JOIN unmatched_fightoddsio AS t2 ON t1.DATE = t2.DATE 
+  AND t1.KNOWN_OPPONENT_ID = t2.KNOWN_OPPONENT_ID;
 """
 
 MATCHING_QUERY_COMPLETED_BOUTS_LOOSE = """
@@ -217,59 +277,59 @@ WITH unmatched_ufcstats AS (
   SELECT 
     RED_FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
     DATE, 
-    t3.FIGHTODDSIO_FIGHTER_SLUG AS KNOWN_OPPONENT_SLUG 
+    t3.FIGHTODDSIO_FIGHTER_ID AS KNOWN_OPPONENT_ID 
   FROM 
     UFCSTATS_BOUTS_OVERALL AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
   WHERE 
-    t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL 
-    AND t3.FIGHTODDSIO_FIGHTER_SLUG IS NOT NULL 
+    t2.FIGHTODDSIO_FIGHTER_ID IS NULL 
+    AND t3.FIGHTODDSIO_FIGHTER_ID IS NOT NULL 
   UNION 
   SELECT 
     BLUE_FIGHTER_ID AS FIGHTER_ID, 
     DATE, 
-    t2.FIGHTODDSIO_FIGHTER_SLUG AS KNOWN_OPPONENT_SLUG 
+    t2.FIGHTODDSIO_FIGHTER_ID AS KNOWN_OPPONENT_ID 
   FROM 
     UFCSTATS_BOUTS_OVERALL AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.BLUE_FIGHTER_ID = t3.UFCSTATS_FIGHTER_ID 
   WHERE 
-    t3.FIGHTODDSIO_FIGHTER_SLUG IS NULL 
-    AND t2.FIGHTODDSIO_FIGHTER_SLUG IS NOT NULL
+    t3.FIGHTODDSIO_FIGHTER_ID IS NULL 
+    AND t2.FIGHTODDSIO_FIGHTER_ID IS NOT NULL
 ), 
 unmatched_fightoddsio AS (
   SELECT 
-    FIGHTER_1_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
+    FIGHTER_1_ID AS FIGHTODDSIO_FIGHTER_ID, 
     DATE, 
-    FIGHTER_2_SLUG AS KNOWN_OPPONENT_SLUG 
+    FIGHTER_2_ID AS KNOWN_OPPONENT_ID 
   FROM 
     FIGHTODDSIO_BOUTS AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTODDSIO_FIGHTER_SLUG 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTODDSIO_FIGHTER_ID 
   WHERE 
     t2.UFCSTATS_FIGHTER_ID IS NULL 
     AND t3.UFCSTATS_FIGHTER_ID IS NOT NULL 
   UNION 
   SELECT 
-    FIGHTER_2_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
+    FIGHTER_2_ID AS FIGHTODDSIO_FIGHTER_ID, 
     DATE, 
-    FIGHTER_1_SLUG AS KNOWN_OPPONENT_SLUG 
+    FIGHTER_1_ID AS KNOWN_OPPONENT_ID 
   FROM 
     FIGHTODDSIO_BOUTS AS t1 
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-    LEFT JOIN FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTODDSIO_FIGHTER_SLUG 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTODDSIO_FIGHTER_ID 
   WHERE 
     t3.UFCSTATS_FIGHTER_ID IS NULL 
     AND t2.UFCSTATS_FIGHTER_ID IS NOT NULL
 ) 
 SELECT 
   UFCSTATS_FIGHTER_ID, 
-  FIGHTODDSIO_FIGHTER_SLUG 
+  FIGHTODDSIO_FIGHTER_ID 
 FROM 
   unmatched_ufcstats AS t1 
-  LEFT JOIN unmatched_fightoddsio AS t2 ON t1.DATE = t2.DATE 
-  AND t1.KNOWN_OPPONENT_SLUG = t2.KNOWN_OPPONENT_SLUG;
+  INNER JOIN unmatched_fightoddsio AS t2 ON t1.DATE = t2.DATE 
+  AND t1.KNOWN_OPPONENT_ID = t2.KNOWN_OPPONENT_ID;
 """
 
 CLEAN_UP_QUERY_COMPLETED_BOUTS = """
@@ -278,27 +338,27 @@ WITH unmatched_ufcstats_completed AS (
   	t3.*
   from
   	UFCSTATS_BOUTS_OVERALL AS t1
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID
-    LEFT JOIN UFCSTATS_FIGHTERS AS t3 ON t1.RED_FIGHTER_ID = t3.FIGHTER_ID
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID
+    LEFT JOIN UFCSTATS_FIGHTER_NAME_KEYS AS t3 ON t1.RED_FIGHTER_ID = t3.FIGHTER_ID
   WHERE
-    t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL
+    t2.FIGHTODDSIO_FIGHTER_ID IS NULL
   UNION
   SELECT
   	t3.*
   from
   	UFCSTATS_BOUTS_OVERALL AS t1
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.BLUE_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID
-    LEFT JOIN UFCSTATS_FIGHTERS AS t3 ON t1.BLUE_FIGHTER_ID = t3.FIGHTER_ID
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.BLUE_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID
+    LEFT JOIN UFCSTATS_FIGHTER_NAME_KEYS AS t3 ON t1.BLUE_FIGHTER_ID = t3.FIGHTER_ID
   WHERE
-    t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL
+    t2.FIGHTODDSIO_FIGHTER_ID IS NULL
 ),
 unmatched_fightoddsio_completed AS (
   SELECT
     t3.*
   FROM
     FIGHTODDSIO_BOUTS AS t1
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG
-    LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_1_SLUG = t3.FIGHTER_SLUG
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID
+    LEFT JOIN FIGHTODDSIO_FIGHTER_NAME_KEYS AS t3 ON t1.FIGHTER_1_ID = t3.FIGHTER_ID
   WHERE
     t2.UFCSTATS_FIGHTER_ID IS NULL
   UNION
@@ -306,70 +366,80 @@ unmatched_fightoddsio_completed AS (
     t3.*
   FROM
     FIGHTODDSIO_BOUTS AS t1
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_2_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG
-    LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTER_SLUG
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_2_ID = t2.FIGHTODDSIO_FIGHTER_ID
+    LEFT JOIN FIGHTODDSIO_FIGHTER_NAME_KEYS AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTER_ID
   WHERE
     t2.UFCSTATS_FIGHTER_ID IS NULL
 ),
 cte1 AS (
   SELECT 
     MIN(FIGHTER_ID) AS FIGHTER_ID, 
-    FIGHTER_NAME
+    SORTED_TOKENS
   FROM 
     unmatched_ufcstats_completed 
   GROUP BY 
-    FIGHTER_NAME
+    SORTED_TOKENS
   HAVING 
-    COUNT(FIGHTER_NAME) = 1
+    COUNT(SORTED_TOKENS) = 1
 ), 
 cte2 AS (
   SELECT 
-    MIN(FIGHTER_SLUG) AS FIGHTER_SLUG, 
-    fighter_name 
+    MIN(FIGHTER_ID) AS FIGHTER_ID, 
+    SORTED_TOKENS
   FROM 
     unmatched_fightoddsio_completed 
   GROUP BY 
-    FIGHTER_NAME
+    SORTED_TOKENS
   HAVING 
-    COUNT(FIGHTER_NAME) = 1
+    COUNT(SORTED_TOKENS) = 1
 )
 SELECT 
   t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
+FROM 
+  unmatched_ufcstats_completed AS t1 
+  INNER JOIN unmatched_fightoddsio_completed AS t2 ON (
+    t1.FOLDED_NAME = t2.FOLDED_NAME 
+    AND t1.FOLDED_NICKNAME = t2.FOLDED_NICKNAME
+  )
+UNION 
+SELECT 
+  t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
 FROM 
   unmatched_ufcstats_completed AS t1 
   INNER JOIN unmatched_fightoddsio_completed AS t2 ON (
-    t1.FIGHTER_NAME = t2.FIGHTER_NAME 
-    AND t1.FIGHTER_NICKNAME = t2.FIGHTER_NICKNAME
+    t1.FOLDED_NAME = t2.FOLDED_NAME 
+    AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
   )
 UNION 
 SELECT 
   t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
 FROM 
   unmatched_ufcstats_completed AS t1 
   INNER JOIN unmatched_fightoddsio_completed AS t2 ON (
-    t1.FIGHTER_NAME = t2.FIGHTER_NAME 
+    t1.FOLDED_NICKNAME = t2.FOLDED_NICKNAME
     AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
   )
 UNION 
 SELECT 
   t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
 FROM 
   unmatched_ufcstats_completed AS t1 
   INNER JOIN unmatched_fightoddsio_completed AS t2 ON (
-    t1.FIGHTER_NICKNAME = t2.FIGHTER_NICKNAME
+    t1.PHONETIC_KEY = t2.PHONETIC_KEY
     AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
   )
 UNION 
 SELECT 
   t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
 FROM 
   cte1 AS t1 
   INNER JOIN cte2 AS t2 ON (
-    t1.FIGHTER_NAME = t2.FIGHTER_NAME
+    t1.SORTED_TOKENS = t2.SORTED_TOKENS
   );
 """
 
@@ -379,27 +449,27 @@ WITH unmatched_ufcstats_upcoming AS (
   	t3.*
   from
   	UFCSTATS_UPCOMING AS t1
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID
-    LEFT JOIN UFCSTATS_FIGHTERS AS t3 ON t1.RED_FIGHTER_ID = t3.FIGHTER_ID
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID
+    LEFT JOIN UFCSTATS_FIGHTER_NAME_KEYS AS t3 ON t1.RED_FIGHTER_ID = t3.FIGHTER_ID
   WHERE
-    t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL
+    t2.FIGHTODDSIO_FIGHTER_ID IS NULL
   UNION
   SELECT
   	t3.*
   from
   	UFCSTATS_UPCOMING AS t1
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.BLUE_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID
-    LEFT JOIN UFCSTATS_FIGHTERS AS t3 ON t1.BLUE_FIGHTER_ID = t3.FIGHTER_ID
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.BLUE_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID
+    LEFT JOIN UFCSTATS_FIGHTER_NAME_KEYS AS t3 ON t1.BLUE_FIGHTER_ID = t3.FIGHTER_ID
   WHERE
-    t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL
+    t2.FIGHTODDSIO_FIGHTER_ID IS NULL
 ),
 unmatched_fightoddsio_upcoming AS (
   SELECT
     t3.*
   FROM
     FIGHTODDSIO_UPCOMING AS t1
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG
-    LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_1_SLUG = t3.FIGHTER_SLUG
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID
+    LEFT JOIN FIGHTODDSIO_FIGHTER_NAME_KEYS AS t3 ON t1.FIGHTER_1_ID = t3.FIGHTER_ID
   WHERE
     t2.UFCSTATS_FIGHTER_ID IS NULL
   UNION
@@ -407,113 +477,127 @@ unmatched_fightoddsio_upcoming AS (
     t3.*
   FROM
     FIGHTODDSIO_UPCOMING AS t1
-    LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_2_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG
-    LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTER_SLUG
+    LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_2_ID = t2.FIGHTODDSIO_FIGHTER_ID
+    LEFT JOIN FIGHTODDSIO_FIGHTER_NAME_KEYS AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTER_ID
   WHERE
     t2.UFCSTATS_FIGHTER_ID IS NULL
 ),
 cte1 AS (
   SELECT 
     MIN(FIGHTER_ID) AS FIGHTER_ID, 
-    FIGHTER_NAME
+    SORTED_TOKENS
   FROM 
     unmatched_ufcstats_upcoming 
   GROUP BY 
-    FIGHTER_NAME
+    SORTED_TOKENS
   HAVING 
-    COUNT(FIGHTER_NAME) = 1
+    COUNT(SORTED_TOKENS) = 1
 ), 
 cte2 AS (
   SELECT 
-    MIN(FIGHTER_SLUG) AS FIGHTER_SLUG, 
-    fighter_name 
+    MIN(FIGHTER_ID) AS FIGHTER_ID, 
+    SORTED_TOKENS
   FROM 
     unmatched_fightoddsio_upcoming 
   GROUP BY 
-    FIGHTER_NAME
+    SORTED_TOKENS
   HAVING 
-    COUNT(FIGHTER_NAME) = 1
+    COUNT(SORTED_TOKENS) = 1
 )
 SELECT 
   t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
 FROM 
   unmatched_ufcstats_upcoming AS t1 
   INNER JOIN unmatched_fightoddsio_upcoming AS t2 ON (
-    t1.FIGHTER_NAME = t2.FIGHTER_NAME 
-    AND t1.FIGHTER_NICKNAME = t2.FIGHTER_NICKNAME
+    t1.FOLDED_NAME = t2.FOLDED_NAME 
+    AND t1.FOLDED_NICKNAME = t2.FOLDED_NICKNAME
+  )
+UNION 
+SELECT 
+  t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
+FROM 
+  unmatched_ufcstats_upcoming AS t1 
+  INNER JOIN unmatched_fightoddsio_upcoming AS t2 ON (
+    t1.FOLDED_NAME = t2.FOLDED_NAME 
+    AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
   )
 UNION 
 SELECT 
   t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
 FROM 
   unmatched_ufcstats_upcoming AS t1 
   INNER JOIN unmatched_fightoddsio_upcoming AS t2 ON (
-    t1.FIGHTER_NAME = t2.FIGHTER_NAME 
+    t1.FOLDED_NICKNAME = t2.FOLDED_NICKNAME
     AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
   )
 UNION 
 SELECT 
   t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
 FROM 
   unmatched_ufcstats_upcoming AS t1 
   INNER JOIN unmatched_fightoddsio_upcoming AS t2 ON (
-    t1.FIGHTER_NICKNAME = t2.FIGHTER_NICKNAME
+    t1.PHONETIC_KEY = t2.PHONETIC_KEY
     AND t1.DATE_OF_BIRTH = t2.DATE_OF_BIRTH
   )
 UNION 
 SELECT 
   t1.FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  t2.FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG
+  t2.FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID
 FROM 
   cte1 AS t1 
   INNER JOIN cte2 AS t2 ON (
-    t1.FIGHTER_NAME = t2.FIGHTER_NAME
+    t1.SORTED_TOKENS = t2.SORTED_TOKENS
   );
 """
 
 UNKNOWN_UFCSTATS_UPCOMING_BOUTS = """
 SELECT 
   FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  FIGHTER_NAME 
+  FIGHTER_NAME, 
+  DATE 
 FROM 
   UFCSTATS_UPCOMING AS t1 
-  LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
   LEFT JOIN UFCSTATS_FIGHTERS AS t3 ON t1.RED_FIGHTER_ID = t3.FIGHTER_ID 
 WHERE 
-  t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL 
+  t2.FIGHTODDSIO_FIGHTER_ID IS NULL 
 UNION 
 SELECT 
   FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  FIGHTER_NAME 
+  FIGHTER_NAME, 
+  DATE 
 FROM 
   UFCSTATS_UPCOMING AS t1 
-  LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.BLUE_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.BLUE_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
   LEFT JOIN UFCSTATS_FIGHTERS AS t3 ON t1.BLUE_FIGHTER_ID = t3.FIGHTER_ID 
 WHERE 
-  t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL;
+  t2.FIGHTODDSIO_FIGHTER_ID IS NULL;
 """
 
 UNKNOWN_FIGHTODDSIO_UPCOMING_BOUTS = """
 SELECT 
-  FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
-  FIGHTER_NAME 
+  FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID, 
+  FIGHTER_NAME, 
+  DATE 
 FROM 
   FIGHTODDSIO_UPCOMING AS t1 
-  LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-  LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_1_SLUG = t3.FIGHTER_SLUG 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+  LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_1_ID = t3.FIGHTER_ID 
 WHERE 
   t2.UFCSTATS_FIGHTER_ID IS NULL 
 UNION 
 SELECT 
-  FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
-  FIGHTER_NAME 
+  FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID, 
+  FIGHTER_NAME, 
+  DATE 
 FROM 
   FIGHTODDSIO_UPCOMING AS t1 
-  LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_2_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-  LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTER_SLUG 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_2_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+  LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTER_ID 
 WHERE 
   t2.UFCSTATS_FIGHTER_ID IS NULL;
 """
@@ -521,43 +605,231 @@ WHERE
 UNKNOWN_UFCSTATS_COMPLETED_BOUTS = """
 SELECT 
   FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  FIGHTER_NAME 
+  FIGHTER_NAME, 
+  DATE 
 FROM 
   UFCSTATS_BOUTS_OVERALL AS t1 
-  LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.RED_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
   LEFT JOIN UFCSTATS_FIGHTERS AS t3 ON t1.RED_FIGHTER_ID = t3.FIGHTER_ID 
 WHERE 
-  t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL 
+  t2.FIGHTODDSIO_FIGHTER_ID IS NULL 
 UNION 
 SELECT 
   FIGHTER_ID AS UFCSTATS_FIGHTER_ID, 
-  FIGHTER_NAME 
+  FIGHTER_NAME, 
+  DATE 
 FROM 
   UFCSTATS_BOUTS_OVERALL AS t1 
-  LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.BLUE_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.BLUE_FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
   LEFT JOIN UFCSTATS_FIGHTERS AS t3 ON t1.BLUE_FIGHTER_ID = t3.FIGHTER_ID 
 WHERE 
-  t2.FIGHTODDSIO_FIGHTER_SLUG IS NULL;
+  t2.FIGHTODDSIO_FIGHTER_ID IS NULL;
 """
 
 UNKNOWN_FIGHTODDSIO_COMPLETED_BOUTS = """
 SELECT 
-  FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
-  FIGHTER_NAME 
+  FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID, 
+  FIGHTER_NAME, 
+  DATE 
 FROM 
   FIGHTODDSIO_BOUTS AS t1 
-  LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-  LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_1_SLUG = t3.FIGHTER_SLUG 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_1_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+  LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_1_ID = t3.FIGHTER_ID 
 WHERE 
   t2.UFCSTATS_FIGHTER_ID IS NULL 
 UNION 
 SELECT 
-  FIGHTER_SLUG AS FIGHTODDSIO_FIGHTER_SLUG, 
-  FIGHTER_NAME 
+  FIGHTER_ID AS FIGHTODDSIO_FIGHTER_ID, 
+  FIGHTER_NAME, 
+  DATE 
 FROM 
   FIGHTODDSIO_BOUTS AS t1 
-  LEFT JOIN FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_2_SLUG = t2.FIGHTODDSIO_FIGHTER_SLUG 
-  LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_2_SLUG = t3.FIGHTER_SLUG 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_2_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+  LEFT JOIN FIGHTODDSIO_FIGHTERS AS t3 ON t1.FIGHTER_2_ID = t3.FIGHTER_ID 
 WHERE 
   t2.UFCSTATS_FIGHTER_ID IS NULL;
 """
+
+# Held back fuzzy candidates are kept for review until either fighter is linked
+CLEAN_UP_FUZZY_HOLDBACK = """
+DELETE FROM 
+  FIGHTODDSIO_FUZZY_HOLDBACK 
+WHERE 
+  UFCSTATS_FIGHTER_ID IN (
+    SELECT 
+      UFCSTATS_FIGHTER_ID 
+    FROM 
+      FIGHTODDSIO_FIGHTER_LINKAGE
+  ) 
+  OR FIGHTODDSIO_FIGHTER_ID IN (
+    SELECT 
+      FIGHTODDSIO_FIGHTER_ID 
+    FROM 
+      FIGHTODDSIO_FIGHTER_LINKAGE
+  );
+"""
+
+SELECT_MATCHER_WATERMARK = """
+SELECT 
+  LAST_DATE, 
+  LAST_UFCSTATS_BOUT_ROWID, 
+  LAST_FIGHTODDSIO_BOUT_ROWID, 
+  LAST_UFCSTATS_FIGHTER_ROWID, 
+  LAST_FIGHTODDSIO_FIGHTER_ROWID 
+FROM 
+  FIGHTODDSIO_MATCHER_WATERMARK;
+"""
+
+UPDATE_MATCHER_WATERMARK = """
+INSERT OR REPLACE INTO FIGHTODDSIO_MATCHER_WATERMARK 
+SELECT 
+  1, 
+  MIN(
+    (SELECT MAX(DATE) FROM ufcstats.UFCSTATS_BOUTS_OVERALL), 
+    (SELECT MAX(DATE) FROM fightoddsio.FIGHTODDSIO_BOUTS)
+  ), 
+  (SELECT MAX(ROWID) FROM ufcstats.UFCSTATS_BOUTS_OVERALL), 
+  (SELECT MAX(ROWID) FROM fightoddsio.FIGHTODDSIO_BOUTS), 
+  (SELECT MAX(ROWID) FROM ufcstats.UFCSTATS_FIGHTERS), 
+  (SELECT MAX(ROWID) FROM fightoddsio.FIGHTODDSIO_FIGHTERS);
+"""
+
+# Temporary tables shadowing the attached source ones (unqualified names
+# resolve to the temp schema first) so the completed bout queries only see
+# the bouts stored since the previous run, by ROWID, along with every bout of
+# its last date and after and of the dates the other source stored bouts for
+# since, so cards stored late or in parts are matched against the other
+# source. The filter is a branch of its own so it can search the ROWID and
+# the date index, the other branch only copies the whole table when there is
+# no watermark yet
+CREATE_INCREMENTAL_UFCSTATS_BOUTS = """
+CREATE TEMP TABLE UFCSTATS_BOUTS_OVERALL AS 
+SELECT 
+  * 
+FROM 
+  ufcstats.UFCSTATS_BOUTS_OVERALL 
+WHERE 
+  :last_date IS NULL 
+UNION ALL 
+SELECT 
+  * 
+FROM 
+  ufcstats.UFCSTATS_BOUTS_OVERALL 
+WHERE 
+  ROWID > :last_ufcstats_bout_rowid 
+  OR DATE >= :last_date 
+  OR DATE IN (
+    SELECT 
+      DATE 
+    FROM 
+      fightoddsio.FIGHTODDSIO_BOUTS 
+    WHERE 
+      ROWID > :last_fightoddsio_bout_rowid
+  );
+"""
+
+CREATE_INCREMENTAL_FIGHTODDSIO_BOUTS = """
+CREATE TEMP TABLE FIGHTODDSIO_BOUTS AS 
+SELECT 
+  * 
+FROM 
+  fightoddsio.FIGHTODDSIO_BOUTS 
+WHERE 
+  :last_date IS NULL 
+UNION ALL 
+SELECT 
+  * 
+FROM 
+  fightoddsio.FIGHTODDSIO_BOUTS 
+WHERE 
+  ROWID > :last_fightoddsio_bout_rowid 
+  OR DATE >= :last_date 
+  OR DATE IN (
+    SELECT 
+      DATE 
+    FROM 
+      ufcstats.UFCSTATS_BOUTS_OVERALL 
+    WHERE 
+      ROWID > :last_ufcstats_bout_rowid
+  );
+"""
+
+CREATE_INCREMENTAL_UFCSTATS_FIGHTERS = """
+CREATE TEMP TABLE UFCSTATS_FIGHTERS AS 
+SELECT 
+  t1.* 
+FROM 
+  ufcstats.UFCSTATS_FIGHTERS AS t1 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_ID = t2.UFCSTATS_FIGHTER_ID 
+WHERE 
+  t2.UFCSTATS_FIGHTER_ID IS NULL 
+  AND (
+    t1.ROWID > COALESCE(:last_ufcstats_rowid, 0) 
+    OR t1.FIGHTER_ID IN (
+      SELECT 
+        RED_FIGHTER_ID 
+      FROM 
+        temp.UFCSTATS_BOUTS_OVERALL 
+      UNION 
+      SELECT 
+        BLUE_FIGHTER_ID 
+      FROM 
+        temp.UFCSTATS_BOUTS_OVERALL
+    )
+  );
+"""
+
+CREATE_INCREMENTAL_FIGHTODDSIO_FIGHTERS = """
+CREATE TEMP TABLE FIGHTODDSIO_FIGHTERS AS 
+SELECT 
+  t1.* 
+FROM 
+  fightoddsio.FIGHTODDSIO_FIGHTERS AS t1 
+  LEFT JOIN FIGHTODDSIO_FIGHTER_LINKAGE AS t2 ON t1.FIGHTER_ID = t2.FIGHTODDSIO_FIGHTER_ID 
+WHERE 
+  t2.FIGHTODDSIO_FIGHTER_ID IS NULL 
+  AND (
+    t1.ROWID > COALESCE(:last_fightoddsio_rowid, 0) 
+    OR t1.FIGHTER_ID IN (
+      SELECT 
+        FIGHTER_1_ID 
+      FROM 
+        temp.FIGHTODDSIO_BOUTS 
+      UNION 
+      SELECT 
+        FIGHTER_2_ID 
+      FROM 
+        temp.FIGHTODDSIO_BOUTS
+    )
+  );
+"""
+
+CREATE_INCREMENTAL_UFCSTATS_FIGHTER_NAME_KEYS = """
+CREATE TEMP TABLE UFCSTATS_FIGHTER_NAME_KEYS AS 
+SELECT 
+  * 
+FROM 
+  ufcstats.UFCSTATS_FIGHTER_NAME_KEYS 
+WHERE 
+  FIGHTER_ID IN (
+    SELECT 
+      FIGHTER_ID 
+    FROM 
+      temp.UFCSTATS_FIGHTERS
+  );
+"""
+
+CREATE_INCREMENTAL_FIGHTODDSIO_FIGHTER_NAME_KEYS = """
+CREATE TEMP TABLE FIGHTODDSIO_FIGHTER_NAME_KEYS AS 
+SELECT 
+  * 
+FROM 
+  fightoddsio.FIGHTODDSIO_FIGHTER_NAME_KEYS 
+WHERE 
+  FIGHTER_ID IN (
+    SELECT 
+      FIGHTER_ID 
+    FROM 
+      temp.FIGHTODDSIO_FIGHTERS
+  );
+"""
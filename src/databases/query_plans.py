@@ -0,0 +1,172 @@
+# standard library imports
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# third party imports
+
+# local imports
+from src.databases import (
+    create_statements,
+    elevation_queries,
+    identity_queries,
+    matcher_queries,
+)
+from src.databases.connection import SOURCE_DATABASES, STORE_TABLES
+
+# Tables growing with every event, which the stored queries must only read
+# through an index (a search, or a scan of a covering index)
+LARGE_TABLES = [
+    "UFCSTATS_BOUTS_OVERALL",
+    "UFCSTATS_BOUTS_BY_ROUND",
+    "FIGHTODDSIO_BOUTS",
+    "SHERDOG_BOUTS",
+    "SHERDOG_BOUT_HISTORY",
+    "FIGHTMATRIX_BOUTS",
+    "FIGHTMATRIX_RANKINGS",
+]
+
+# Full scans that are intended, the incremental tables copy the whole table
+# in their :last_date IS NULL branch when the matcher has no watermark yet
+FULL_SCANS_ALLOWED = {
+    "CREATE_INCREMENTAL_UFCSTATS_BOUTS": ["UFCSTATS_BOUTS_OVERALL"],
+    "CREATE_INCREMENTAL_FIGHTODDSIO_BOUTS": ["FIGHTODDSIO_BOUTS"],
+}
+
+
+def get_schema(name: str) -> str:
+    """
+    Get the schema a create statement belongs to in the store connection,
+    the attached database of its source unless the ufc database holds it
+    """
+
+    table = name.removeprefix("CREATE_").rsplit("_", 1)[0]
+    source = table.split("_")[0].lower()
+    if source not in SOURCE_DATABASES or table in STORE_TABLES:
+        return "main"
+
+    return source
+
+
+def create_schema() -> sqlite3.Connection:
+    """
+    Create every table and index in empty in-memory databases attached like
+    the source databases are to the store connection
+    """
+
+    conn = sqlite3.connect(":memory:")
+    for database in SOURCE_DATABASES:
+        conn.execute(f"ATTACH DATABASE ':memory:' AS {database};")
+
+    statements = vars(create_statements)
+    for suffix in ["_TABLE", "_INDEXES"]:
+        for name, statement in statements.items():
+            if name.startswith("CREATE_") and name.endswith(suffix):
+                schema = get_schema(name)
+                conn.executescript(
+                    statement.replace("IF NOT EXISTS ", f"IF NOT EXISTS {schema}.")
+                )
+
+    return conn
+
+
+def get_stored_queries() -> Dict[str, str]:
+    """
+    Get the queries of the query modules by name, the statements creating the
+    incremental tables last and in the order the matcher runs them
+    """
+
+    queries = {}
+    for module in [matcher_queries, elevation_queries, identity_queries]:
+        for name, query in vars(module).items():
+            if name.isupper() and isinstance(query, str):
+                queries[name] = query
+
+    return dict(sorted(queries.items(), key=lambda item: item[0].startswith("CREATE_")))
+
+
+def get_full_scans(conn: sqlite3.Connection, query: str) -> List[str]:
+    """
+    Get the large tables a query loops over row by row, once per loop. These
+    are read from the bytecode rather than the query plan, as the plan names
+    tables by their aliases
+    """
+
+    # Root pages are numbered per database, so they are keyed by its index.
+    # The temporary tables shadowing large ones are small and left out
+    large_tables = {}
+    for index, schema, _ in conn.execute("PRAGMA database_list;").fetchall():
+        if schema == "temp":
+            continue
+        for name, rootpage in conn.execute(
+            f"""
+            SELECT
+              name,
+              rootpage
+            FROM
+              {schema}.sqlite_schema
+            WHERE
+              type = 'table'
+              AND name IN ({', '.join(['?'] * len(LARGE_TABLES))});
+            """,
+            LARGE_TABLES,
+        ):
+            large_tables[(index, rootpage)] = name
+
+    # Parameters are unbound when a query is explained, so they are all NULL.
+    # A scan starts at either end of the table and loops with Next or Prev,
+    # while MIN and MAX read a single row and jump over the Next or Prev
+    program = conn.execute(f"EXPLAIN {query}", defaultdict(lambda: None)).fetchall()
+    cursor_tables = {}
+    scanning_cursors = set()
+    full_scans = []
+    for addr, opcode, p1, p2, p3, *_ in program:
+        if opcode == "OpenRead" and (p3, p2) in large_tables:
+            cursor_tables[p1] = large_tables[(p3, p2)]
+        elif opcode in ["Rewind", "Last"] and p1 in cursor_tables:
+            scanning_cursors.add(p1)
+        elif opcode in ["Next", "Prev"] and p1 in scanning_cursors:
+            scanning_cursors.remove(p1)
+            _, previous_opcode, _, previous_p2, *_ = program[addr - 1]
+            if previous_opcode != "Goto" or previous_p2 <= addr:
+                full_scans.append(cursor_tables[p1])
+
+    return full_scans
+
+
+def check_query_plans() -> Dict[str, List[str]]:
+    """
+    Explain every stored query against the full schema and get the full
+    scans of large tables that are not allowed, by query name
+    """
+
+    conn = create_schema()
+    regressions = {}
+    for name, query in get_stored_queries().items():
+        full_scans = get_full_scans(conn, query)
+        for table in FULL_SCANS_ALLOWED.get(name, []):
+            if table in full_scans:
+                full_scans.remove(table)
+        if full_scans:
+            regressions[name] = full_scans
+
+        # The incremental tables are created for the statements after them
+        if name.startswith("CREATE_INCREMENTAL_"):
+            conn.execute(query, defaultdict(lambda: None))
+    conn.close()
+
+    return regressions
+
+
+if __name__ == "__main__":
+    regressions = check_query_plans()
+    for name, tables in regressions.items():
+        print(f"{name:<48}full scan of {', '.join(tables)}")
+
+    if regressions:
+        sys.exit(1)
+    print(f"{len(get_stored_queries())} stored queries, no full scans of large tables")
@@ -1,7 +1,5 @@
 # standard library imports
 import json
-import os
-import sqlite3
 import time
 from typing import Dict, List, Tuple
 
@@ -11,6 +9,7 @@ import requests
 from geopy.geocoders import Nominatim
 
 # local imports
+from src.databases.connection import get_store_connection
 from src.databases.create_statements import CREATE_LOCATION_ELEVATIONS_TABLE
 from src.databases.elevation_queries import (
     COMPLETED_EVENT_LOCATIONS_QUERY,
@@ -30,10 +29,7 @@ class ElevationFinder:
 
         assert location_type in ["completed", "upcoming"]
         self.location_type = location_type
-        self.conn = sqlite3.connect(
-            os.path.join(os.path.dirname(__file__), "..", "..", "data", "ufc.db"),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_store_connection()
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_LOCATION_ELEVATIONS_TABLE)
 
@@ -1 +1,2 @@
+from .identity import FighterIdentityResolver
 from .matcher import FighterMatcher
@@ -0,0 +1,93 @@
+# standard library imports
+
+# third party imports
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process, utils
+from scipy.optimize import linear_sum_assignment
+
+# local imports
+
+
+class FuzzyNameMatcher:
+    """
+    Class for fuzzy matching the names of fighters that could not be linked
+    by the matching queries. Candidates are only compared within the same
+    block (by default the bout date), and each block is scored in a single
+    vectorized batch rather than name by name.
+    """
+
+    def __init__(self, block_on: str = "DATE", workers: int = -1) -> None:
+        """
+        Initialize FuzzyNameMatcher class
+        """
+
+        self.block_on = block_on
+        self.workers = workers  # -1 uses all available cores
+
+    def score_block(
+        self, ufcstats_names: pd.Series, fightoddsio_names: pd.Series
+    ) -> np.ndarray:
+        """
+        Score every pair of names in a block, with the same scorer and
+        preprocessing as thefuzz's extractOne
+        """
+
+        return process.cdist(
+            ufcstats_names.fillna("").tolist(),
+            fightoddsio_names.fillna("").tolist(),
+            scorer=fuzz.WRatio,
+            processor=utils.default_process,
+            workers=self.workers,
+        )
+
+    def __call__(
+        self, unknown_ufcstats: pd.DataFrame, unknown_fightoddsio: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Link UFC Stats and FightOdds.io fighters one-to-one, solving each
+        block as an assignment problem that maximizes the total similarity,
+        returning the links along with their scores (0 to 100)
+        """
+
+        fightoddsio_blocks = dict(list(unknown_fightoddsio.groupby(self.block_on)))
+
+        matches = []
+        for block, ufcstats_block in unknown_ufcstats.groupby(self.block_on):
+            if block not in fightoddsio_blocks:
+                continue
+            fightoddsio_block = fightoddsio_blocks[block]
+
+            scores = self.score_block(
+                ufcstats_block.FIGHTER_NAME, fightoddsio_block.FIGHTER_NAME
+            )
+            rows, cols = linear_sum_assignment(scores, maximize=True)
+            ufcstats_ids = ufcstats_block.UFCSTATS_FIGHTER_ID.values
+            fightoddsio_ids = fightoddsio_block.FIGHTODDSIO_FIGHTER_ID.values
+            matches.append(
+                pd.DataFrame(
+                    {
+                        "UFCSTATS_FIGHTER_ID": ufcstats_ids[rows],
+                        "FIGHTODDSIO_FIGHTER_ID": fightoddsio_ids[cols],
+                        "SCORE": scores[rows, cols],
+                    }
+                )
+            )
+
+        if not matches:
+            return pd.DataFrame(
+                columns=["UFCSTATS_FIGHTER_ID", "FIGHTODDSIO_FIGHTER_ID", "SCORE"]
+            )
+
+        # A fighter unknown in several blocks keeps its most confident link,
+        # on either side, so the links stay one-to-one across blocks
+        return (
+            pd.concat(matches, ignore_index=True)
+            .sort_values(
+                ["SCORE", "UFCSTATS_FIGHTER_ID", "FIGHTODDSIO_FIGHTER_ID"],
+                ascending=[False, True, True],
+            )
+            .drop_duplicates(subset="UFCSTATS_FIGHTER_ID")
+            .drop_duplicates(subset="FIGHTODDSIO_FIGHTER_ID")
+            .reset_index(drop=True)
+        )
@@ -0,0 +1,297 @@
+# standard library imports
+from typing import Dict, Hashable, List, Tuple
+
+# third party imports
+
+# local imports
+from src.databases.connection import get_connection, get_store_connection
+from src.databases.create_statements import (
+    CREATE_FIGHTER_IDENTITY_INDEXES,
+    CREATE_FIGHTER_IDENTITY_LINKS_TABLE,
+    CREATE_FIGHTER_IDENTITY_TABLE,
+    CREATE_FIGHTMATRIX_FIGHTERS_TABLE,
+    CREATE_FIGHTODDSIO_FIGHTER_LINKAGE_TABLE,
+    CREATE_SHERDOG_FIGHTER_LINKAGE_TABLE,
+)
+from src.databases.identity_queries import (
+    REMOVED_LINKS_QUERY,
+    UNRESOLVED_LINKS_QUERY,
+)
+
+
+class UnionFind:
+    """
+    Disjoint set forest with path compression and union by size
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize UnionFind class
+        """
+
+        self.parent: Dict[Hashable, Hashable] = {}
+        self.size: Dict[Hashable, int] = {}
+
+    def find(self, x: Hashable) -> Hashable:
+        """
+        Find the root of the set containing x, adding x if it is new
+        """
+
+        if x not in self.parent:
+            self.parent[x] = x
+            self.size[x] = 1
+            return x
+
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+
+        return root
+
+    def union(self, x: Hashable, y: Hashable) -> None:
+        """
+        Merge the sets containing x and y
+        """
+
+        root_x, root_y = self.find(x), self.find(y)
+        if root_x == root_y:
+            return
+        if self.size[root_x] < self.size[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        self.size[root_x] += self.size[root_y]
+
+
+class FighterIdentityResolver:
+    """
+    Class for resolving the pairwise fighter links between UFC Stats,
+    FightOdds.io, Sherdog and FightMatrix into one canonical id per fighter.
+    Each (source, source fighter id) is a node and each link an edge, so the
+    connected components are the fighters. Canonical ids are kept stable
+    across runs, with merged components keeping the smallest one and the
+    largest part of a split component keeping its id.
+    """
+
+    def __init__(self, resolution_type: str = "incremental") -> None:
+        """
+        Initialize FighterIdentityResolver class
+        """
+
+        assert resolution_type in ["reset_all", "incremental"]
+        self.resolution_type = resolution_type
+        self.conn = get_store_connection()
+        self.cur = self.conn.cursor()
+        self.cur.execute(CREATE_FIGHTODDSIO_FIGHTER_LINKAGE_TABLE)
+        self.cur.execute(CREATE_SHERDOG_FIGHTER_LINKAGE_TABLE)
+        # Created in its source database, a table in main would shadow it
+        get_connection("fightmatrix").execute(CREATE_FIGHTMATRIX_FIGHTERS_TABLE)
+        self.cur.execute(CREATE_FIGHTER_IDENTITY_TABLE)
+        self.cur.execute(CREATE_FIGHTER_IDENTITY_INDEXES)
+        self.cur.execute(CREATE_FIGHTER_IDENTITY_LINKS_TABLE)
+
+    def get_components(self, canonical_ids: List[int]) -> List[Tuple[str, str, int]]:
+        """
+        Get every node of the given canonical ids
+        """
+
+        self.cur.execute("DROP TABLE IF EXISTS temp.TOUCHED_CANONICAL_IDS")
+        self.cur.execute(
+            "CREATE TEMP TABLE TOUCHED_CANONICAL_IDS (CANONICAL_ID INTEGER)"
+        )
+        self.cur.executemany(
+            "INSERT INTO temp.TOUCHED_CANONICAL_IDS VALUES (?)",
+            [(canonical_id,) for canonical_id in canonical_ids],
+        )
+        nodes = self.cur.execute(
+            """
+            SELECT
+              SOURCE,
+              SOURCE_FIGHTER_ID,
+              CANONICAL_ID
+            FROM
+              FIGHTER_IDENTITY
+            WHERE
+              CANONICAL_ID IN (
+                SELECT
+                  CANONICAL_ID
+                FROM
+                  temp.TOUCHED_CANONICAL_IDS
+              );
+            """
+        ).fetchall()
+        self.cur.execute("DROP TABLE temp.TOUCHED_CANONICAL_IDS")
+
+        return nodes
+
+    def get_component_links(
+        self, nodes: List[Tuple[str, str]]
+    ) -> List[Tuple[str, str, str, str]]:
+        """
+        Get the resolved links of the components holding the given nodes,
+        which are found by their first endpoint as both are in the component
+        """
+
+        self.cur.execute("DROP TABLE IF EXISTS temp.COMPONENT_NODES")
+        self.cur.execute(
+            "CREATE TEMP TABLE COMPONENT_NODES (SOURCE TEXT, SOURCE_FIGHTER_ID TEXT)"
+        )
+        self.cur.executemany("INSERT INTO temp.COMPONENT_NODES VALUES (?, ?)", nodes)
+        links = self.cur.execute(
+            """
+            SELECT
+              t1.SOURCE_1,
+              t1.FIGHTER_ID_1,
+              t1.SOURCE_2,
+              t1.FIGHTER_ID_2
+            FROM
+              temp.COMPONENT_NODES AS t2
+              INNER JOIN FIGHTER_IDENTITY_LINKS AS t1 ON t1.SOURCE_1 = t2.SOURCE
+              AND t1.FIGHTER_ID_1 = t2.SOURCE_FIGHTER_ID;
+            """
+        ).fetchall()
+        self.cur.execute("DROP TABLE temp.COMPONENT_NODES")
+
+        return links
+
+    def resolve(self) -> int:
+        """
+        Apply the links added, changed or removed since the last run to the
+        identity table, only reloading the components they touch. Returns the
+        number of nodes written or deleted
+        """
+
+        links = self.cur.execute(UNRESOLVED_LINKS_QUERY).fetchall()
+        removed_links = self.cur.execute(REMOVED_LINKS_QUERY).fetchall()
+        if not links and not removed_links:
+            return 0
+
+        self.cur.executemany(
+            """
+            DELETE FROM
+              FIGHTER_IDENTITY_LINKS
+            WHERE
+              SOURCE_1 = ?
+              AND FIGHTER_ID_1 = ?
+              AND SOURCE_2 = ?
+              AND FIGHTER_ID_2 = ?;
+            """,
+            removed_links,
+        )
+
+        endpoints = {
+            (s, i)
+            for s1, i1, s2, i2 in links + removed_links
+            for s, i in [(s1, i1), (s2, i2)]
+        }
+        self.cur.execute("DROP TABLE IF EXISTS temp.LINK_ENDPOINTS")
+        self.cur.execute(
+            "CREATE TEMP TABLE LINK_ENDPOINTS (SOURCE TEXT, SOURCE_FIGHTER_ID TEXT)"
+        )
+        self.cur.executemany(
+            "INSERT INTO temp.LINK_ENDPOINTS VALUES (?, ?)", list(endpoints)
+        )
+        touched_canonical_ids = [
+            row[0]
+            for row in self.cur.execute(
+                """
+                SELECT
+                  DISTINCT t1.CANONICAL_ID
+                FROM
+                  FIGHTER_IDENTITY AS t1
+                  INNER JOIN temp.LINK_ENDPOINTS AS t2 ON t1.SOURCE = t2.SOURCE
+                  AND t1.SOURCE_FIGHTER_ID = t2.SOURCE_FIGHTER_ID;
+                """
+            ).fetchall()
+        ]
+        self.cur.execute("DROP TABLE temp.LINK_ENDPOINTS")
+
+        # The touched components are rebuilt from their remaining links, so a
+        # removed link can split one and a node left without links drops out
+        current_ids = {
+            (source, source_fighter_id): canonical_id
+            for source, source_fighter_id, canonical_id in self.get_components(
+                touched_canonical_ids
+            )
+        }
+        uf = UnionFind()
+        for source_1, fighter_id_1, source_2, fighter_id_2 in links + (
+            self.get_component_links(list(current_ids))
+        ):
+            uf.union((source_1, fighter_id_1), (source_2, fighter_id_2))
+
+        components: Dict[Hashable, List[Tuple[str, str]]] = {}
+        for node in list(uf.parent):
+            components.setdefault(uf.find(node), []).append(node)
+
+        # Larger parts claim the smallest current id among their nodes first,
+        # the rest get new ids
+        next_id = (
+            self.cur.execute(
+                "SELECT MAX(CANONICAL_ID) FROM FIGHTER_IDENTITY"
+            ).fetchone()[0]
+            or 0
+        ) + 1
+        claimed_ids = set()
+        rows = []
+        for nodes in sorted(
+            components.values(), key=lambda nodes: (-len(nodes), min(nodes))
+        ):
+            candidate_ids = {current_ids[node] for node in nodes if node in current_ids}
+            candidate_ids -= claimed_ids
+            if candidate_ids:
+                canonical_id = min(candidate_ids)
+            else:
+                canonical_id, next_id = next_id, next_id + 1
+            claimed_ids.add(canonical_id)
+            for node in nodes:
+                if current_ids.get(node) != canonical_id:
+                    rows.append((*node, canonical_id))
+        unlinked_nodes = [node for node in current_ids if node not in uf.parent]
+
+        self.cur.executemany(
+            """
+            DELETE FROM
+              FIGHTER_IDENTITY
+            WHERE
+              SOURCE = ?
+              AND SOURCE_FIGHTER_ID = ?;
+            """,
+            unlinked_nodes,
+        )
+        self.cur.executemany(
+            """
+            INSERT OR REPLACE INTO FIGHTER_IDENTITY (
+              SOURCE, SOURCE_FIGHTER_ID, CANONICAL_ID
+            )
+            VALUES
+              (?, ?, ?);
+            """,
+            rows,
+        )
+        self.cur.executemany(
+            """
+            INSERT OR REPLACE INTO FIGHTER_IDENTITY_LINKS (
+              SOURCE_1, FIGHTER_ID_1, SOURCE_2, FIGHTER_ID_2
+            )
+            VALUES
+              (?, ?, ?, ?);
+            """,
+            links,
+        )
+
+        return len(rows) + len(unlinked_nodes)
+
+    def __call__(self) -> None:
+        """
+        Run fighter identity resolution
+        """
+
+        if self.resolution_type == "reset_all":
+            self.cur.execute("DELETE FROM FIGHTER_IDENTITY")
+            self.cur.execute("DELETE FROM FIGHTER_IDENTITY_LINKS")
+        self.resolve()
+
+        self.conn.commit()
+        self.conn.close()
@@ -1,25 +1,37 @@
 # standard library imports
-import os
-import sqlite3
 
 # third party imports
 import pandas as pd
-from thefuzz import process
 
 # local imports
-from src.databases.create_statements import CREATE_FIGHTER_LINKAGE_TABLE
+from src.databases.connection import get_store_connection
+from src.databases.create_statements import (
+    CREATE_FIGHTODDSIO_FIGHTER_LINKAGE_TABLE,
+    CREATE_FIGHTODDSIO_FUZZY_HOLDBACK_TABLE,
+    CREATE_FIGHTODDSIO_MATCHER_WATERMARK_TABLE,
+)
 from src.databases.matcher_queries import (
+    CLEAN_UP_FUZZY_HOLDBACK,
     CLEAN_UP_QUERY_COMPLETED_BOUTS,
     CLEAN_UP_QUERY_UPCOMING_BOUTS,
+    CREATE_INCREMENTAL_FIGHTODDSIO_BOUTS,
+    CREATE_INCREMENTAL_FIGHTODDSIO_FIGHTER_NAME_KEYS,
+    CREATE_INCREMENTAL_FIGHTODDSIO_FIGHTERS,
+    CREATE_INCREMENTAL_UFCSTATS_BOUTS,
+    CREATE_INCREMENTAL_UFCSTATS_FIGHTER_NAME_KEYS,
+    CREATE_INCREMENTAL_UFCSTATS_FIGHTERS,
     MATCHING_QUERY_COMPLETED_BOUTS_LOOSE,
     MATCHING_QUERY_COMPLETED_BOUTS_STRICT,
     MATCHING_QUERY_UPCOMING_BOUTS,
     PRELIMINARY_WIDE_MATCHING_QUERY,
+    SELECT_MATCHER_WATERMARK,
     UNKNOWN_FIGHTODDSIO_COMPLETED_BOUTS,
     UNKNOWN_FIGHTODDSIO_UPCOMING_BOUTS,
     UNKNOWN_UFCSTATS_COMPLETED_BOUTS,
     UNKNOWN_UFCSTATS_UPCOMING_BOUTS,
+    UPDATE_MATCHER_WATERMARK,
 )
+from src.fighter_matching.fuzzy import FuzzyNameMatcher
 
 
 class FighterMatcher:
@@ -30,19 +42,105 @@ class FighterMatcher:
     less straightforward than one may think.
     """
 
-    def __init__(self, matching_type: str) -> None:
+    def __init__(self, matching_type: str, min_fuzzy_score: float = 80) -> None:
         """
         Initialize FighterMatcher class
         """
 
-        assert matching_type in ["reset_all", "completed", "upcoming"]
+        assert matching_type in ["reset_all", "incremental", "completed", "upcoming"]
         self.matching_type = matching_type
-        self.conn = sqlite3.connect(
-            os.path.join(os.path.dirname(__file__), "..", "..", "data", "ufc.db"),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        # Weaker fuzzy links are held back in FIGHTODDSIO_FUZZY_HOLDBACK for review
+        self.min_fuzzy_score = min_fuzzy_score
+        self.fuzzy_matcher = FuzzyNameMatcher()
+        self.conn = get_store_connection()
         self.cur = self.conn.cursor()
-        self.cur.execute(CREATE_FIGHTER_LINKAGE_TABLE)
+        self.cur.execute(CREATE_FIGHTODDSIO_FIGHTER_LINKAGE_TABLE)
+        self.cur.execute(CREATE_FIGHTODDSIO_FUZZY_HOLDBACK_TABLE)
+
+        # A watermark without the bout ROWIDs is dropped, starting over once
+        watermark_columns = [
+            row[1]
+            for row in self.cur.execute(
+                "PRAGMA table_info(FIGHTODDSIO_MATCHER_WATERMARK)"
+            ).fetchall()
+        ]
+        if watermark_columns and "LAST_UFCSTATS_BOUT_ROWID" not in watermark_columns:
+            self.cur.execute("DROP TABLE FIGHTODDSIO_MATCHER_WATERMARK")
+        self.cur.execute(CREATE_FIGHTODDSIO_MATCHER_WATERMARK_TABLE)
+
+    def create_incremental_tables(self) -> None:
+        """
+        Shadow the completed bout and fighter tables with temporary tables
+        holding only bouts stored since the watermark (or on its date and
+        after) and the unmatched fighters added since (or fighting in those
+        bouts)
+        """
+
+        watermark = self.cur.execute(SELECT_MATCHER_WATERMARK).fetchone()
+        params = dict(
+            zip(
+                [
+                    "last_date",
+                    "last_ufcstats_bout_rowid",
+                    "last_fightoddsio_bout_rowid",
+                    "last_ufcstats_rowid",
+                    "last_fightoddsio_rowid",
+                ],
+                watermark if watermark is not None else [None] * 5,
+            )
+        )
+
+        self.cur.execute(CREATE_INCREMENTAL_UFCSTATS_BOUTS, params)
+        self.cur.execute(CREATE_INCREMENTAL_FIGHTODDSIO_BOUTS, params)
+        self.cur.execute(CREATE_INCREMENTAL_UFCSTATS_FIGHTERS, params)
+        self.cur.execute(CREATE_INCREMENTAL_FIGHTODDSIO_FIGHTERS, params)
+        self.cur.execute(CREATE_INCREMENTAL_UFCSTATS_FIGHTER_NAME_KEYS)
+        self.cur.execute(CREATE_INCREMENTAL_FIGHTODDSIO_FIGHTER_NAME_KEYS)
+
+    def drop_incremental_tables(self) -> None:
+        """
+        Drop the temporary tables, unshadowing the source ones
+        """
+
+        for table in [
+            "UFCSTATS_BOUTS_OVERALL",
+            "FIGHTODDSIO_BOUTS",
+            "UFCSTATS_FIGHTERS",
+            "FIGHTODDSIO_FIGHTERS",
+            "UFCSTATS_FIGHTER_NAME_KEYS",
+            "FIGHTODDSIO_FIGHTER_NAME_KEYS",
+        ]:
+            self.cur.execute(f"DROP TABLE IF EXISTS temp.{table}")
+
+    def match_fuzzy(
+        self, unknown_ufcstats_query: str, unknown_fightoddsio_query: str
+    ) -> None:
+        """
+        Match the remaining unknown fighters by name similarity within each
+        bout date, only linking those scoring at least min_fuzzy_score and
+        holding back the weaker candidates, with their scores, for review
+        """
+
+        unknown_ufcstats = pd.read_sql(unknown_ufcstats_query, self.conn)
+        if unknown_ufcstats.shape[0]:
+            unknown_fightoddsio = pd.read_sql(unknown_fightoddsio_query, self.conn)
+
+            fuzzy_match_df = self.fuzzy_matcher(unknown_ufcstats, unknown_fightoddsio)
+            is_strong = fuzzy_match_df.SCORE >= self.min_fuzzy_score
+            fuzzy_match_df.loc[
+                is_strong, ["UFCSTATS_FIGHTER_ID", "FIGHTODDSIO_FIGHTER_ID"]
+            ].to_sql(
+                "FIGHTODDSIO_FIGHTER_LINKAGE",
+                self.conn,
+                if_exists="append",
+                index=False,
+            )
+            self.cur.executemany(
+                "INSERT OR REPLACE INTO FIGHTODDSIO_FUZZY_HOLDBACK VALUES (?, ?, ?)",
+                fuzzy_match_df.loc[~is_strong].astype(object).values.tolist(),
+            )
+
+        self.cur.execute(CLEAN_UP_FUZZY_HOLDBACK)
 
     def match_for_upcoming_bouts(self) -> None:
         """
@@ -53,36 +151,16 @@ class FighterMatcher:
             MATCHING_QUERY_UPCOMING_BOUTS, self.conn
         ).drop_duplicates(subset="UFCSTATS_FIGHTER_ID")
         match_upcoming_df.to_sql(
-            "FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
+            "FIGHTODDSIO_FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
         )
         match_clean_up_df = pd.read_sql(CLEAN_UP_QUERY_UPCOMING_BOUTS, self.conn)
         match_clean_up_df.to_sql(
-            "FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
+            "FIGHTODDSIO_FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
         )
 
-        unknown_ufcstats = pd.read_sql(UNKNOWN_UFCSTATS_UPCOMING_BOUTS, self.conn)
-        if unknown_ufcstats.shape[0]:
-            unknown_fightoddsio = pd.read_sql(
-                UNKNOWN_FIGHTODDSIO_UPCOMING_BOUTS, self.conn
-            )
-            assert unknown_ufcstats.shape[0] == unknown_fightoddsio.shape[0]
-
-            unknown_ufcstats[
-                "FIGHTER_NAME_CLOSE"
-            ] = unknown_ufcstats.FIGHTER_NAME.copy().apply(
-                lambda x: process.extractOne(
-                    x, unknown_fightoddsio.FIGHTER_NAME.copy()
-                )[0]
-            )
-            fuzzy_match_df = unknown_ufcstats.merge(
-                unknown_fightoddsio,
-                how="inner",
-                left_on="FIGHTER_NAME_CLOSE",
-                right_on="FIGHTER_NAME",
-            )[["UFCSTATS_FIGHTER_ID", "FIGHTODDSIO_FIGHTER_SLUG"]]
-            fuzzy_match_df.to_sql(
-                "FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
-            )
+        self.match_fuzzy(
+            UNKNOWN_UFCSTATS_UPCOMING_BOUTS, UNKNOWN_FIGHTODDSIO_UPCOMING_BOUTS
+        )
 
     def match_for_completed_bouts(self) -> None:
         """
@@ -91,7 +169,7 @@ class FighterMatcher:
 
         match_strict_df = pd.read_sql(MATCHING_QUERY_COMPLETED_BOUTS_STRICT, self.conn)
         match_strict_df.to_sql(
-            "FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
+            "FIGHTODDSIO_FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
         )  # the strict version is to safeguard against edge cases (for example the early tournament events)
 
         while True:
@@ -103,36 +181,19 @@ class FighterMatcher:
                 break
 
             match_loose_df.to_sql(
-                "FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
+                "FIGHTODDSIO_FIGHTER_LINKAGE",
+                self.conn,
+                if_exists="append",
+                index=False,
             )
         match_clean_up_df = pd.read_sql(CLEAN_UP_QUERY_COMPLETED_BOUTS, self.conn)
         match_clean_up_df.to_sql(
-            "FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
+            "FIGHTODDSIO_FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
         )
 
-        unknown_ufcstats = pd.read_sql(UNKNOWN_UFCSTATS_COMPLETED_BOUTS, self.conn)
-        if unknown_ufcstats.shape[0]:
-            unknown_fightoddsio = pd.read_sql(
-                UNKNOWN_FIGHTODDSIO_COMPLETED_BOUTS, self.conn
-            )
-            assert unknown_ufcstats.shape[0] == unknown_fightoddsio.shape[0]
-
-            unknown_ufcstats[
-                "FIGHTER_NAME_CLOSE"
-            ] = unknown_ufcstats.FIGHTER_NAME.copy().apply(
-                lambda x: process.extractOne(
-                    x, unknown_fightoddsio.FIGHTER_NAME.copy()
-                )[0]
-            )
-            fuzzy_match_df = unknown_ufcstats.merge(
-                unknown_fightoddsio,
-                how="inner",
-                left_on="FIGHTER_NAME_CLOSE",
-                right_on="FIGHTER_NAME",
-            )[["UFCSTATS_FIGHTER_ID", "FIGHTODDSIO_FIGHTER_SLUG"]]
-            fuzzy_match_df.to_sql(
-                "FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
-            )
+        self.match_fuzzy(
+            UNKNOWN_UFCSTATS_COMPLETED_BOUTS, UNKNOWN_FIGHTODDSIO_COMPLETED_BOUTS
+        )
 
     def __call__(self) -> None:
         """
@@ -140,15 +201,39 @@ class FighterMatcher:
         """
 
         if self.matching_type == "reset_all":
-            self.cur.execute("DELETE FROM FIGHTER_LINKAGE")
+            self.cur.execute("DELETE FROM FIGHTODDSIO_FIGHTER_LINKAGE")
+            self.cur.execute("DELETE FROM FIGHTODDSIO_FUZZY_HOLDBACK")
             match_wide_df = pd.read_sql(PRELIMINARY_WIDE_MATCHING_QUERY, self.conn)
             match_wide_df.to_sql(
-                "FIGHTER_LINKAGE", self.conn, if_exists="append", index=False
+                "FIGHTODDSIO_FIGHTER_LINKAGE",
+                self.conn,
+                if_exists="append",
+                index=False,
             )
             self.match_for_completed_bouts()
             self.match_for_upcoming_bouts()
+            self.cur.execute(UPDATE_MATCHER_WATERMARK)
+        elif self.matching_type == "incremental":
+            # Only fighters and bouts added since the previous run are matched.
+            # The temporary tables shadow the source ones on the shared
+            # connection, so they are dropped even if matching fails
+            try:
+                self.create_incremental_tables()
+                match_wide_df = pd.read_sql(PRELIMINARY_WIDE_MATCHING_QUERY, self.conn)
+                match_wide_df.to_sql(
+                    "FIGHTODDSIO_FIGHTER_LINKAGE",
+                    self.conn,
+                    if_exists="append",
+                    index=False,
+                )
+                self.match_for_completed_bouts()
+            finally:
+                self.drop_incremental_tables()
+            self.match_for_upcoming_bouts()
+            self.cur.execute(UPDATE_MATCHER_WATERMARK)
         elif self.matching_type == "completed":
             self.match_for_completed_bouts()
+            self.cur.execute(UPDATE_MATCHER_WATERMARK)
         elif self.matching_type == "upcoming":
             self.match_for_upcoming_bouts()
 
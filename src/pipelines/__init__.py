@@ -1,4 +1,5 @@
 from .matching import FighterMatchingPipeline
+from .orchestrator import SpiderOrchestrator
 from .rankings import RankingsPipeline
 from .results import ResultsPipeline
 from .upcoming import UpcomingEventPipeline
@@ -0,0 +1,135 @@
+# standard library imports
+import multiprocessing
+import os
+import sys
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scrapers"))
+
+# third party imports
+from scrapy.crawler import CrawlerProcess
+from scrapy.spiders import Spider
+
+# local imports
+
+
+def run_spider(spider_cls: Type[Spider], spider_kwargs: Dict[str, Any], conn) -> None:
+    """
+    Runs a single spider with its own reactor and sends its stats back to the
+    orchestrator, exiting with a non-zero code if the crawl did not finish
+    cleanly
+    """
+
+    process = CrawlerProcess(settings={"LOG_LEVEL": "INFO"})
+    crawler = process.create_crawler(spider_cls)
+    process.crawl(crawler, **spider_kwargs)
+    process.start()
+
+    stats = crawler.stats.get_stats()
+    conn.send(stats)
+    conn.close()
+
+    if stats.get("finish_reason") != "finished":
+        sys.exit(1)
+
+
+class SpiderOrchestrator:
+    """
+    Class for running spiders in parallel, each in a fresh worker process, so
+    parsing is spread over all cores and spiders from several pipelines can be
+    run in one invocation despite the Twisted reactor not being restartable.
+    Spiders of the same source write to the same database, so they are run
+    one after the other rather than side by side.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """
+        Initialize SpiderOrchestrator class
+        """
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.jobs: List[Tuple[Type[Spider], Dict[str, Any]]] = []
+
+    def add_jobs(self, jobs: List[Tuple[Type[Spider], Dict[str, Any]]]) -> None:
+        """
+        Queue (spider class, spider kwargs) pairs to be run
+        """
+
+        self.jobs.extend(jobs)
+
+    def get_source(self, spider_cls: Type[Spider]) -> str:
+        """
+        Get the source of a spider, which is also the database it writes to
+        """
+
+        return spider_cls.name.split("_")[0]
+
+    def __call__(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Run the queued spiders, returning the exit code, finish reason and
+        stats of each
+        """
+
+        ctx = multiprocessing.get_context("spawn")
+        pending = list(self.jobs)
+        busy_sources = set()
+        running = {}
+        stats = {}
+        results = {}
+
+        while pending or running:
+            for job in list(pending):
+                if len(running) >= self.max_workers:
+                    break
+
+                spider_cls, spider_kwargs = job
+                source = self.get_source(spider_cls)
+                if source in busy_sources:
+                    continue
+
+                pending.remove(job)
+                busy_sources.add(source)
+                recv_conn, send_conn = ctx.Pipe(duplex=False)
+                process = ctx.Process(
+                    target=run_spider,
+                    args=(spider_cls, spider_kwargs, send_conn),
+                    name=spider_cls.name,
+                )
+                process.start()
+                send_conn.close()
+                running[process.sentinel] = (spider_cls, process, recv_conn)
+
+            # Stats are read as soon as they are sent, so a worker never
+            # blocks on a full pipe while the orchestrator waits for it to exit
+            conns = {
+                job[2]: sentinel
+                for sentinel, job in running.items()
+                if sentinel not in stats
+            }
+            ready_list = wait(list(running) + list(conns))
+            # Stats first, in case a worker sent them and exited in one go
+            for ready in sorted(ready_list, key=lambda ready: ready not in conns):
+                if ready in conns:
+                    try:
+                        stats[conns[ready]] = ready.recv()
+                    except EOFError:
+                        # The worker died before sending its stats
+                        stats[conns[ready]] = {}
+                    continue
+
+                spider_cls, process, recv_conn = running.pop(ready)
+                process.join()
+                recv_conn.close()
+                busy_sources.discard(self.get_source(spider_cls))
+
+                spider_stats = stats.pop(ready, {})
+                results[spider_cls.name] = {
+                    "exitcode": process.exitcode,
+                    "finish_reason": spider_stats.get("finish_reason"),
+                    "stats": spider_stats,
+                }
+
+        self.jobs = []
+
+        return results
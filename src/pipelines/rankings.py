@@ -1,16 +1,14 @@
 # standard library imports
-import os
-import sqlite3
-import sys
 import time
 from datetime import datetime, timedelta, timezone
-
-sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scrapers"))
+from typing import Any, Dict, List, Tuple, Type
 
 # third party imports
-from scrapy.crawler import CrawlerProcess
+from scrapy.spiders import Spider
 
 # local imports
+from src.databases.connection import get_connection
+from src.pipelines.orchestrator import SpiderOrchestrator
 from src.scrapers.ufc_scrapy.spiders.fightmatrix_spiders import (
     FightMatrixRankingsSpider,
 )
@@ -27,12 +25,7 @@ class RankingsPipeline:
         """
 
         self.scrape_type = "most_recent"
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__), "..", "..", "data", "fightmatrix.db"
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("fightmatrix")
         self.cur = self.conn.cursor()
         self.date_today = datetime.now(timezone.utc).date()
 
@@ -49,18 +42,10 @@ class RankingsPipeline:
 
         return first_sunday
 
-    def get_rankings(self):
-        """
-        Get most recent FightMatrix rankings
-        """
-
-        process = CrawlerProcess(settings={"LOG_LEVEL": "INFO"})
-        process.crawl(FightMatrixRankingsSpider, scrape_type=self.scrape_type)
-        process.start()
-
-    def __call__(self):
+    def get_spider_jobs(self) -> List[Tuple[Type[Spider], Dict[str, Any]]]:
         """
-        Run the pipeline
+        Get the spiders to run for the rankings, with their kwargs. There are
+        none if this month's rankings have already been scraped
         """
 
         first_sunday = self.first_sunday_of_month()
@@ -83,4 +68,22 @@ class RankingsPipeline:
             > time.strptime(first_sunday, "%Y-%m-%d")
             and not res
         ):
-            self.get_rankings()
+            return [(FightMatrixRankingsSpider, {"scrape_type": self.scrape_type})]
+
+        return []
+
+    def get_rankings(self):
+        """
+        Get most recent FightMatrix rankings
+        """
+
+        orchestrator = SpiderOrchestrator()
+        orchestrator.add_jobs(self.get_spider_jobs())
+        return orchestrator()
+
+    def __call__(self):
+        """
+        Run the pipeline
+        """
+
+        self.get_rankings()
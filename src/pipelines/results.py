@@ -1,13 +1,12 @@
 # standard library imports
-import os
-import sys
-
-sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scrapers"))
+from typing import Any, Dict, List, Tuple, Type
 
 # third party imports
-from scrapy.crawler import CrawlerProcess
+from scrapy.spiders import Spider
 
 # local imports
+from src.fighter_matching import FighterIdentityResolver, FighterMatcher
+from src.pipelines.orchestrator import SpiderOrchestrator
 from src.scrapers.ufc_scrapy.spiders.fightmatrix_spiders import FightMatrixResultsSpider
 from src.scrapers.ufc_scrapy.spiders.fightoddsio_spiders import FightOddsIOResultsSpider
 from src.scrapers.ufc_scrapy.spiders.sherdog_spiders import SherdogResultsSpider
@@ -26,17 +25,39 @@ class ResultsPipeline:
 
         self.scrape_type = "most_recent"
 
+    def get_spider_jobs(self) -> List[Tuple[Type[Spider], Dict[str, Any]]]:
+        """
+        Get the spiders to run for historical data, with their kwargs
+        """
+
+        return [
+            # Catches up on every event missed since the last run, not just the latest
+            (UFCStatsResultsSpider, {"scrape_type": "incremental"}),
+            (FightOddsIOResultsSpider, {"scrape_type": self.scrape_type}),
+            (SherdogResultsSpider, {"scrape_type": self.scrape_type}),
+            (FightMatrixResultsSpider, {"scrape_type": self.scrape_type}),
+        ]
+
     def get_results(self):
         """
-        Get historical data from UFC Stats and FightOdds.io
+        Get historical data from UFC Stats, FightOdds.io, Sherdog and
+        FightMatrix, each spider in its own process
+        """
+
+        orchestrator = SpiderOrchestrator()
+        orchestrator.add_jobs(self.get_spider_jobs())
+        return orchestrator()
+
+    def match_fighters(self):
+        """
+        Link the fighters of the new results across sources, then resolve the
+        links into canonical fighter ids
         """
 
-        process = CrawlerProcess(settings={"LOG_LEVEL": "INFO"})
-        process.crawl(UFCStatsResultsSpider, scrape_type=self.scrape_type)
-        process.crawl(FightOddsIOResultsSpider, scrape_type=self.scrape_type)
-        process.crawl(SherdogResultsSpider, scrape_type=self.scrape_type)
-        process.crawl(FightMatrixResultsSpider, scrape_type=self.scrape_type)
-        process.start()
+        fighter_matcher = FighterMatcher(matching_type="incremental")
+        fighter_matcher()
+        identity_resolver = FighterIdentityResolver(resolution_type="incremental")
+        identity_resolver()
 
     def update_pnl(self):
         """
@@ -50,5 +71,8 @@ class ResultsPipeline:
         Run the pipeline
         """
 
-        self.get_results()
+        results = self.get_results()
+        # A failed spider leaves matching to the next run, which catches up
+        if all(result["exitcode"] == 0 for result in results.values()):
+            self.match_fighters()
         # self.update_pnl()
@@ -1,14 +1,12 @@
 # standard library imports
-import os
-import sys
-
-sys.path.append(os.path.join(os.path.dirname(__file__), "..", "scrapers"))
+from typing import Any, Dict, List, Tuple, Type
 
 # third party imports
-from scrapy.crawler import CrawlerProcess
+from scrapy.spiders import Spider
 
 # local imports
 # from src.elevation import ElevationFinder
+from src.pipelines.orchestrator import SpiderOrchestrator
 from src.scrapers.ufc_scrapy.spiders.fightoddsio_spiders import (
     FightOddsIOUpcomingEventSpider,
 )
@@ -20,15 +18,21 @@ class UpcomingEventPipeline:
     Class for handling upcoming UFC events
     """
 
+    def get_spider_jobs(self) -> List[Tuple[Type[Spider], Dict[str, Any]]]:
+        """
+        Get the spiders to run for the upcoming event, with their kwargs
+        """
+
+        return [(UFCStatsUpcomingEventSpider, {}), (FightOddsIOUpcomingEventSpider, {})]
+
     def get_upcoming_event(self):
         """
         Get upcoming event data from UFC Stats and FightOdds.io
         """
 
-        process = CrawlerProcess(settings={"LOG_LEVEL": "INFO"})
-        process.crawl(UFCStatsUpcomingEventSpider)
-        process.crawl(FightOddsIOUpcomingEventSpider)
-        process.start()
+        orchestrator = SpiderOrchestrator()
+        orchestrator.add_jobs(self.get_spider_jobs())
+        return orchestrator()
 
     # def update_location_elevations(self):
     #     """
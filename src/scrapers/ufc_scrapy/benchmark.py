@@ -0,0 +1,175 @@
+# standard library imports
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# third party imports
+from scrapy.crawler import CrawlerProcess
+
+# local imports
+from src.scrapers.ufc_scrapy.spiders.fightmatrix_spiders import (
+    FightMatrixRankingsSpider,
+    FightMatrixResultsSpider,
+)
+from src.scrapers.ufc_scrapy.spiders.fightoddsio_spiders import (
+    FightOddsIOResultsSpider,
+    FightOddsIOUpcomingEventSpider,
+)
+from src.scrapers.ufc_scrapy.spiders.sherdog_spiders import SherdogResultsSpider
+from src.scrapers.ufc_scrapy.spiders.ufcstats_spiders import (
+    UFCStatsResultsSpider,
+    UFCStatsUpcomingEventSpider,
+)
+
+SPIDERS = {
+    spider_cls.name: spider_cls
+    for spider_cls in [
+        UFCStatsResultsSpider,
+        UFCStatsUpcomingEventSpider,
+        FightOddsIOResultsSpider,
+        FightOddsIOUpcomingEventSpider,
+        SherdogResultsSpider,
+        FightMatrixResultsSpider,
+        FightMatrixRankingsSpider,
+    ]
+}
+SCRAPE_TYPE_SPIDERS = {
+    UFCStatsResultsSpider.name,
+    FightOddsIOResultsSpider.name,
+    SherdogResultsSpider.name,
+    FightMatrixResultsSpider.name,
+    FightMatrixRankingsSpider.name,
+}
+DATE_TODAY_SPIDERS = {
+    FightOddsIOResultsSpider.name,
+    FightOddsIOUpcomingEventSpider.name,
+}
+PARSER_WORKERS_SPIDERS = {
+    UFCStatsResultsSpider.name,
+    SherdogResultsSpider.name,
+}
+
+
+def run_spider(
+    spider_name: str, archive_path: Optional[str], spider_kwargs: Dict[str, str]
+) -> Dict[str, float]:
+    """
+    Replays a spider from its archive with the item pipelines disabled, so
+    only downloading (from the archive) and parsing are measured
+    """
+
+    spider_cls = SPIDERS[spider_name]
+
+    # Spider settings take precedence over process settings, so the
+    # overrides have to go through a subclass
+    custom_settings = dict(spider_cls.custom_settings)
+    custom_settings.update(
+        {
+            "REPLAY_MODE": "replay",
+            "REPLAY_ARCHIVE": archive_path,
+            "ITEM_PIPELINES": {},
+            "HTTPCACHE_ENABLED": False,
+            "DOWNLOAD_DELAY": 0,
+            "ADAPTIVE_RATE_ENABLED": False,
+            "CONCURRENT_REQUESTS": 16,
+            "CONCURRENT_REQUESTS_PER_DOMAIN": 16,
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    replay_cls = type(
+        spider_cls.__name__, (spider_cls,), {"custom_settings": custom_settings}
+    )
+
+    process = CrawlerProcess()
+    crawler = process.create_crawler(replay_cls)
+    process.crawl(crawler, **spider_kwargs)
+    process.start()
+
+    stats = crawler.stats.get_stats()
+    elapsed = stats.get("elapsed_time_seconds", 0.0)
+    pages = stats.get("response_received_count", 0)
+    items = stats.get("item_scraped_count", 0)
+
+    return {
+        "elapsed_seconds": elapsed,
+        "pages": pages,
+        "items": items,
+        "pages_per_second": pages / elapsed if elapsed else 0.0,
+        "items_per_second": items / elapsed if elapsed else 0.0,
+        "missing_responses": stats.get(
+            "downloader/exception_type_count/scrapy.exceptions.IgnoreRequest", 0
+        ),
+    }
+
+
+def benchmark(
+    spider_names: List[str],
+    archive_dir: Optional[str] = None,
+    scrape_type: str = "all",
+    date_today: Optional[str] = None,
+    parser_workers: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Benchmarks each spider against its recorded archive, one fresh process
+    per spider since the Twisted reactor cannot be restarted. Workers are
+    shut down rather than terminated, as Scrapy's SIGTERM handler would keep
+    a terminated worker alive
+    """
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for spider_name in spider_names:
+        archive_path = (
+            os.path.join(archive_dir, f"{spider_name}.zip") if archive_dir else None
+        )
+        spider_kwargs = {}
+        if spider_name in SCRAPE_TYPE_SPIDERS:
+            spider_kwargs["scrape_type"] = scrape_type
+        if spider_name in DATE_TODAY_SPIDERS and date_today is not None:
+            spider_kwargs["date_today"] = date_today
+        if spider_name in PARSER_WORKERS_SPIDERS and parser_workers:
+            spider_kwargs["parser_workers"] = parser_workers
+
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+            results[spider_name] = executor.submit(
+                run_spider, spider_name, archive_path, spider_kwargs
+            ).result()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark spiders against responses recorded with REPLAY_MODE"
+    )
+    parser.add_argument("spiders", nargs="*", default=list(SPIDERS))
+    parser.add_argument("--archive-dir", default=None)
+    parser.add_argument("--scrape-type", default="all")
+    parser.add_argument("--date-today", default=None)
+    parser.add_argument("--parser-workers", type=int, default=0)
+    args = parser.parse_args()
+
+    results = benchmark(
+        args.spiders,
+        args.archive_dir,
+        args.scrape_type,
+        args.date_today,
+        args.parser_workers,
+    )
+
+    print(
+        f"{'spider':<32}{'seconds':>10}{'pages':>8}{'pages/s':>10}"
+        f"{'items':>8}{'items/s':>10}{'missing':>9}"
+    )
+    for spider_name, result in results.items():
+        print(
+            f"{spider_name:<32}{result['elapsed_seconds']:>10.2f}"
+            f"{result['pages']:>8}{result['pages_per_second']:>10.1f}"
+            f"{result['items']:>8}{result['items_per_second']:>10.1f}"
+            f"{result['missing_responses']:>9}"
+        )
@@ -0,0 +1,82 @@
+# standard library imports
+import os
+import re
+from time import time
+
+# third party imports
+from scrapy.extensions.httpcache import RFC2616Policy
+
+# local imports
+
+HTTPCACHE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "data", "httpcache")
+)
+
+
+class FreshnessPolicy(RFC2616Policy):
+    """
+    HTTP cache policy that decides freshness from per-URL-pattern TTLs
+    instead of the (mostly missing) cache headers sent by the sites we scrape.
+    HTTPCACHE_FRESHNESS_RULES is a list of (regex, ttl in seconds) pairs,
+    where the first matching pattern wins and a TTL of None marks the page as
+    immutable. A request can override the rules with the "httpcache_ttl" meta
+    key, which is how requests sharing one URL (GraphQL) are told apart.
+    Stale pages are revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged page costs a 304 rather than a full download.
+    """
+
+    def __init__(self, settings):
+        """
+        Initialize FreshnessPolicy class
+        """
+
+        super().__init__(settings)
+        self.rules = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in settings.getlist("HTTPCACHE_FRESHNESS_RULES")
+        ]
+
+    def get_ttl(self, request):
+        """
+        Get the TTL of a request, returning False if no rule applies
+        """
+
+        if "httpcache_ttl" in request.meta:
+            return request.meta["httpcache_ttl"]
+
+        for pattern, ttl in self.rules:
+            if pattern.search(request.url):
+                return ttl
+
+        return False
+
+    def should_cache_response(self, response, request):
+        """
+        Only keep successful responses, so errors and rate limiting pages are
+        never replayed
+        """
+
+        return response.status == 200 and super().should_cache_response(
+            response, request
+        )
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        """
+        Check the age of a cached response against its TTL, setting the
+        conditional validators when it is stale
+        """
+
+        ttl = self.get_ttl(request)
+        if ttl is False:
+            return super().is_cached_response_fresh(cachedresponse, request)
+        if ttl is None:
+            return True
+
+        # Without a Date header the age is unknown, so the page is revalidated
+        if b"Date" in cachedresponse.headers and (
+            self._compute_current_age(cachedresponse, request, time()) < ttl
+        ):
+            return True
+
+        self._set_conditional_validators(request, cachedresponse)
+        return False
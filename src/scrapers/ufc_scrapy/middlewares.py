@@ -3,8 +3,16 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+# standard library imports
+import json
+import os
+import zipfile
+
 # useful for handling different item types with a single interface
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
 
 
 class ScrapersSpiderMiddleware:
@@ -55,47 +63,115 @@ class ScrapersSpiderMiddleware:
 
 
 class ScrapersDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+    """
+    Downloader middleware for recording responses to a compressed archive and
+    replaying them deterministically, so spiders can be run and benchmarked
+    without hitting the live sites. Enabled through the REPLAY_MODE setting
+    ("record" or "replay"), with REPLAY_ARCHIVE pointing to the zip archive
+    (data/replay/<spider name>.zip by default). Each response is stored under
+    its request fingerprint, which covers the method and body as well as the
+    URL, so GraphQL requests to the same endpoint are kept apart.
+    """
+
+    def __init__(self, crawler, mode, archive_path):
+        """
+        Initialize ScrapersDownloaderMiddleware class
+        """
+
+        self.crawler = crawler
+        self.mode = mode
+        self.archive_path = archive_path
+        self.archive = None
+        self.names = set()
 
     @classmethod
     def from_crawler(cls, crawler):
-        # This method is used by Scrapy to create your spiders.
-        s = cls()
+        mode = crawler.settings.get("REPLAY_MODE")
+        if not mode:
+            raise NotConfigured
+        assert mode in ["record", "replay"]
+
+        s = cls(crawler, mode, crawler.settings.get("REPLAY_ARCHIVE"))
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
         return s
 
+    def get_key(self, request):
+        """
+        Get the archive key of a request
+        """
+
+        return self.crawler.request_fingerprinter.fingerprint(request).hex()
+
     def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
-
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
-        return None
+        if self.mode != "replay":
+            return None
+
+        key = self.get_key(request)
+        if f"{key}.json" not in self.names:
+            raise IgnoreRequest(f"Response not recorded: {request.url}")
+
+        meta = json.loads(self.archive.read(f"{key}.json"))
+        body = self.archive.read(f"{key}.body")
+        headers = Headers(meta["headers"], encoding="latin-1")
+        respcls = responsetypes.from_args(headers=headers, url=meta["url"], body=body)
+
+        return respcls(
+            url=meta["url"],
+            status=meta["status"],
+            headers=headers,
+            body=body,
+            flags=["replayed"],
+            request=request,
+        )
 
     def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
+        if self.mode != "record" or "replayed" in response.flags:
+            return response
+
+        key = self.get_key(request)
+        if f"{key}.json" not in self.names:
+            meta = {
+                "url": response.url,
+                "status": response.status,
+                "headers": {
+                    k.decode("latin-1"): [v.decode("latin-1") for v in vs]
+                    for k, vs in response.headers.items()
+                },
+            }
+            self.archive.writestr(f"{key}.json", json.dumps(meta))
+            self.archive.writestr(f"{key}.body", response.body)
+            self.names.add(f"{key}.json")
 
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
         return response
 
-    def process_exception(self, request, exception, spider):
-        # Called when a download handler or a process_request()
-        # (from other downloader middleware) raises an exception.
-
-        # Must either:
-        # - return None: continue processing this exception
-        # - return a Response object: stops process_exception() chain
-        # - return a Request object: stops process_exception() chain
-        pass
-
     def spider_opened(self, spider):
-        spider.logger.info("Spider opened: %s" % spider.name)
+        if self.archive_path is None:
+            self.archive_path = os.path.join(
+                os.path.dirname(__file__),
+                "..",
+                "..",
+                "..",
+                "data",
+                "replay",
+                f"{spider.name}.zip",
+            )
+
+        if self.mode == "record":
+            os.makedirs(
+                os.path.dirname(os.path.abspath(self.archive_path)), exist_ok=True
+            )
+            self.archive = zipfile.ZipFile(
+                self.archive_path, "a", compression=zipfile.ZIP_DEFLATED
+            )
+        else:
+            self.archive = zipfile.ZipFile(self.archive_path, "r")
+        self.names = set(self.archive.namelist())
+
+        spider.logger.info(
+            "%s responses in %s, %d already stored"
+            % (self.mode.capitalize(), self.archive_path, len(self.names) // 2)
+        )
+
+    def spider_closed(self, spider):
+        self.archive.close()
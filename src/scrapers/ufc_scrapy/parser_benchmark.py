@@ -0,0 +1,164 @@
+# standard library imports
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import zipfile
+from typing import Callable, Dict, Iterator, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+# third party imports
+from scrapy import Item
+from scrapy.http import HtmlResponse
+
+# local imports
+from src.scrapers.ufc_scrapy.parsers import parse_ufcstats_bout
+
+# The event details come from the event page rather than the bout page, so
+# stand-ins are passed to the parser
+BOUT_KWARGS = {
+    "event_id": "benchmark",
+    "event_name": "Benchmark",
+    "date": "November 12, 1993",
+    "location": "Denver, Colorado, USA",
+    "bout_ordinal": 0,
+    "weight_class": "Lightweight",
+}
+
+
+def load_bout_pages(archive_path: str, limit: Optional[int]) -> List[HtmlResponse]:
+    """
+    Loads the bout pages stored in a UFC Stats results spider archive recorded
+    with REPLAY_MODE, with the HTML tree of each built up front so only the
+    parsing is timed
+    """
+
+    responses = []
+    with zipfile.ZipFile(archive_path, "r") as archive:
+        for name in sorted(archive.namelist()):
+            if not name.endswith(".json"):
+                continue
+            meta = json.loads(archive.read(name))
+            if "/fight-details/" not in meta["url"]:
+                continue
+
+            response = HtmlResponse(
+                url=meta["url"],
+                body=archive.read(f"{name[:-len('.json')]}.body"),
+                encoding="utf-8",
+            )
+            # Builds and caches the tree the parsers share
+            response.selector
+            responses.append(response)
+            if limit is not None and len(responses) >= limit:
+                break
+
+    return responses
+
+
+def load_parser(parsers_path: str) -> Callable[..., Iterator[Item]]:
+    """
+    Loads parse_ufcstats_bout from another version of parsers.py, e.g. one
+    written out with git show <revision>:src/scrapers/ufc_scrapy/parsers.py
+    """
+
+    spec = importlib.util.spec_from_file_location("baseline_parsers", parsers_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module.parse_ufcstats_bout
+
+
+def time_parser(
+    parser: Callable[..., Iterator[Item]],
+    responses: List[HtmlResponse],
+    repeats: int,
+) -> float:
+    """
+    Times a parser over every page, getting the best per-page seconds over
+    the repeats
+    """
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for response in responses:
+            list(parser(response, **BOUT_KWARGS))
+        best = min(best, time.perf_counter() - start)
+
+    return best / len(responses)
+
+
+def benchmark(
+    archive_path: str,
+    baseline_path: Optional[str] = None,
+    limit: Optional[int] = None,
+    repeats: int = 3,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Times parse_ufcstats_bout on the stored bout pages, along with the parser
+    from a baseline parsers.py if given, after checking both produce the same
+    items with the same field order
+    """
+
+    responses = load_bout_pages(archive_path, limit)
+    if not responses:
+        raise ValueError(f"No bout pages stored in {archive_path}")
+
+    parsers = {"current": parse_ufcstats_bout}
+    if baseline_path is not None:
+        parsers["baseline"] = load_parser(baseline_path)
+        for response in responses:
+            items = [
+                (type(item).__name__, list(dict(item).items()))
+                for item in parsers["current"](response, **BOUT_KWARGS)
+            ]
+            baseline_items = [
+                (type(item).__name__, list(dict(item).items()))
+                for item in parsers["baseline"](response, **BOUT_KWARGS)
+            ]
+            if items != baseline_items:
+                raise ValueError(f"Parsers disagree on {response.url}")
+
+    return {
+        name: {
+            "pages": len(responses),
+            "seconds": time_parser(parser, responses, repeats),
+        }
+        for name, parser in parsers.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the UFC Stats bout page parser on pages stored "
+        "with REPLAY_MODE"
+    )
+    parser.add_argument(
+        "--archive",
+        default=os.path.join(
+            os.path.dirname(__file__),
+            "..",
+            "..",
+            "..",
+            "data",
+            "replay",
+            "ufcstats_results_spider.zip",
+        ),
+    )
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    results = benchmark(args.archive, args.baseline, args.limit, args.repeats)
+
+    print(f"{'parser':<12}{'pages':>8}{'ms/page':>10}")
+    for name, result in results.items():
+        print(f"{name:<12}{result['pages']:>8}{result['seconds'] * 1000:>10.2f}")
+    if "baseline" in results:
+        speedup = results["baseline"]["seconds"] / results["current"]["seconds"]
+        print(f"{speedup:.2f}x faster than the baseline")
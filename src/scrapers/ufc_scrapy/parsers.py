@@ -0,0 +1,382 @@
+# standard library imports
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# third party imports
+import pandas as pd
+import w3lib.html
+from lxml import etree
+from scrapy import Item
+from scrapy.http import HtmlResponse
+
+# local imports
+from src.scrapers.ufc_scrapy.items import (
+    SherdogFighterBoutHistoryItem,
+    SherdogFighterItem,
+    UFCStatsBoutOverallItem,
+    UFCStatsBoutRoundItem,
+)
+from src.scrapers.ufc_scrapy.utils import (
+    convert_height,
+    ctrl_time,
+    extract_landed_attempted,
+    format_date,
+    total_time,
+)
+
+
+def create_parser_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Creates the process pool parsers are offloaded to, or None to parse in
+    the spider's own process
+    """
+
+    if workers <= 0:
+        return None
+
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def collect_items(
+    parser: Callable[..., Iterator[Item]],
+    url: str,
+    body: bytes,
+    encoding: str,
+    kwargs: Dict[str, Any],
+) -> List[Item]:
+    """
+    Rebuilds a response from its raw body and runs a parser on it, in a
+    parser pool worker
+    """
+
+    response = HtmlResponse(url=url, body=body, encoding=encoding)
+
+    return list(parser(response, **kwargs))
+
+
+async def run_parser(
+    pool: Optional[ProcessPoolExecutor],
+    parser: Callable[..., Iterator[Item]],
+    response: HtmlResponse,
+    **kwargs: Any,
+) -> List[Item]:
+    """
+    Runs a parser on a response, in the pool if there is one, so the reactor
+    keeps downloading while the page is parsed
+    """
+
+    if pool is None:
+        return list(parser(response, **kwargs))
+
+    return await asyncio.wrap_future(
+        pool.submit(
+            collect_items,
+            parser,
+            response.url,
+            response.body,
+            response.encoding,
+            kwargs,
+        )
+    )
+
+
+def has_class(name: str) -> str:
+    """
+    XPath condition for an element having a class, the same test a CSS class
+    selector is translated to
+    """
+
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# UFC Stats bout page XPaths, compiled once rather than translated from CSS on
+# every page
+BOUT_XPATHS = {
+    name: etree.XPath(xpath, smart_strings=False)
+    for name, xpath in {
+        "fighter_urls": f"//a[{has_class('b-link')} and "
+        f"{has_class('b-fight-details__person-link')}]/@href",
+        "outcomes": f"//i[{has_class('b-fight-details__person-status')}]/text()",
+        "titles": f"//i[{has_class('b-fight-details__fight-title')}]/text()",
+        "bonus_img_srcs": f"//i[{has_class('b-fight-details__fight-title')}]"
+        "/img/@src",
+        "method_info": f"//i[{has_class('b-fight-details__text-item_first')}]",
+        "details": f"//p[{has_class('b-fight-details__text')}]",
+        "time_format_info": f"//i[{has_class('b-fight-details__text-item')}]",
+        "tables": f"//tbody[{has_class('b-fight-details__table-body')}]",
+        "rows": f".//tr[{has_class('b-fight-details__table-row')}]",
+        "row_texts": f".//p[{has_class('b-fight-details__table-text')}]/text()",
+    }.items()
+}
+
+# Per-round stats as (table, position of the red corner's value among the text
+# of a row, stat, converter), the blue corner's value following the red one.
+# Table 0 holds the totals and table 1 the significant strikes
+ROUND_STATS = [
+    (0, 4, "KNOCKDOWNS", int),
+    (0, 10, "TOTAL_STRIKES", extract_landed_attempted),
+    (0, 12, "TAKEDOWNS", extract_landed_attempted),
+    (0, 16, "SUBMISSION_ATTEMPTS", int),
+    (0, 18, "REVERSALS", int),
+    (0, 20, "CONTROL_TIME_SECONDS", ctrl_time),
+    (1, 4, "SIGNIFICANT_STRIKES", extract_landed_attempted),
+    (1, 8, "SIGNIFICANT_STRIKES_HEAD", extract_landed_attempted),
+    (1, 10, "SIGNIFICANT_STRIKES_BODY", extract_landed_attempted),
+    (1, 12, "SIGNIFICANT_STRIKES_LEG", extract_landed_attempted),
+    (1, 14, "SIGNIFICANT_STRIKES_DISTANCE", extract_landed_attempted),
+    (1, 16, "SIGNIFICANT_STRIKES_CLINCH", extract_landed_attempted),
+    (1, 18, "SIGNIFICANT_STRIKES_GROUND", extract_landed_attempted),
+]
+ROUND_STAT_FIELDS = [
+    (
+        table,
+        position + i,
+        convert,
+        (
+            (f"{corner}_{stat}_LANDED", f"{corner}_{stat}_ATTEMPTED")
+            if convert is extract_landed_attempted
+            else (f"{corner}_{stat}",)
+        ),
+    )
+    for table, position, stat, convert in ROUND_STATS
+    for i, corner in enumerate(["RED", "BLUE"])
+]
+
+
+def get_text(element: etree._Element) -> str:
+    """
+    Gets the text of an element and its descendants, without the tags
+    """
+
+    return "".join(element.itertext())
+
+
+def parse_ufcstats_bout(
+    response: HtmlResponse,
+    event_id: str,
+    event_name: str,
+    date: str,
+    location: str,
+    bout_ordinal: int,
+    weight_class: str,
+) -> Iterator[Item]:
+    """
+    Parses the overall and per-round stats of a UFC Stats bout page
+    """
+
+    root = response.selector.root
+    bout_overall_item = UFCStatsBoutOverallItem()
+
+    bout_overall_item["BOUT_ID"] = response.url.split("/")[-1]
+    bout_overall_item["EVENT_ID"] = event_id
+    bout_overall_item["EVENT_NAME"] = event_name
+    bout_overall_item["DATE"] = format_date(date)
+    bout_overall_item["LOCATION"] = location
+    bout_overall_item["BOUT_ORDINAL"] = bout_ordinal
+    bout_overall_item["WEIGHT_CLASS"] = weight_class
+
+    fighter_urls = BOUT_XPATHS["fighter_urls"](root)
+    bout_overall_item["RED_FIGHTER_ID"] = fighter_urls[0].split("/")[-1]
+    bout_overall_item["BLUE_FIGHTER_ID"] = fighter_urls[1].split("/")[-1]
+
+    outcomes = BOUT_XPATHS["outcomes"](root)
+    bout_overall_item["RED_OUTCOME"] = outcomes[0].strip()
+    bout_overall_item["BLUE_OUTCOME"] = outcomes[1].strip()
+
+    bout_overall_item["BOUT_LONGNAME"] = [
+        x.strip() for x in BOUT_XPATHS["titles"](root) if x.strip()
+    ][0]
+
+    bonus_img_names = [x.split("/")[-1] for x in BOUT_XPATHS["bonus_img_srcs"](root)]
+    bout_overall_item["BOUT_PERF_BONUS"] = int(
+        any(x in ["perf.png", "sub.png", "ko.png"] for x in bonus_img_names)
+    )
+
+    method_info = BOUT_XPATHS["method_info"](root)
+    bout_overall_item["OUTCOME_METHOD"] = (
+        get_text(method_info[0]).replace("Method:", "").strip()
+    )
+
+    details = BOUT_XPATHS["details"](root)
+    method_details = " ".join(
+        get_text(details[1]).replace("Details:", "").strip().split()
+    )
+    bout_overall_item["OUTCOME_METHOD_DETAILS"] = (
+        method_details if method_details else None
+    )
+
+    time_format_info = BOUT_XPATHS["time_format_info"](root)
+    bout_overall_item["END_ROUND"] = int(
+        get_text(time_format_info[0]).replace("Round:", "").strip()
+    )
+    end_round_time_split = (
+        get_text(time_format_info[1]).replace("Time:", "").strip().split(":")
+    )
+    bout_overall_item["END_ROUND_TIME_SECONDS"] = int(
+        end_round_time_split[0]
+    ) * 60 + int(end_round_time_split[1])
+    bout_overall_item["BOUT_TIME_FORMAT"] = (
+        get_text(time_format_info[2]).replace("Time format:", "").strip()
+    )
+    total_time_seconds, per_round_times = total_time(
+        bout_overall_item["BOUT_TIME_FORMAT"],
+        bout_overall_item["END_ROUND"],
+        bout_overall_item["END_ROUND_TIME_SECONDS"],
+    )
+    bout_overall_item["TOTAL_TIME_SECONDS"] = total_time_seconds
+
+    assert len(per_round_times) == bout_overall_item["END_ROUND"]
+
+    tables = BOUT_XPATHS["tables"](root)
+    if tables:
+        stats_by_round_rows = BOUT_XPATHS["rows"](tables[1])
+        sig_stats_by_round_rows = BOUT_XPATHS["rows"](tables[3])
+
+        assert len(stats_by_round_rows) == len(sig_stats_by_round_rows)
+
+        # Walk the per-round totals and significant strikes tables together,
+        # one round (row of each table) at a time
+        for i, rows in enumerate(zip(stats_by_round_rows, sig_stats_by_round_rows)):
+            bout_round_item = UFCStatsBoutRoundItem()
+
+            bout_round_item["BOUT_ID"] = bout_overall_item["BOUT_ID"]
+            bout_round_item["ROUND"] = i + 1
+            bout_round_item["TIME_FOUGHT_SECONDS"] = per_round_times[i]
+
+            texts = [[x.strip() for x in BOUT_XPATHS["row_texts"](row)] for row in rows]
+            for table, position, convert, fields in ROUND_STAT_FIELDS:
+                value = convert(texts[table][position])
+                if len(fields) == 2:
+                    bout_round_item[fields[0]], bout_round_item[fields[1]] = value
+                else:
+                    bout_round_item[fields[0]] = value
+
+            yield bout_round_item
+
+    yield bout_overall_item
+
+
+def parse_sherdog_fighter(
+    response: HtmlResponse, outcome_map: Dict[str, str]
+) -> Iterator[Item]:
+    """
+    Parses the profile and pro fight history of a Sherdog fighter page
+    """
+
+    fighter_item = SherdogFighterItem()
+
+    fighter_id = int(response.url.split("/")[-1].split("-")[-1])
+    fighter_item["FIGHTER_ID"] = fighter_id
+
+    fighter_name = response.css(
+        "div.fighter-line1 > h1[itemprop='name'] > span.fn::text"
+    ).get()
+    fighter_item["FIGHTER_NAME"] = fighter_name
+
+    nick = response.css("div.fighter-line2 > h1[itemprop='name'] > span.nickname")
+    fighter_item["FIGHTER_NICKNAME"] = nick.css("em::text").get() if nick else None
+    fighter_item["NATIONALITY"] = response.css(
+        """div.fighter-nationality > span.item.birthplace > 
+        strong[itemprop='nationality']::text"""
+    ).get()
+
+    dob = response.css(
+        """div.fighter-data > div.bio-holder > table > tr > 
+        td > span[itemprop='birthDate']::text"""
+    ).get()
+    fighter_item["DATE_OF_BIRTH"] = (
+        pd.to_datetime(dob).strftime("%Y-%m-%d") if dob else None
+    )
+
+    height = response.css(
+        "div.fighter-data > div.bio-holder > table > tr > td > b[itemprop='height']::text"
+    ).get()
+    fighter_item["HEIGHT_INCHES"] = (
+        convert_height(height.replace("'", "' ")) if height else None
+    )
+
+    pro_fight_history_table = response.css(
+        "div.module.fight_history > div.new_table_holder > table.new_table.fighter"
+    )[0]
+    fight_history_rows = pro_fight_history_table.css("tr:not([class='table_head'])")
+    pro_debut_date = pd.to_datetime(
+        fight_history_rows[-1].css("td > span.sub_line::text").get()
+    ).strftime("%Y-%m-%d")
+    fighter_item["PRO_DEBUT_DATE"] = pro_debut_date
+
+    yield fighter_item
+
+    for fighter_bout_ordinal, row in enumerate(reversed(fight_history_rows)):
+        fighter_bout_history_item = SherdogFighterBoutHistoryItem()
+
+        fighter_bout_history_item["FIGHTER_ID"] = fighter_id
+        fighter_bout_history_item["FIGHTER_BOUT_ORDINAL"] = fighter_bout_ordinal
+
+        tds = row.css("td")
+
+        fighter_bout_history_item["OUTCOME"] = outcome_map[
+            tds[0].css("span.final_result::text").get().lower()
+        ]
+        fighter_bout_history_item["OPPONENT_ID"] = (
+            int(tds[1].css("a::attr(href)").get().split("/")[-1].split("-")[-1])
+            if tds[1].css("a::attr(href)").get().split("/")[-1].split("-")[-1]
+            != "javascript:void();"
+            else None
+        )
+        fighter_bout_history_item["OPPONENT_NAME"] = (
+            tds[1].css("a::text").get()
+            if tds[1].css("a::text").get() != "Unknown Fighter"
+            else None
+        )
+        fighter_bout_history_item["EVENT_ID"] = int(
+            tds[2].css("a::attr(href)").get().split("/")[-1].split("-")[-1]
+        )
+        fighter_bout_history_item["EVENT_NAME"] = w3lib.html.remove_tags(
+            tds[2].css("a").get()
+        )
+        fighter_bout_history_item["DATE"] = pd.to_datetime(
+            tds[2].css("span.sub_line::text").get()
+        ).strftime("%Y-%m-%d")
+
+        method_full = tds[3].css("b::text").get()
+        method_full = method_full if method_full and method_full != "N/A" else None
+        method_split = method_full.split(" (") if method_full else None
+        fighter_bout_history_item["OUTCOME_METHOD"] = (
+            method_split[0].replace("DG", "DQ").strip() if method_split else None
+        )
+        fighter_bout_history_item["OUTCOME_METHOD_DETAILS"] = (
+            method_split[1].replace(")", "")
+            if method_split and len(method_split) > 1
+            else None
+        )
+
+        end_round = int(tds[4].css("::text").get().strip())
+        fighter_bout_history_item["END_ROUND"] = end_round if end_round != 0 else None
+
+        end_round_time = tds[5].css("::text").get().strip()
+        end_round_time_split = (
+            end_round_time.split(":") if end_round_time not in ["N/A", "M/A"] else None
+        )
+
+        if end_round_time_split is not None and len(end_round_time_split) == 1:
+            end_round_time_split = [end_round_time_split[0], "00"]
+        elif end_round_time_split is not None and end_round_time_split[0] == "":
+            end_round_time_split = ["00", end_round_time_split[1]]
+
+        end_round_time_seconds = (
+            60 * int(end_round_time_split[0]) + int(end_round_time_split[1])
+            if end_round_time_split is not None
+            else None
+        )
+        fighter_bout_history_item["END_ROUND_TIME_SECONDS"] = end_round_time_seconds
+        fighter_bout_history_item["TOTAL_TIME_SECONDS"] = (
+            (300 * (end_round - 1) + end_round_time_seconds)
+            if end_round_time_seconds is not None and end_round != 0
+            else None
+        )
+
+        yield fighter_bout_history_item
@@ -0,0 +1,262 @@
+# standard library imports
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Type
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+# third party imports
+from scrapy import Item
+
+# local imports
+from src.databases import connection
+from src.scrapers.ufc_scrapy.items import (
+    FightMatrixFighterItem,
+    FightOddsIOFighterItem,
+    SherdogFighterBoutHistoryItem,
+    SherdogFighterItem,
+    UFCStatsBoutOverallItem,
+    UFCStatsBoutRoundItem,
+    UFCStatsFighterItem,
+)
+from src.scrapers.ufc_scrapy.scrapy_pipelines.fightmatrix_pipelines import (
+    FightMatrixFightersPipeline,
+)
+from src.scrapers.ufc_scrapy.scrapy_pipelines.fightoddsio_pipelines import (
+    FightOddsIOFightersPipeline,
+)
+from src.scrapers.ufc_scrapy.scrapy_pipelines.sherdog_pipelines import (
+    SherdogFighterBoutHistoryPipeline,
+    SherdogFightersPipeline,
+)
+from src.scrapers.ufc_scrapy.scrapy_pipelines.ufcstats_pipelines import (
+    UFCStatsCompletedBoutsPipeline,
+    UFCStatsFightersPipeline,
+)
+
+# Pipeline, spider it expects and the fighter item it stores
+FIGHTER_PIPELINES = {
+    "ufcstats": (
+        UFCStatsFightersPipeline,
+        "ufcstats_results_spider",
+        UFCStatsFighterItem,
+    ),
+    "fightoddsio": (
+        FightOddsIOFightersPipeline,
+        "fightoddsio_results_spider",
+        FightOddsIOFighterItem,
+    ),
+    "sherdog": (
+        SherdogFightersPipeline,
+        "sherdog_results_spider",
+        SherdogFighterItem,
+    ),
+    "fightmatrix": (
+        FightMatrixFightersPipeline,
+        "fightmatrix_results_spider",
+        FightMatrixFighterItem,
+    ),
+}
+
+
+class BenchmarkSpider:
+    """
+    Stands in for the spider a pipeline is opened with
+    """
+
+    def __init__(self, name: str, scrape_type: str) -> None:
+        """
+        Initialize BenchmarkSpider class
+        """
+
+        self.name = name
+        self.scrape_type = scrape_type
+
+
+def create_fighters(
+    item_cls: Type[Item], fighter_ids: Iterable[int], rng: random.Random
+) -> Iterator[Item]:
+    """
+    Create fighter items with random names, leaving the other fields empty
+    but for the Sherdog ID FightMatrix requires
+    """
+
+    for fighter_id in fighter_ids:
+        item = item_cls({field: None for field in item_cls.fields})
+        item["FIGHTER_ID"] = fighter_id
+        item["FIGHTER_NAME"] = f"Fighter {rng.randint(0, 10**6)}"
+        if "SHERDOG_FIGHTER_ID" in item_cls.fields:
+            item["SHERDOG_FIGHTER_ID"] = fighter_id
+        yield item
+
+
+def create_bout_histories(
+    fighter_ids: Iterable[int], bouts: int, rng: random.Random
+) -> Iterator[Item]:
+    """
+    Create a bout history of the given length for every fighter
+    """
+
+    for fighter_id in fighter_ids:
+        for ordinal in range(bouts):
+            item = SherdogFighterBoutHistoryItem(
+                {field: None for field in SherdogFighterBoutHistoryItem.fields}
+            )
+            item["FIGHTER_ID"] = fighter_id
+            item["FIGHTER_BOUT_ORDINAL"] = ordinal
+            item["EVENT_ID"] = rng.randint(0, 10**5)
+            item["EVENT_NAME"] = "Event"
+            item["OPPONENT_ID"] = rng.randint(0, 10**6)
+            item["OUTCOME"] = rng.choice(["W", "L"])
+            yield item
+
+
+def create_bouts(
+    bouts: int, rounds: int, bout_ids_to_flip: List[str], rng: random.Random
+) -> List[Item]:
+    """
+    Create the overall and per-round items of a full history of bouts with
+    random stats, twelve to an event, spreading the bouts to flip over it and
+    shuffling the items as concurrent bout pages would yield them
+    """
+
+    spacing = bouts // (len(bout_ids_to_flip) + 1)
+    items = []
+    for bout in range(bouts):
+        if bout % spacing == 0 and 0 < bout // spacing <= len(bout_ids_to_flip):
+            bout_id = bout_ids_to_flip[bout // spacing - 1]
+        else:
+            bout_id = f"b{bout:015d}"
+
+        item = UFCStatsBoutOverallItem(
+            {field: rng.randint(0, 9) for field in UFCStatsBoutOverallItem.fields}
+        )
+        item["BOUT_ID"] = bout_id
+        item["EVENT_ID"] = f"e{bout // 12:015d}"
+        item["DATE"] = f"{1994 + bout * 30 // bouts}-01-01"
+        item["BOUT_ORDINAL"] = bout % 12
+        items.append(item)
+
+        for round_number in range(1, rounds + 1):
+            item = UFCStatsBoutRoundItem(
+                {field: rng.randint(0, 60) for field in UFCStatsBoutRoundItem.fields}
+            )
+            item["BOUT_ID"] = bout_id
+            item["ROUND"] = round_number
+            items.append(item)
+
+    rng.shuffle(items)
+
+    return items
+
+
+def run_pipeline(
+    pipeline: Any, spider_name: str, scrape_type: str, items: Iterable[Item]
+) -> float:
+    """
+    Feed items through a pipeline, getting the seconds close_spider takes to
+    move the staged rows into its tables
+    """
+
+    spider = BenchmarkSpider(spider_name, scrape_type)
+    pipeline.open_spider(spider)
+    for item in items:
+        pipeline.process_item(item, spider)
+
+    start = time.perf_counter()
+    pipeline.close_spider(spider)
+
+    return time.perf_counter() - start
+
+
+def benchmark_fighters(
+    stored: int, batch: int, existing: int, history_bouts: int, seed: int
+) -> Dict[str, float]:
+    """
+    Store fighters through every fighters pipeline with a full scrape, then
+    time close_spider on a batch of which the given number are already stored,
+    and do the same for the Sherdog bout histories of those fighters
+    """
+
+    rng = random.Random(seed)
+    stored_ids = range(stored)
+    batch_ids = range(stored - existing, stored - existing + batch)
+
+    results = {}
+    for name, (pipeline_cls, spider_name, item_cls) in FIGHTER_PIPELINES.items():
+        run_pipeline(
+            pipeline_cls(),
+            spider_name,
+            "all",
+            create_fighters(item_cls, stored_ids, rng),
+        )
+        results[f"{name} fighters"] = run_pipeline(
+            pipeline_cls(),
+            spider_name,
+            "most_recent",
+            create_fighters(item_cls, batch_ids, rng),
+        )
+
+    run_pipeline(
+        SherdogFighterBoutHistoryPipeline(),
+        "sherdog_results_spider",
+        "all",
+        create_bout_histories(stored_ids, history_bouts, rng),
+    )
+    results["sherdog bout history"] = run_pipeline(
+        SherdogFighterBoutHistoryPipeline(),
+        "sherdog_results_spider",
+        "most_recent",
+        create_bout_histories(batch_ids, history_bouts, rng),
+    )
+
+    return results
+
+
+def benchmark_bouts(bouts: int, rounds: int, seed: int) -> Dict[str, float]:
+    """
+    Time close_spider of the UFC Stats completed bouts pipeline on a full
+    scrape of the bout history, corner flips included
+    """
+
+    rng = random.Random(seed)
+    pipeline = UFCStatsCompletedBoutsPipeline()
+    items = create_bouts(bouts, rounds, pipeline.bout_ids_to_flip, rng)
+
+    return {
+        "ufcstats bouts": run_pipeline(
+            pipeline, "ufcstats_results_spider", "all", items
+        )
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the set-based upserts and deletes of the fighter "
+        "pipelines and the full history close of the bouts pipeline on synthetic "
+        "data"
+    )
+    parser.add_argument("--stored", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--existing", type=int, default=5000)
+    parser.add_argument("--history-bouts", type=int, default=10)
+    parser.add_argument("--bouts", type=int, default=7500)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # The pipelines open their databases in a fresh data directory
+        connection.DATA_DIR = data_dir
+        results = benchmark_fighters(
+            args.stored, args.batch, args.existing, args.history_bouts, args.seed
+        )
+        results.update(benchmark_bouts(args.bouts, args.rounds, args.seed))
+
+    print(f"{'pipeline':<24}{'close_spider':>14}")
+    for name, seconds in results.items():
+        print(f"{name:<24}{seconds:>13.3f}s")
@@ -0,0 +1,198 @@
+# standard library imports
+import json
+import os
+from time import monotonic
+
+# third party imports
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+# local imports
+
+RATECONTROL_STATE_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "data", "ratecontrol.json"
+    )
+)
+
+
+class AdaptiveRateController:
+    """
+    Extension adapting the concurrency and download delay of each domain
+    (downloader slot) with AIMD, taking the place of hand-tuned concurrency,
+    delay and AutoThrottle settings. A 429, a 5xx or a latency above
+    ADAPTIVE_RATE_TARGET_LATENCY cuts the rate multiplicatively, halving the
+    concurrency, or doubling the delay once the concurrency is down to one,
+    honouring Retry-After. Every fast successful response first shrinks the
+    delay back towards ADAPTIVE_RATE_MIN_DELAY (by 10%, or at least
+    ADAPTIVE_RATE_DELAY_STEP) and then grows the concurrency additively, by
+    one per window of responses, up to ADAPTIVE_RATE_MAX_CONCURRENCY.
+    CONCURRENT_REQUESTS_PER_DOMAIN and DOWNLOAD_DELAY are the starting point
+    for domains without history, while the learned rates are saved to
+    ADAPTIVE_RATE_STATE_PATH and picked up by later runs.
+    """
+
+    BACKOFF_DELAY = 0.5  # first delay applied once the concurrency is at one
+
+    def __init__(self, crawler):
+        """
+        Initialize AdaptiveRateController class
+        """
+
+        settings = crawler.settings
+        if not settings.getbool("ADAPTIVE_RATE_ENABLED"):
+            raise NotConfigured
+
+        self.crawler = crawler
+        self.max_concurrency = settings.getint(
+            "ADAPTIVE_RATE_MAX_CONCURRENCY", settings.getint("CONCURRENT_REQUESTS")
+        )
+        self.min_delay = settings.getfloat("ADAPTIVE_RATE_MIN_DELAY", 0.0)
+        self.max_delay = settings.getfloat("ADAPTIVE_RATE_MAX_DELAY", 60.0)
+        self.delay_step = settings.getfloat("ADAPTIVE_RATE_DELAY_STEP", 0.05)
+        self.target_latency = settings.getfloat("ADAPTIVE_RATE_TARGET_LATENCY", 2.0)
+        self.state_path = settings.get(
+            "ADAPTIVE_RATE_STATE_PATH", RATECONTROL_STATE_PATH
+        )
+        self.states = {}
+        self.last_decrease = {}
+        self.latencies = {}
+
+        crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(
+            self.response_downloaded, signal=signals.response_downloaded
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def load_states(self):
+        """
+        Load the rates learned in previous runs
+        """
+
+        if not os.path.exists(self.state_path):
+            return {}
+
+        with open(self.state_path, "r") as f:
+            return json.load(f)
+
+    def clamp(self, state):
+        """
+        Keep a rate within the bounds of this spider
+        """
+
+        return {
+            "concurrency": min(
+                max(state["concurrency"], 1.0), float(self.max_concurrency)
+            ),
+            "delay": min(max(state["delay"], self.min_delay), self.max_delay),
+        }
+
+    def spider_opened(self, spider):
+        """
+        Seed the downloader slots with the learned rates, so the first
+        requests to a known domain already go out at that rate
+        """
+
+        downloader = self.crawler.engine.downloader
+        for key, state in self.load_states().items():
+            state = self.clamp(state)
+            slot_settings = downloader.per_slot_settings.setdefault(key, {})
+            slot_settings["concurrency"] = int(state["concurrency"])
+            slot_settings["delay"] = state["delay"]
+
+    def spider_closed(self, spider):
+        """
+        Save the rates of the domains used in this run, merged into those of
+        other spiders
+        """
+
+        states = self.load_states()
+        states.update(self.states)
+
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        temp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(states, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.state_path)
+
+        for key, state in self.states.items():
+            spider.logger.info(
+                f"Learned rate for {key}: concurrency {state['concurrency']:.1f}, "
+                f"delay {state['delay']:.2f}s"
+            )
+
+    def is_congested(self, response, latency):
+        """
+        Check whether a response signals that the domain is overloaded
+        """
+
+        return (
+            response.status == 429
+            or response.status >= 500
+            or latency > self.target_latency
+        )
+
+    def get_retry_after(self, response):
+        """
+        Get the Retry-After delay in seconds, ignoring HTTP dates
+        """
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is None:
+            return 0.0
+
+        try:
+            return float(retry_after.decode())
+        except ValueError:
+            return 0.0
+
+    def response_downloaded(self, response, request, spider):
+        """
+        Adjust the rate of the slot the response was downloaded through
+        """
+
+        key = request.meta.get("download_slot")
+        latency = request.meta.get("download_latency")
+        slot = self.crawler.engine.downloader.slots.get(key)
+        if slot is None or latency is None:
+            return
+
+        # Slots start from the learned rate if there is one
+        if key not in self.states:
+            self.states[key] = self.clamp(
+                {"concurrency": float(slot.concurrency), "delay": slot.delay}
+            )
+        state = self.states[key]
+
+        if response.status < 400:
+            # Smoothed latency of successful responses, errors are often faster
+            self.latencies[key] = 0.8 * self.latencies.get(key, latency) + 0.2 * latency
+
+        if self.is_congested(response, latency):
+            # Responses to requests sent before the last decrease say nothing
+            # about the new rate, so the rate is only cut once per round trip
+            now = monotonic()
+            round_trip = max(latency, self.latencies.get(key, 0.0))
+            if now - self.last_decrease.get(key, float("-inf")) < round_trip:
+                return
+            self.last_decrease[key] = now
+
+            if state["concurrency"] > 1:
+                state["concurrency"] = state["concurrency"] / 2
+            else:
+                state["delay"] = max(2 * state["delay"], self.BACKOFF_DELAY)
+            if response.status == 429:
+                state["delay"] = max(state["delay"], self.get_retry_after(response))
+        elif state["delay"] > self.min_delay:
+            state["delay"] = state["delay"] - max(0.1 * state["delay"], self.delay_step)
+        else:
+            # +1 concurrency per window of concurrency responses
+            state["concurrency"] = state["concurrency"] + 1 / state["concurrency"]
+
+        self.states[key] = state = self.clamp(state)
+        slot.concurrency = int(state["concurrency"])
+        slot.delay = state["delay"]
@@ -1,14 +1,14 @@
 # standard library imports
-import os
-import sqlite3
 
 # third party imports
-import pandas as pd
 
 # local imports
+from src.databases.connection import get_connection, retry_on_busy
 from src.databases.create_statements import (
+    CREATE_FIGHTMATRIX_BOUTS_INDEXES,
     CREATE_FIGHTMATRIX_BOUTS_TABLE,
     CREATE_FIGHTMATRIX_FIGHTERS_TABLE,
+    CREATE_FIGHTMATRIX_RANKINGS_INDEXES,
     CREATE_FIGHTMATRIX_RANKINGS_TABLE,
 )
 from src.scrapers.ufc_scrapy.items import (
@@ -16,6 +16,7 @@ from src.scrapers.ufc_scrapy.items import (
     FightMatrixFighterItem,
     FightMatrixRankingItem,
 )
+from src.scrapers.ufc_scrapy.staging import StagingWriter
 
 
 class FightMatrixFightersPipeline:
@@ -30,21 +31,10 @@ class FightMatrixFightersPipeline:
 
         self.scrape_type = None
 
-        self.fighters = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__),
-                "..",
-                "..",
-                "..",
-                "..",
-                "data",
-                "fightmatrix.db",
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("fightmatrix")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_FIGHTMATRIX_FIGHTERS_TABLE)
+        self.fighters = StagingWriter(self.conn, "FIGHTMATRIX_FIGHTERS")
 
     def open_spider(self, spider):
         """
@@ -60,16 +50,17 @@ class FightMatrixFightersPipeline:
         """
 
         if isinstance(item, FightMatrixFighterItem):
-            self.fighters.append(dict(item))
+            self.fighters.write(dict(item))
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Close the spider
         """
 
-        fighters_df = pd.DataFrame(self.fighters)
+        self.fighters.flush()
 
         if self.scrape_type == "all":
             self.cur.execute(
@@ -78,33 +69,10 @@ class FightMatrixFightersPipeline:
                   FIGHTMATRIX_FIGHTERS;
                 """
             )
-        else:
-            fighter_ids = fighters_df["FIGHTER_ID"].values.tolist()
-            old_ids = []
-            for fighter_id in fighter_ids:
-                res = self.cur.execute(
-                    """
-                    SELECT 
-                      FIGHTER_ID 
-                    FROM 
-                      FIGHTMATRIX_FIGHTERS 
-                    WHERE 
-                      FIGHTER_ID = ?;
-                    """,
-                    (fighter_id,),
-                ).fetchall()
-                if res:
-                    old_ids.append(fighter_id)
-            fighters_df = fighters_df[~fighters_df["FIGHTER_ID"].isin(old_ids)]
-
-        if fighters_df.shape[0]:
-            fighters_df.to_sql(
-                "FIGHTMATRIX_FIGHTERS",
-                self.conn,
-                if_exists="append",
-                index=False,
-            )
 
+        # Fighters already in the database are updated in place
+        self.fighters.upsert(["FIGHTER_ID"])
+        self.fighters.drop()
         self.conn.commit()
         self.conn.close()
 
@@ -119,21 +87,11 @@ class FightMatrixBoutsPipeline:
         Initialize pipeline object
         """
 
-        self.bouts = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__),
-                "..",
-                "..",
-                "..",
-                "..",
-                "data",
-                "fightmatrix.db",
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("fightmatrix")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_FIGHTMATRIX_BOUTS_TABLE)
+        self.cur.executescript(CREATE_FIGHTMATRIX_BOUTS_INDEXES)
+        self.bouts = StagingWriter(self.conn, "FIGHTMATRIX_BOUTS")
 
     def open_spider(self, spider):
         """
@@ -149,18 +107,17 @@ class FightMatrixBoutsPipeline:
         """
 
         if isinstance(item, FightMatrixBoutItem):
-            self.bouts.append(dict(item))
+            self.bouts.write(dict(item))
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Close the spider
         """
 
-        bouts_df = pd.DataFrame(self.bouts).sort_values(
-            by=["DATE", "EVENT_ID", "BOUT_ORDINAL"]
-        )
+        self.bouts.flush()
 
         flag = True
         if self.scrape_type == "all":
@@ -171,28 +128,44 @@ class FightMatrixBoutsPipeline:
                 """
             )
         else:
-            most_recent_event_id = int(bouts_df["EVENT_ID"].iloc[0])
             res = self.cur.execute(
                 """
                 SELECT 
-                  EVENT_ID 
+                  t1.EVENT_ID 
                 FROM 
-                  FIGHTMATRIX_BOUTS 
-                WHERE 
-                  EVENT_ID = ?;
-                """,
-                (most_recent_event_id,),
+                  FIGHTMATRIX_BOUTS AS t1 
+                  INNER JOIN (
+                    SELECT 
+                      EVENT_ID 
+                    FROM 
+                      FIGHTMATRIX_BOUTS_STAGING 
+                    ORDER BY 
+                      DATE, 
+                      EVENT_ID, 
+                      BOUT_ORDINAL 
+                    LIMIT 
+                      1
+                  ) AS t2 ON t1.EVENT_ID = t2.EVENT_ID;
+                """
             ).fetchall()
             flag = len(res) == 0
 
         if flag:
-            bouts_df.to_sql(
-                "FIGHTMATRIX_BOUTS",
-                self.conn,
-                if_exists="append",
-                index=False,
+            self.cur.execute(
+                """
+                INSERT INTO FIGHTMATRIX_BOUTS 
+                SELECT 
+                  * 
+                FROM 
+                  FIGHTMATRIX_BOUTS_STAGING 
+                ORDER BY 
+                  DATE, 
+                  EVENT_ID, 
+                  BOUT_ORDINAL;
+                """
             )
 
+        self.bouts.drop()
         self.conn.commit()
         self.conn.close()
 
@@ -209,21 +182,11 @@ class FightMatrixRankingsPipeline:
 
         self.scrape_type = None
 
-        self.rankings = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__),
-                "..",
-                "..",
-                "..",
-                "..",
-                "data",
-                "fightmatrix.db",
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("fightmatrix")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_FIGHTMATRIX_RANKINGS_TABLE)
+        self.cur.executescript(CREATE_FIGHTMATRIX_RANKINGS_INDEXES)
+        self.rankings = StagingWriter(self.conn, "FIGHTMATRIX_RANKINGS")
 
     def open_spider(self, spider):
         """
@@ -239,30 +202,17 @@ class FightMatrixRankingsPipeline:
         """
 
         if isinstance(item, FightMatrixRankingItem):
-            self.rankings.append(dict(item))
+            self.rankings.write(dict(item))
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Close the spider
         """
 
-        rankings_df = (
-            pd.DataFrame(self.rankings)
-            .drop_duplicates()
-            .sort_values(by=["ISSUE_DATE", "WEIGHT_CLASS", "RANK"])
-        )
-        fighters_df = pd.read_sql(
-            """
-            SELECT
-              FIGHTER_ID,
-              UFC_DEBUT_DATE
-            FROM
-              FIGHTMATRIX_FIGHTERS;
-            """,
-            self.conn,
-        )
+        self.rankings.flush()
 
         flag = True
         if self.scrape_type == "all":
@@ -273,7 +223,6 @@ class FightMatrixRankingsPipeline:
                 """
             )
         elif self.scrape_type == "most_recent":
-            most_recent_issue_date = rankings_df["ISSUE_DATE"].iloc[0]
             res = self.cur.execute(
                 """
                 SELECT 
@@ -281,31 +230,35 @@ class FightMatrixRankingsPipeline:
                 FROM 
                   FIGHTMATRIX_RANKINGS 
                 WHERE 
-                  ISSUE_DATE = ?;
-                """,
-                (most_recent_issue_date,),
+                  ISSUE_DATE = (
+                    SELECT 
+                      MIN(ISSUE_DATE) 
+                    FROM 
+                      FIGHTMATRIX_RANKINGS_STAGING
+                  );
+                """
             ).fetchall()
             flag = len(res) == 0
 
         if flag:
-            rankings_df = rankings_df.merge(
-                fighters_df,
-                how="inner",
-                on="FIGHTER_ID",
-            )
-
-            rankings_df_filtered = rankings_df.loc[
-                pd.to_datetime(rankings_df["ISSUE_DATE"])
-                >= pd.to_datetime(rankings_df["UFC_DEBUT_DATE"])
-            ]
-            rankings_df_filtered = rankings_df_filtered.drop(columns=["UFC_DEBUT_DATE"])
-
-            rankings_df_filtered.to_sql(
-                "FIGHTMATRIX_RANKINGS",
-                self.conn,
-                if_exists="append",
-                index=False,
+            # Rankings from before a fighter's UFC debut are left out
+            self.cur.execute(
+                """
+                INSERT INTO FIGHTMATRIX_RANKINGS 
+                SELECT 
+                  DISTINCT t1.* 
+                FROM 
+                  FIGHTMATRIX_RANKINGS_STAGING AS t1 
+                  INNER JOIN FIGHTMATRIX_FIGHTERS AS t2 ON t1.FIGHTER_ID = t2.FIGHTER_ID 
+                WHERE 
+                  t1.ISSUE_DATE >= t2.UFC_DEBUT_DATE 
+                ORDER BY 
+                  t1.ISSUE_DATE, 
+                  t1.WEIGHT_CLASS, 
+                  t1.RANK;
+                """
             )
 
+        self.rankings.drop()
         self.conn.commit()
         self.conn.close()
@@ -1,6 +1,4 @@
 # standard library imports
-import os
-import sqlite3
 
 # third party imports
 import pandas as pd
@@ -8,8 +6,14 @@ from itemadapter.adapter import ItemAdapter
 from scrapy.exceptions import DropItem
 
 # local imports
+from src.databases.connection import get_connection, retry_on_busy
 from src.databases.create_statements import (
+    CREATE_FIGHTODDSIO_BACKFILL_EVENTS_TABLE,
+    CREATE_FIGHTODDSIO_BACKFILL_STATE_TABLE,
+    CREATE_FIGHTODDSIO_BOUTS_INDEXES,
     CREATE_FIGHTODDSIO_BOUTS_TABLE,
+    CREATE_FIGHTODDSIO_FIGHTER_NAME_KEYS_INDEXES,
+    CREATE_FIGHTODDSIO_FIGHTER_NAME_KEYS_TABLE,
     CREATE_FIGHTODDSIO_FIGHTERS_TABLE,
     CREATE_FIGHTODDSIO_UPCOMING_TABLE,
 )
@@ -19,6 +23,8 @@ from src.scrapers.ufc_scrapy.items import (
     FightOddsIOFighterItem,
     FightOddsIOUpcomingBoutItem,
 )
+from src.scrapers.ufc_scrapy.staging import StagingWriter
+from src.scrapers.ufc_scrapy.utils import create_name_keys
 
 
 class FightOddsIOFightersPipeline:
@@ -33,22 +39,13 @@ class FightOddsIOFightersPipeline:
 
         self.scrape_type = None
 
-        self.fighters = []
         self.fighter_slugs_seen = set()
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__),
-                "..",
-                "..",
-                "..",
-                "..",
-                "data",
-                "fightoddsio.db",
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("fightoddsio")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_FIGHTODDSIO_FIGHTERS_TABLE)
+        self.cur.execute(CREATE_FIGHTODDSIO_FIGHTER_NAME_KEYS_TABLE)
+        self.cur.executescript(CREATE_FIGHTODDSIO_FIGHTER_NAME_KEYS_INDEXES)
+        self.fighters = StagingWriter(self.conn, "FIGHTODDSIO_FIGHTERS")
 
     def open_spider(self, spider):
         """
@@ -65,16 +62,17 @@ class FightOddsIOFightersPipeline:
                 raise DropItem("Duplicate fighter")
             else:
                 self.fighter_slugs_seen.add(adapter["FIGHTER_ID"])
-                self.fighters.append(dict(item))
+                self.fighters.write(dict(item))
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Insert the scraped data into the database and close the spider
         """
 
-        fighters_df = pd.DataFrame(self.fighters)
+        self.fighters.flush()
 
         if self.scrape_type == "all":
             self.cur.execute(
@@ -83,28 +81,36 @@ class FightOddsIOFightersPipeline:
                   FIGHTODDSIO_FIGHTERS;
                 """
             )
-        else:
-            fighter_ids = fighters_df["FIGHTER_ID"].values.tolist()
-            old_slugs = []
-            for fighter_id in fighter_ids:
-                res = self.cur.execute(
-                    """
-                    SELECT 
-                      FIGHTER_ID
-                    FROM 
-                      FIGHTODDSIO_FIGHTERS 
-                    WHERE 
-                      FIGHTER_ID = ?;
-                    """,
-                    (fighter_id,),
-                ).fetchall()
-                if res:
-                    old_slugs.append(fighter_id)
-            fighters_df = fighters_df[~fighters_df["FIGHTER_ID"].isin(old_slugs)]
-
-        if fighters_df.shape[0]:
-            fighters_df.to_sql(
-                "FIGHTODDSIO_FIGHTERS",
+            self.cur.execute(
+                """
+                DELETE FROM 
+                  FIGHTODDSIO_FIGHTER_NAME_KEYS;
+                """
+            )
+
+        # Fighters already in the database are updated in place, and their
+        # name keys rebuilt below
+        self.fighters.upsert(["FIGHTER_ID"])
+        self.fighters.delete_matching(["FIGHTER_ID"], "FIGHTODDSIO_FIGHTER_NAME_KEYS")
+        self.fighters.drop()
+
+        # Keep the name keys in step with the fighters, including any that
+        # were inserted before the keys table existed
+        missing_keys_df = pd.read_sql(
+            """
+            SELECT 
+              t1.* 
+            FROM 
+              FIGHTODDSIO_FIGHTERS AS t1 
+              LEFT JOIN FIGHTODDSIO_FIGHTER_NAME_KEYS AS t2 ON t1.FIGHTER_ID = t2.FIGHTER_ID 
+            WHERE 
+              t2.FIGHTER_ID IS NULL;
+            """,
+            self.conn,
+        )
+        if missing_keys_df.shape[0]:
+            create_name_keys(missing_keys_df).to_sql(
+                "FIGHTODDSIO_FIGHTER_NAME_KEYS",
                 self.conn,
                 if_exists="append",
                 index=False,
@@ -126,22 +132,18 @@ class FightOddsIOCompletedBoutsPipeline:
 
         self.scrape_type = None
 
-        self.bouts = []
-        self.bout_odds = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__),
-                "..",
-                "..",
-                "..",
-                "..",
-                "data",
-                "fightoddsio.db",
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("fightoddsio")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_FIGHTODDSIO_BOUTS_TABLE)
+        self.cur.executescript(CREATE_FIGHTODDSIO_BOUTS_INDEXES)
+        self.cur.execute(CREATE_FIGHTODDSIO_BACKFILL_STATE_TABLE)
+        self.cur.execute(CREATE_FIGHTODDSIO_BACKFILL_EVENTS_TABLE)
+        self.bouts = StagingWriter(self.conn, "FIGHTODDSIO_BOUTS")
+        self.bout_odds = StagingWriter(
+            self.conn,
+            "FIGHTODDSIO_BOUT_ODDS",
+            columns=["BOUT_SLUG", "FIGHTER_1_ODDS", "FIGHTER_2_ODDS"],
+        )
 
     def open_spider(self, spider):
         """
@@ -157,21 +159,48 @@ class FightOddsIOCompletedBoutsPipeline:
         """
 
         if isinstance(item, FightOddsIOBoutItem):
-            self.bouts.append(dict(item))
+            self.bouts.write(dict(item))
         elif isinstance(item, FightOddsIOClosingOddsItem):
-            self.bout_odds.append(dict(item))
+            self.bout_odds.write(dict(item))
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Insert the scraped data into the database and close the spider
         """
 
-        bouts_df = pd.DataFrame(self.bouts).sort_values(
-            by=["DATE", "EVENT_SLUG", "BOUT_ORDINAL"]
-        )
-        odds_df = pd.DataFrame(self.bout_odds)
+        self.bouts.flush()
+        self.bout_odds.flush()
+
+        if self.scrape_type == "backfill":
+            # Saved in the same transaction as the bouts, so the progress
+            # never gets ahead of the stored data
+            date_lt, end_cursor, completed_events = spider.get_backfill_state()
+            self.cur.executemany(
+                """
+                INSERT OR IGNORE INTO FIGHTODDSIO_BACKFILL_EVENTS (EVENT_PK, EVENT_SLUG) 
+                VALUES 
+                  (?, ?);
+                """,
+                completed_events,
+            )
+            self.cur.execute(
+                """
+                INSERT OR REPLACE INTO FIGHTODDSIO_BACKFILL_STATE (STATE_ID, DATE_LT, END_CURSOR) 
+                VALUES 
+                  (1, ?, ?);
+                """,
+                (date_lt, end_cursor),
+            )
+
+        if not self.bouts.row_count:
+            self.bouts.drop()
+            self.bout_odds.drop()
+            self.conn.commit()
+            self.conn.close()
+            return
 
         flag = True
         if self.scrape_type == "all":
@@ -181,31 +210,84 @@ class FightOddsIOCompletedBoutsPipeline:
                   FIGHTODDSIO_BOUTS;
                 """
             )
+        elif self.scrape_type == "backfill":
+            # Events with failed requests are left out, so they are scraped
+            # again when the backfill resumes
+            self.cur.execute(
+                """
+                DELETE FROM 
+                  FIGHTODDSIO_BOUTS_STAGING 
+                WHERE 
+                  EVENT_SLUG NOT IN (
+                    SELECT 
+                      EVENT_SLUG 
+                    FROM 
+                      FIGHTODDSIO_BACKFILL_EVENTS
+                  ) 
+                  OR EVENT_SLUG IN (
+                    SELECT 
+                      EVENT_SLUG 
+                    FROM 
+                      FIGHTODDSIO_BOUTS
+                  );
+                """
+            )
         else:
-            most_recent_event_slug = bouts_df["EVENT_SLUG"].iloc[0]
             res = self.cur.execute(
                 """
                 SELECT 
-                  EVENT_SLUG 
+                  t1.EVENT_SLUG 
                 FROM 
-                  FIGHTODDSIO_BOUTS 
-                WHERE 
-                  EVENT_SLUG = ?;
-                """,
-                (most_recent_event_slug,),
+                  FIGHTODDSIO_BOUTS AS t1 
+                  INNER JOIN (
+                    SELECT 
+                      EVENT_SLUG 
+                    FROM 
+                      FIGHTODDSIO_BOUTS_STAGING 
+                    ORDER BY 
+                      DATE, 
+                      EVENT_SLUG, 
+                      BOUT_ORDINAL 
+                    LIMIT 
+                      1
+                  ) AS t2 ON t1.EVENT_SLUG = t2.EVENT_SLUG;
+                """
             ).fetchall()
             flag = len(res) == 0
 
         if flag:
-            bouts_with_odds_df = bouts_df.merge(odds_df, how="left", on="BOUT_SLUG")
-
-            bouts_with_odds_df.to_sql(
-                "FIGHTODDSIO_BOUTS",
-                self.conn,
-                if_exists="append",
-                index=False,
+            self.cur.execute(
+                """
+                UPDATE 
+                  FIGHTODDSIO_BOUTS_STAGING 
+                SET 
+                  (FIGHTER_1_ODDS, FIGHTER_2_ODDS) = (
+                    SELECT 
+                      t1.FIGHTER_1_ODDS, 
+                      t1.FIGHTER_2_ODDS 
+                    FROM 
+                      FIGHTODDSIO_BOUT_ODDS_STAGING AS t1 
+                    WHERE 
+                      t1.BOUT_SLUG = FIGHTODDSIO_BOUTS_STAGING.BOUT_SLUG
+                  );
+                """
+            )
+            self.cur.execute(
+                """
+                INSERT INTO FIGHTODDSIO_BOUTS 
+                SELECT 
+                  * 
+                FROM 
+                  FIGHTODDSIO_BOUTS_STAGING 
+                ORDER BY 
+                  DATE, 
+                  EVENT_SLUG, 
+                  BOUT_ORDINAL;
+                """
             )
 
+        self.bouts.drop()
+        self.bout_odds.drop()
         self.conn.commit()
         self.conn.close()
 
@@ -221,18 +303,7 @@ class FightOddsIOUpcomingBoutsPipeline:
         """
 
         self.upcoming_bouts = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__),
-                "..",
-                "..",
-                "..",
-                "..",
-                "data",
-                "fightoddsio.db",
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("fightoddsio")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_FIGHTODDSIO_UPCOMING_TABLE)
 
@@ -253,6 +324,7 @@ class FightOddsIOUpcomingBoutsPipeline:
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Insert the scraped data into the database and close the spider
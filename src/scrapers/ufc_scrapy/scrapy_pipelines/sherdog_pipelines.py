@@ -1,14 +1,17 @@
 # standard library imports
-import os
-import sqlite3
 
 # third party imports
 import pandas as pd
 
 # local imports
+from src.databases.connection import get_connection, retry_on_busy
 from src.databases.create_statements import (
+    CREATE_SHERDOG_BOUT_HISTORY_INDEXES,
     CREATE_SHERDOG_BOUT_HISTORY_TABLE,
+    CREATE_SHERDOG_BOUTS_INDEXES,
     CREATE_SHERDOG_BOUTS_TABLE,
+    CREATE_SHERDOG_FIGHTER_NAME_KEYS_INDEXES,
+    CREATE_SHERDOG_FIGHTER_NAME_KEYS_TABLE,
     CREATE_SHERDOG_FIGHTERS_TABLE,
 )
 from src.scrapers.ufc_scrapy.items import (
@@ -16,6 +19,8 @@ from src.scrapers.ufc_scrapy.items import (
     SherdogFighterBoutHistoryItem,
     SherdogFighterItem,
 )
+from src.scrapers.ufc_scrapy.staging import StagingWriter
+from src.scrapers.ufc_scrapy.utils import create_name_keys
 
 
 class SherdogFightersPipeline:
@@ -30,15 +35,12 @@ class SherdogFightersPipeline:
 
         self.scrape_type = None
 
-        self.fighters = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__), "..", "..", "..", "..", "data", "sherdog.db"
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("sherdog")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_SHERDOG_FIGHTERS_TABLE)
+        self.cur.execute(CREATE_SHERDOG_FIGHTER_NAME_KEYS_TABLE)
+        self.cur.executescript(CREATE_SHERDOG_FIGHTER_NAME_KEYS_INDEXES)
+        self.fighters = StagingWriter(self.conn, "SHERDOG_FIGHTERS")
 
     def open_spider(self, spider):
         """
@@ -54,16 +56,17 @@ class SherdogFightersPipeline:
         """
 
         if isinstance(item, SherdogFighterItem):
-            self.fighters.append(dict(item))
+            self.fighters.write(dict(item))
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Insert the scraped data into the database and close the spider
         """
 
-        fighters_df = pd.DataFrame(self.fighters)
+        self.fighters.flush()
 
         if self.scrape_type == "all":
             self.cur.execute(
@@ -72,28 +75,36 @@ class SherdogFightersPipeline:
                   SHERDOG_FIGHTERS;
                 """
             )
-        else:
-            fighter_ids = fighters_df["FIGHTER_ID"].values.tolist()
-            old_ids = []
-            for fighter_id in fighter_ids:
-                res = self.cur.execute(
-                    """
-                    SELECT 
-                      FIGHTER_ID 
-                    FROM 
-                      SHERDOG_FIGHTERS 
-                    WHERE 
-                      FIGHTER_ID = ?;
-                    """,
-                    (fighter_id,),
-                ).fetchall()
-                if res:
-                    old_ids.append(fighter_id)
-            fighters_df = fighters_df[~fighters_df["FIGHTER_ID"].isin(old_ids)]
-
-        if fighters_df.shape[0]:
-            fighters_df.to_sql(
-                "SHERDOG_FIGHTERS",
+            self.cur.execute(
+                """
+                DELETE FROM 
+                  SHERDOG_FIGHTER_NAME_KEYS;
+                """
+            )
+
+        # Fighters already in the database are updated in place, and their
+        # name keys rebuilt below
+        self.fighters.upsert(["FIGHTER_ID"])
+        self.fighters.delete_matching(["FIGHTER_ID"], "SHERDOG_FIGHTER_NAME_KEYS")
+        self.fighters.drop()
+
+        # Keep the name keys in step with the fighters, including any that
+        # were inserted before the keys table existed
+        missing_keys_df = pd.read_sql(
+            """
+            SELECT 
+              t1.* 
+            FROM 
+              SHERDOG_FIGHTERS AS t1 
+              LEFT JOIN SHERDOG_FIGHTER_NAME_KEYS AS t2 ON t1.FIGHTER_ID = t2.FIGHTER_ID 
+            WHERE 
+              t2.FIGHTER_ID IS NULL;
+            """,
+            self.conn,
+        )
+        if missing_keys_df.shape[0]:
+            create_name_keys(missing_keys_df).to_sql(
+                "SHERDOG_FIGHTER_NAME_KEYS",
                 self.conn,
                 if_exists="append",
                 index=False,
@@ -115,15 +126,11 @@ class SherdogCompletedBoutsPipeline:
 
         self.scrape_type = None
 
-        self.bouts = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__), "..", "..", "..", "..", "data", "sherdog.db"
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("sherdog")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_SHERDOG_BOUTS_TABLE)
+        self.cur.executescript(CREATE_SHERDOG_BOUTS_INDEXES)
+        self.bouts = StagingWriter(self.conn, "SHERDOG_BOUTS")
 
     def open_spider(self, spider):
         """
@@ -139,18 +146,17 @@ class SherdogCompletedBoutsPipeline:
         """
 
         if isinstance(item, SherdogBoutItem):
-            self.bouts.append(dict(item))
+            self.bouts.write(dict(item))
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Insert the scraped data into the database and close the spider
         """
 
-        bouts_df = pd.DataFrame(self.bouts).sort_values(
-            by=["DATE", "EVENT_ID", "BOUT_ORDINAL"]
-        )
+        self.bouts.flush()
 
         flag = True
         if self.scrape_type == "all":
@@ -161,28 +167,44 @@ class SherdogCompletedBoutsPipeline:
                 """
             )
         else:
-            most_recent_event_id = int(bouts_df["EVENT_ID"].iloc[0])
             res = self.cur.execute(
                 """
                 SELECT 
-                  EVENT_ID 
+                  t1.EVENT_ID 
                 FROM 
-                  SHERDOG_BOUTS 
-                WHERE 
-                  EVENT_ID = ?;
-                """,
-                (most_recent_event_id,),
+                  SHERDOG_BOUTS AS t1 
+                  INNER JOIN (
+                    SELECT 
+                      EVENT_ID 
+                    FROM 
+                      SHERDOG_BOUTS_STAGING 
+                    ORDER BY 
+                      DATE, 
+                      EVENT_ID, 
+                      BOUT_ORDINAL 
+                    LIMIT 
+                      1
+                  ) AS t2 ON t1.EVENT_ID = t2.EVENT_ID;
+                """
             ).fetchall()
             flag = len(res) == 0
 
         if flag:
-            bouts_df.to_sql(
-                "SHERDOG_BOUTS",
-                self.conn,
-                if_exists="append",
-                index=False,
+            self.cur.execute(
+                """
+                INSERT INTO SHERDOG_BOUTS 
+                SELECT 
+                  * 
+                FROM 
+                  SHERDOG_BOUTS_STAGING 
+                ORDER BY 
+                  DATE, 
+                  EVENT_ID, 
+                  BOUT_ORDINAL;
+                """
             )
 
+        self.bouts.drop()
         self.conn.commit()
         self.conn.close()
 
@@ -197,15 +219,11 @@ class SherdogFighterBoutHistoryPipeline:
         Initialize pipeline object
         """
 
-        self.bout_history = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__), "..", "..", "..", "..", "data", "sherdog.db"
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("sherdog")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_SHERDOG_BOUT_HISTORY_TABLE)
+        self.cur.executescript(CREATE_SHERDOG_BOUT_HISTORY_INDEXES)
+        self.bout_history = StagingWriter(self.conn, "SHERDOG_BOUT_HISTORY")
 
     def open_spider(self, spider):
         """
@@ -221,18 +239,17 @@ class SherdogFighterBoutHistoryPipeline:
         """
 
         if isinstance(item, SherdogFighterBoutHistoryItem):
-            self.bout_history.append(dict(item))
+            self.bout_history.write(dict(item))
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Insert the scraped data into the database and close the spider
         """
 
-        bout_history_df = pd.DataFrame(self.bout_history).sort_values(
-            by=["FIGHTER_ID", "FIGHTER_BOUT_ORDINAL"]
-        )
+        self.bout_history.flush()
 
         if self.scrape_type == "all":
             self.cur.execute(
@@ -242,24 +259,21 @@ class SherdogFighterBoutHistoryPipeline:
                 """
             )
         else:
-            fighter_ids = bout_history_df["FIGHTER_ID"].unique().tolist()
-            for fighter_id in fighter_ids:
-                self.cur.execute(
-                    """
-                    DELETE FROM 
-                      SHERDOG_BOUT_HISTORY 
-                    WHERE 
-                      FIGHTER_ID = ?;
-                    """,
-                    (fighter_id,),
-                )
-
-        bout_history_df.to_sql(
-            "SHERDOG_BOUT_HISTORY",
-            self.conn,
-            if_exists="append",
-            index=False,
+            # The histories of the scraped fighters are replaced
+            self.bout_history.delete_matching(["FIGHTER_ID"])
+
+        self.cur.execute(
+            """
+            INSERT INTO SHERDOG_BOUT_HISTORY 
+            SELECT 
+              * 
+            FROM 
+              SHERDOG_BOUT_HISTORY_STAGING 
+            ORDER BY 
+              FIGHTER_ID, 
+              FIGHTER_BOUT_ORDINAL;
+            """
         )
-
+        self.bout_history.drop()
         self.conn.commit()
         self.conn.close()
@@ -1,14 +1,16 @@
 # standard library imports
-import os
-import sqlite3
 
 # third party imports
 import pandas as pd
 
 # local imports
+from src.databases.connection import get_connection, retry_on_busy
 from src.databases.create_statements import (
     CREATE_UFCSTATS_BOUTS_BY_ROUND_TABLE,
+    CREATE_UFCSTATS_BOUTS_OVERALL_INDEXES,
     CREATE_UFCSTATS_BOUTS_OVERALL_TABLE,
+    CREATE_UFCSTATS_FIGHTER_NAME_KEYS_INDEXES,
+    CREATE_UFCSTATS_FIGHTER_NAME_KEYS_TABLE,
     CREATE_UFCSTATS_FIGHTERS_TABLE,
     CREATE_UFCSTATS_UPCOMING_TABLE,
 )
@@ -18,6 +20,8 @@ from src.scrapers.ufc_scrapy.items import (
     UFCStatsFighterItem,
     UFCStatsUpcomingBoutItem,
 )
+from src.scrapers.ufc_scrapy.staging import StagingWriter
+from src.scrapers.ufc_scrapy.utils import create_name_keys
 
 
 class UFCStatsFightersPipeline:
@@ -32,15 +36,12 @@ class UFCStatsFightersPipeline:
 
         self.scrape_type = None
 
-        self.fighters = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__), "..", "..", "..", "..", "data", "ufcstats.db"
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("ufcstats")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_UFCSTATS_FIGHTERS_TABLE)
+        self.cur.execute(CREATE_UFCSTATS_FIGHTER_NAME_KEYS_TABLE)
+        self.cur.executescript(CREATE_UFCSTATS_FIGHTER_NAME_KEYS_INDEXES)
+        self.fighters = StagingWriter(self.conn, "UFCSTATS_FIGHTERS")
 
     def open_spider(self, spider):
         """
@@ -56,41 +57,45 @@ class UFCStatsFightersPipeline:
         """
 
         if isinstance(item, UFCStatsFighterItem):
-            self.fighters.append(dict(item))
+            self.fighters.write(dict(item))
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Insert the scraped data into the database and close the spider
         """
 
-        fighters_df = pd.DataFrame(self.fighters)
+        self.fighters.flush()
 
         if self.scrape_type == "all":
             self.cur.execute("DELETE FROM UFCSTATS_FIGHTERS")
-        else:
-            fighter_ids = fighters_df["FIGHTER_ID"].values.tolist()
-            old_ids = []
-            for fighter_id in fighter_ids:
-                res = self.cur.execute(
-                    """
-                    SELECT 
-                      FIGHTER_ID 
-                    FROM 
-                      UFCSTATS_FIGHTERS 
-                    WHERE 
-                      FIGHTER_ID = ?;
-                    """,
-                    (fighter_id,),
-                ).fetchall()
-                if res:
-                    old_ids.append(fighter_id)
-            fighters_df = fighters_df[~fighters_df["FIGHTER_ID"].isin(old_ids)]
-
-        if fighters_df.shape[0]:
-            fighters_df.to_sql(
-                "UFCSTATS_FIGHTERS",
+            self.cur.execute("DELETE FROM UFCSTATS_FIGHTER_NAME_KEYS")
+
+        # Fighters already in the database are updated in place, and their
+        # name keys rebuilt below
+        self.fighters.upsert(["FIGHTER_ID"])
+        self.fighters.delete_matching(["FIGHTER_ID"], "UFCSTATS_FIGHTER_NAME_KEYS")
+        self.fighters.drop()
+
+        # Keep the name keys in step with the fighters, including any that
+        # were inserted before the keys table existed
+        missing_keys_df = pd.read_sql(
+            """
+            SELECT 
+              t1.* 
+            FROM 
+              UFCSTATS_FIGHTERS AS t1 
+              LEFT JOIN UFCSTATS_FIGHTER_NAME_KEYS AS t2 ON t1.FIGHTER_ID = t2.FIGHTER_ID 
+            WHERE 
+              t2.FIGHTER_ID IS NULL;
+            """,
+            self.conn,
+        )
+        if missing_keys_df.shape[0]:
+            create_name_keys(missing_keys_df).to_sql(
+                "UFCSTATS_FIGHTER_NAME_KEYS",
                 self.conn,
                 if_exists="append",
                 index=False,
@@ -112,17 +117,17 @@ class UFCStatsCompletedBoutsPipeline:
 
         self.scrape_type = None
 
-        self.bouts_overall = []
-        self.bouts_by_round = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__), "..", "..", "..", "..", "data", "ufcstats.db"
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("ufcstats")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_UFCSTATS_BOUTS_OVERALL_TABLE)
+        self.cur.executescript(CREATE_UFCSTATS_BOUTS_OVERALL_INDEXES)
         self.cur.execute(CREATE_UFCSTATS_BOUTS_BY_ROUND_TABLE)
+        self.bouts_overall = StagingWriter(
+            self.conn, "UFCSTATS_BOUTS_OVERALL", transform=self.flip_bouts_overall
+        )
+        self.bouts_by_round = StagingWriter(
+            self.conn, "UFCSTATS_BOUTS_BY_ROUND", transform=self.flip_bouts_by_round
+        )
 
         self.bout_ids_to_flip = [
             "ca93e3f69fa3d725",
@@ -158,49 +163,33 @@ class UFCStatsCompletedBoutsPipeline:
         """
 
         if isinstance(item, UFCStatsBoutOverallItem):
-            self.bouts_overall.append(dict(item))
+            self.bouts_overall.write(dict(item))
         elif isinstance(item, UFCStatsBoutRoundItem):
-            self.bouts_by_round.append(dict(item))
+            self.bouts_by_round.write(dict(item))
 
         return item
 
-    def close_spider(self, spider):
+    def swap_corners(self, df, swap_map):
         """
-        Insert the scraped data into the database and close the spider
+        Swap the red and blue columns of the rows of the bouts to flip, as one
+        assignment of the column arrays
         """
 
-        bouts_overall_df = (
-            pd.DataFrame(self.bouts_overall)
-            .sort_values(by=["DATE", "EVENT_ID", "BOUT_ORDINAL"])
-            .reset_index(drop=True)
-        )
-        bout_ids = bouts_overall_df["BOUT_ID"].values.tolist()
-        bouts_by_round_df = (
-            pd.DataFrame(self.bouts_by_round)
-            .sort_values(
-                by=["BOUT_ID", "ROUND"],
-                key=lambda x: (
-                    x if x.name != "BOUT_ID" else x.map(lambda e: bout_ids.index(e))
-                ),
-            )
-            .reset_index(drop=True)
-        )
+        flip_mask = df["BOUT_ID"].isin(self.bout_ids_to_flip).to_numpy()
+        if flip_mask.any():
+            columns = list(swap_map)
+            df.loc[flip_mask, columns] = df.loc[
+                flip_mask, [swap_map[column] for column in columns]
+            ].to_numpy()
 
-        flag = True
-        if self.scrape_type == "all":
-            self.cur.execute(
-                """
-                DELETE FROM 
-                  UFCSTATS_BOUTS_OVERALL;
-                """
-            )
-            self.cur.execute(
-                """
-                DELETE FROM 
-                  UFCSTATS_BOUTS_BY_ROUND;
-                """
-            )
+        return df
 
+    def flip_bouts_overall(self, bouts_overall_df):
+        """
+        Swap the corners of bouts listed with the fighters the wrong way round
+        """
+
+        if self.scrape_type in ["all", "incremental"]:
             swap_map_overall = {
                 "RED_FIGHTER_ID": "BLUE_FIGHTER_ID",
                 "BLUE_FIGHTER_ID": "RED_FIGHTER_ID",
@@ -208,12 +197,17 @@ class UFCStatsCompletedBoutsPipeline:
                 "BLUE_OUTCOME": "RED_OUTCOME",
             }
 
-            bouts_overall_df.update(
-                bouts_overall_df.loc[
-                    bouts_overall_df["BOUT_ID"].isin(self.bout_ids_to_flip)
-                ].rename(columns=swap_map_overall)
-            )
+            bouts_overall_df = self.swap_corners(bouts_overall_df, swap_map_overall)
+
+        return bouts_overall_df
+
+    def flip_bouts_by_round(self, bouts_by_round_df):
+        """
+        Swap the corners of the rounds of bouts listed with the fighters the
+        wrong way round
+        """
 
+        if self.scrape_type in ["all", "incremental"]:
             swap_map_by_round = {
                 "RED_KNOCKDOWNS": "BLUE_KNOCKDOWNS",
                 "BLUE_KNOCKDOWNS": "RED_KNOCKDOWNS",
@@ -261,40 +255,113 @@ class UFCStatsCompletedBoutsPipeline:
                 "BLUE_SIGNIFICANT_STRIKES_GROUND_ATTEMPTED": "RED_SIGNIFICANT_STRIKES_GROUND_ATTEMPTED",
             }
 
-            bouts_by_round_df.update(
-                bouts_by_round_df.loc[
-                    bouts_by_round_df["BOUT_ID"].isin(self.bout_ids_to_flip)
-                ].rename(columns=swap_map_by_round)
+            bouts_by_round_df = self.swap_corners(bouts_by_round_df, swap_map_by_round)
+
+        return bouts_by_round_df
+
+    @retry_on_busy
+    def close_spider(self, spider):
+        """
+        Insert the scraped data into the database and close the spider
+        """
+
+        self.bouts_overall.flush()
+        self.bouts_by_round.flush()
+
+        if not self.bouts_overall.row_count:
+            # Nothing new, e.g. an incremental crawl that was already up to date
+            self.bouts_overall.drop()
+            self.bouts_by_round.drop()
+            self.conn.commit()
+            self.conn.close()
+            return
+
+        flag = True
+        if self.scrape_type == "all":
+            self.cur.execute(
+                """
+                DELETE FROM 
+                  UFCSTATS_BOUTS_OVERALL;
+                """
+            )
+            self.cur.execute(
+                """
+                DELETE FROM 
+                  UFCSTATS_BOUTS_BY_ROUND;
+                """
+            )
+        elif self.scrape_type == "incremental":
+            # Guard against events written by a run since the spider started,
+            # their rounds are left out by the join below
+            self.cur.execute(
+                """
+                DELETE FROM 
+                  UFCSTATS_BOUTS_OVERALL_STAGING 
+                WHERE 
+                  EVENT_ID IN (
+                    SELECT 
+                      EVENT_ID 
+                    FROM 
+                      UFCSTATS_BOUTS_OVERALL
+                  );
+                """
             )
         else:
-            most_recent_event_id = bouts_overall_df["EVENT_ID"].iloc[0]
             res = self.cur.execute(
                 """
                 SELECT 
-                  EVENT_ID 
+                  t1.EVENT_ID 
                 FROM 
-                  UFCSTATS_BOUTS_OVERALL 
-                WHERE 
-                  EVENT_ID = ?;
-                """,
-                (most_recent_event_id,),
+                  UFCSTATS_BOUTS_OVERALL AS t1 
+                  INNER JOIN (
+                    SELECT 
+                      EVENT_ID 
+                    FROM 
+                      UFCSTATS_BOUTS_OVERALL_STAGING 
+                    ORDER BY 
+                      DATE, 
+                      EVENT_ID, 
+                      BOUT_ORDINAL 
+                    LIMIT 
+                      1
+                  ) AS t2 ON t1.EVENT_ID = t2.EVENT_ID;
+                """
             ).fetchall()
             flag = len(res) == 0
 
         if flag:
-            bouts_overall_df.to_sql(
-                "UFCSTATS_BOUTS_OVERALL",
-                self.conn,
-                if_exists="append",
-                index=False,
+            self.cur.execute(
+                """
+                INSERT INTO UFCSTATS_BOUTS_OVERALL 
+                SELECT 
+                  * 
+                FROM 
+                  UFCSTATS_BOUTS_OVERALL_STAGING 
+                ORDER BY 
+                  DATE, 
+                  EVENT_ID, 
+                  BOUT_ORDINAL;
+                """
             )
-            bouts_by_round_df.to_sql(
-                "UFCSTATS_BOUTS_BY_ROUND",
-                self.conn,
-                if_exists="append",
-                index=False,
+            # Rounds follow the order of their bouts
+            self.cur.execute(
+                """
+                INSERT INTO UFCSTATS_BOUTS_BY_ROUND 
+                SELECT 
+                  t1.* 
+                FROM 
+                  UFCSTATS_BOUTS_BY_ROUND_STAGING AS t1 
+                  INNER JOIN UFCSTATS_BOUTS_OVERALL_STAGING AS t2 ON t1.BOUT_ID = t2.BOUT_ID 
+                ORDER BY 
+                  t2.DATE, 
+                  t2.EVENT_ID, 
+                  t2.BOUT_ORDINAL, 
+                  t1.ROUND;
+                """
             )
 
+        self.bouts_overall.drop()
+        self.bouts_by_round.drop()
         self.conn.commit()
         self.conn.close()
 
@@ -310,12 +377,7 @@ class UFCStatsUpcomingBoutsPipeline:
         """
 
         self.upcoming_bouts = []
-        self.conn = sqlite3.connect(
-            os.path.join(
-                os.path.dirname(__file__), "..", "..", "..", "..", "data", "ufcstats.db"
-            ),
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
+        self.conn = get_connection("ufcstats")
         self.cur = self.conn.cursor()
         self.cur.execute(CREATE_UFCSTATS_UPCOMING_TABLE)
 
@@ -336,6 +398,7 @@ class UFCStatsUpcomingBoutsPipeline:
 
         return item
 
+    @retry_on_busy
     def close_spider(self, spider):
         """
         Insert the scraped data into the database and close the spider
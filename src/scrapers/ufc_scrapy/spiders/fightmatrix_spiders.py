@@ -7,6 +7,7 @@ import w3lib.html
 from scrapy.spiders import Spider
 
 # local imports
+from src.scrapers.ufc_scrapy.httpcache import HTTPCACHE_DIR
 from src.scrapers.ufc_scrapy.items import (
     FightMatrixBoutItem,
     FightMatrixFighterItem,
@@ -26,12 +27,17 @@ class FightMatrixResultsSpider(Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
-        "CONCURRENT_REQUESTS": 1,
+        "CONCURRENT_REQUESTS": 4,
         "COOKIES_ENABLED": False,
         "DOWNLOADER_MIDDLEWARES": {
             "scrapy.downloadermiddlewares.useragent.UserAgentMiddleware": None,
             "scrapy_user_agents.middlewares.RandomUserAgentMiddleware": 400,
+            "ufc_scrapy.middlewares.ScrapersDownloaderMiddleware": 543,
         },
+        "EXTENSIONS": {
+            "ufc_scrapy.ratecontrol.AdaptiveRateController": 500,
+        },
+        "ADAPTIVE_RATE_ENABLED": True,
         "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
         "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
         "FEED_EXPORT_ENCODING": "utf-8",
@@ -46,10 +52,17 @@ class FightMatrixResultsSpider(Spider):
         },
         "CLOSESPIDER_ERRORCOUNT": 1,
         "DOWNLOAD_DELAY": 1.5,
-        "AUTOTHROTTLE_ENABLED": True,
-        "AUTOTHROTTLE_START_DELAY": 1.5,
-        "AUTOTHROTTLE_TARGET_CONCURRENCY": 1,
-        "AUTOTHROTTLE_MAX_DELAY": 5,
+        "ADAPTIVE_RATE_MIN_DELAY": 0.25,
+        "HTTPCACHE_ENABLED": True,
+        "HTTPCACHE_POLICY": "ufc_scrapy.httpcache.FreshnessPolicy",
+        "HTTPCACHE_STORAGE": "scrapy.extensions.httpcache.FilesystemCacheStorage",
+        "HTTPCACHE_DIR": HTTPCACHE_DIR,
+        "HTTPCACHE_GZIP": True,
+        "HTTPCACHE_ALWAYS_STORE": True,
+        "HTTPCACHE_FRESHNESS_RULES": [
+            (r"/past-events-search/", 60 * 60),
+            (r"/fighter-profile/", 7 * 24 * 60 * 60),
+        ],
     }
 
     def __init__(self, *args, scrape_type, **kwargs):
@@ -90,7 +103,11 @@ class FightMatrixResultsSpider(Spider):
         if self.scrape_type == "most_recent":
             event_links = [event_links[0]]
 
-        yield from response.follow_all(event_links, self.parse_event)
+        # Past event pages never change, they are marked immutable by where they
+        # are linked from rather than matched on their URL
+        yield from response.follow_all(
+            event_links, self.parse_event, meta={"httpcache_ttl": None}
+        )
 
     def parse_event(self, response):
         fighter_links = response.css("a.sherLink::attr(href)").getall()
@@ -245,12 +262,17 @@ class FightMatrixRankingsSpider(Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
-        "CONCURRENT_REQUESTS": 1,
+        "CONCURRENT_REQUESTS": 4,
         "COOKIES_ENABLED": False,
         "DOWNLOADER_MIDDLEWARES": {
             "scrapy.downloadermiddlewares.useragent.UserAgentMiddleware": None,
             "scrapy_user_agents.middlewares.RandomUserAgentMiddleware": 400,
+            "ufc_scrapy.middlewares.ScrapersDownloaderMiddleware": 543,
+        },
+        "EXTENSIONS": {
+            "ufc_scrapy.ratecontrol.AdaptiveRateController": 500,
         },
+        "ADAPTIVE_RATE_ENABLED": True,
         "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
         "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
         "FEED_EXPORT_ENCODING": "utf-8",
@@ -264,10 +286,7 @@ class FightMatrixRankingsSpider(Spider):
         },
         "CLOSESPIDER_ERRORCOUNT": 1,
         "DOWNLOAD_DELAY": 1.5,
-        "AUTOTHROTTLE_ENABLED": True,
-        "AUTOTHROTTLE_START_DELAY": 1.5,
-        "AUTOTHROTTLE_TARGET_CONCURRENCY": 1,
-        "AUTOTHROTTLE_MAX_DELAY": 5,
+        "ADAPTIVE_RATE_MIN_DELAY": 0.25,
     }
 
     def __init__(self, *args, scrape_type, **kwargs):
@@ -1,5 +1,7 @@
 # standard library imports
 import json
+import os
+import sqlite3
 from datetime import datetime, timedelta, timezone
 
 # third party imports
@@ -8,6 +10,8 @@ from scrapy.http import Request
 from scrapy.spiders import Spider
 
 # local imports
+from src.databases.connection import connect_read_only, get_database_path
+from src.scrapers.ufc_scrapy.httpcache import HTTPCACHE_DIR
 from src.scrapers.ufc_scrapy.items import (
     FightOddsIOBoutItem,
     FightOddsIOClosingOddsItem,
@@ -20,6 +24,7 @@ from src.scrapers.ufc_scrapy.utils import (
     EVENTS_UPCOMING_GQL_QUERY,
     FIGHTERS_GQL_QUERY,
     FIGHTS_GQL_QUERY,
+    build_batched_gql_query,
 )
 
 
@@ -33,12 +38,17 @@ class FightOddsIOResultsSpider(Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS_PER_DOMAIN": 4,
-        "CONCURRENT_REQUESTS": 4,
+        "CONCURRENT_REQUESTS": 8,
         "COOKIES_ENABLED": False,
         "DOWNLOADER_MIDDLEWARES": {
             "scrapy.downloadermiddlewares.useragent.UserAgentMiddleware": None,
             "scrapy_user_agents.middlewares.RandomUserAgentMiddleware": 400,
+            "ufc_scrapy.middlewares.ScrapersDownloaderMiddleware": 543,
         },
+        "EXTENSIONS": {
+            "ufc_scrapy.ratecontrol.AdaptiveRateController": 500,
+        },
+        "ADAPTIVE_RATE_ENABLED": True,
         "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
         "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
         "FEED_EXPORT_ENCODING": "utf-8",
@@ -53,19 +63,46 @@ class FightOddsIOResultsSpider(Spider):
             "ufc_scrapy.scrapy_pipelines.fightoddsio_pipelines.FightOddsIOCompletedBoutsPipeline": 200,
         },
         "CLOSESPIDER_ERRORCOUNT": 1,
+        "HTTPCACHE_ENABLED": True,
+        "HTTPCACHE_POLICY": "ufc_scrapy.httpcache.FreshnessPolicy",
+        "HTTPCACHE_STORAGE": "scrapy.extensions.httpcache.FilesystemCacheStorage",
+        "HTTPCACHE_DIR": HTTPCACHE_DIR,
+        "HTTPCACHE_GZIP": True,
+        "HTTPCACHE_ALWAYS_STORE": True,
     }
 
-    def __init__(self, *args, scrape_type, **kwargs):
+    def __init__(self, *args, scrape_type, date_today=None, batch_size=20, **kwargs):
         super().__init__(*args, **kwargs)
-        assert scrape_type in {"all", "most_recent"}
+        assert scrape_type in {"all", "most_recent", "backfill"}
         self.scrape_type = scrape_type
+        # Events and fighters fetched per GraphQL request
+        self.batch_size = int(batch_size)
+        assert self.batch_size >= 1
+        self.requested_fighter_slugs = set()
 
         self.gql_url = "https://api.fightinsider.io/gql"
         self.headers = {
             "X-Requested-With": "XMLHttpRequest",
             "Content-Type": "application/json",
         }
-        self.date_today = datetime.now(timezone.utc).date()
+        # Pinning the date keeps the request bodies, and so the replay keys, fixed
+        self.date_today = (
+            datetime.strptime(date_today, "%Y-%m-%d").date()
+            if date_today
+            else datetime.now(timezone.utc).date()
+        )
+
+        # Backfill progress, saved by FightOddsIOCompletedBoutsPipeline so an
+        # interrupted backfill resumes where it stopped
+        self.start_cursor = ""
+        self.stored_event_slugs = set()
+        self.event_slugs = {}
+        self.pending_requests = {}
+        self.completed_event_pks = set()
+        self.pages = []
+        self.next_cursor = None
+        if self.scrape_type == "backfill":
+            self.load_backfill_state(date_today is not None)
 
         # Bookmakers to target (don't do live odds as closing odds)
         self.bookie_slugs_target = {
@@ -118,6 +155,115 @@ class FightOddsIOResultsSpider(Spider):
             "cm-punk-vs-mike-jackson-22023",
         }
 
+    def get_event_ttl(self, date):
+        """
+        Results and closing odds can still be corrected shortly after an
+        event, so its responses are only treated as immutable after a week
+        """
+
+        if datetime.strptime(date, "%Y-%m-%d").date() < self.date_today - timedelta(
+            days=7
+        ):
+            return None
+
+        return 60 * 60
+
+    def get_batch_ttl(self, dates):
+        """
+        A batched response is only as fresh as its most recent event
+        """
+
+        ttls = [ttl for ttl in map(self.get_event_ttl, dates) if ttl is not None]
+
+        return min(ttls) if ttls else None
+
+    def load_backfill_state(self, date_pinned):
+        """
+        Load the saved cursor, the events already completed and the events
+        whose bouts and odds are already stored
+        """
+
+        if not os.path.exists(get_database_path("fightoddsio")):
+            return
+
+        conn = connect_read_only("fightoddsio")
+        try:
+            self.stored_event_slugs.update(
+                row[0]
+                for row in conn.execute(
+                    """
+                    SELECT 
+                      DISTINCT EVENT_SLUG 
+                    FROM 
+                      FIGHTODDSIO_BOUTS;
+                    """
+                )
+            )
+            self.completed_event_pks.update(
+                row[0]
+                for row in conn.execute(
+                    """
+                    SELECT 
+                      EVENT_PK 
+                    FROM 
+                      FIGHTODDSIO_BACKFILL_EVENTS;
+                    """
+                )
+            )
+            state = conn.execute(
+                """
+                SELECT 
+                  DATE_LT, 
+                  END_CURSOR 
+                FROM 
+                  FIGHTODDSIO_BACKFILL_STATE;
+                """
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # Tables not created yet, so this is a fresh backfill
+            state = None
+        finally:
+            conn.close()
+
+        # The cursor is only valid for the listing it came from, so a resumed
+        # backfill keeps the date of the interrupted one
+        if state is not None and state[1] and not date_pinned:
+            self.date_today = datetime.strptime(state[0], "%Y-%m-%d").date()
+            self.start_cursor = state[1]
+
+    def update_pending_requests(self, pk, change):
+        """
+        Count the outstanding requests of an event during a backfill, marking
+        the event completed once all of them have been parsed
+        """
+
+        if self.scrape_type != "backfill":
+            return
+
+        self.pending_requests[pk] += change
+        if self.pending_requests[pk] == 0:
+            self.completed_event_pks.add(pk)
+
+    def get_backfill_state(self):
+        """
+        Get the listing date, the cursor to resume from (None once the
+        backfill is done) and the events completed in this run
+        """
+
+        cursor = self.next_cursor
+        for after, pks in self.pages:
+            if not pks <= self.completed_event_pks:
+                cursor = after
+                break
+
+        completed_events = [
+            (pk, slug)
+            for pk, slug in self.event_slugs.items()
+            if pk in self.completed_event_pks
+        ]
+
+        return self.date_today.strftime("%Y-%m-%d"), cursor, completed_events
+
     def start_requests(self):
         payload = json.dumps(
             {
@@ -125,7 +271,7 @@ class FightOddsIOResultsSpider(Spider):
                 "variables": {
                     "promotionSlug": "ufc",
                     "dateLt": self.date_today.strftime("%Y-%m-%d"),
-                    "after": "",
+                    "after": self.start_cursor,
                     "first": 100,
                     "orderBy": "-date",
                 },
@@ -139,9 +285,11 @@ class FightOddsIOResultsSpider(Spider):
             body=payload,
             callback=self.parse_infinite_scroll,
             dont_filter=True,
+            cb_kwargs={"after": self.start_cursor},
+            meta={"httpcache_ttl": 60 * 60},
         )
 
-    def parse_infinite_scroll(self, response):
+    def parse_infinite_scroll(self, response, after=""):
         json_resp = json.loads(response.body)
         events = json_resp["data"]["promotion"]["events"]
         edges = events["edges"]
@@ -151,6 +299,8 @@ class FightOddsIOResultsSpider(Spider):
             edges = [edges[0]]
             event_pks = [event_pks[0]]
 
+        page_pks = set()
+        event_edges = []
         for edge, pk in zip(edges, event_pks):
             event_name = edge["node"]["name"]
 
@@ -160,8 +310,28 @@ class FightOddsIOResultsSpider(Spider):
             if edge["node"]["slug"] == "ufc-fight-night-85-hunt-vs-mir":
                 edge["node"]["date"] = "2016-03-19"
 
+            if self.scrape_type == "backfill":
+                if (
+                    pk in self.completed_event_pks
+                    or edge["node"]["slug"] in self.stored_event_slugs
+                ):
+                    continue
+                page_pks.add(pk)
+                self.event_slugs[pk] = edge["node"]["slug"]
+                self.pending_requests[pk] = 1
+
+            event_edges.append(edge)
+
+        for i in range(0, len(event_edges), self.batch_size):
+            info_dicts = event_edges[i : i + self.batch_size]
             payload_fights = json.dumps(
-                {"query": FIGHTS_GQL_QUERY, "variables": {"eventPk": pk}}
+                {
+                    "query": build_batched_gql_query(FIGHTS_GQL_QUERY, len(info_dicts)),
+                    "variables": {
+                        f"eventPk{j}": info_dict["node"]["pk"]
+                        for j, info_dict in enumerate(info_dicts)
+                    },
+                }
             )
 
             yield Request(
@@ -171,11 +341,22 @@ class FightOddsIOResultsSpider(Spider):
                 body=payload_fights,
                 callback=self.parse_event_fights,
                 dont_filter=True,
-                cb_kwargs={"info_dict": edge, "pk": pk},
+                cb_kwargs={"info_dicts": info_dicts},
+                meta={
+                    "httpcache_ttl": self.get_batch_ttl(
+                        [info_dict["node"]["date"] for info_dict in info_dicts]
+                    )
+                },
             )
 
         has_next_page = events["pageInfo"]["hasNextPage"]
-        if has_next_page and self.scrape_type == "all":
+        if self.scrape_type == "backfill":
+            self.pages.append((after, page_pks))
+            self.next_cursor = (
+                events["pageInfo"]["endCursor"] if has_next_page else None
+            )
+
+        if has_next_page and self.scrape_type in ["all", "backfill"]:
             cursor_pos = events["pageInfo"]["endCursor"]
             payload_pagination = json.dumps(
                 {
@@ -197,11 +378,95 @@ class FightOddsIOResultsSpider(Spider):
                 body=payload_pagination,
                 callback=self.parse_infinite_scroll,
                 dont_filter=True,
+                cb_kwargs={"after": cursor_pos},
+                meta={"httpcache_ttl": 60 * 60},
             )
 
-    def parse_event_fights(self, response, info_dict, pk):
+    def parse_event_fights(self, response, info_dicts):
         json_resp = json.loads(response.body)
-        edges = json_resp["data"]["event"]["fights"]["edges"]
+        pks = [info_dict["node"]["pk"] for info_dict in info_dicts]
+
+        valid_bout_slugs = set()
+        fighter_pks = {}
+        for i, (info_dict, pk) in enumerate(zip(info_dicts, pks)):
+            edges = json_resp["data"][f"event{i}"]["fights"]["edges"]
+            for bout_item, fighter_slugs in self.get_bout_items(edges, info_dict):
+                yield bout_item
+
+                valid_bout_slugs.add(bout_item["BOUT_SLUG"])
+                for fighter_slug in fighter_slugs:
+                    # Fighters already requested by an earlier batch are skipped
+                    if fighter_slug not in self.requested_fighter_slugs:
+                        fighter_pks.setdefault(fighter_slug, set()).add(pk)
+
+        self.requested_fighter_slugs.update(fighter_pks)
+        fighter_slugs = list(fighter_pks)
+        for i in range(0, len(fighter_slugs), self.batch_size):
+            fighter_slugs_batch = fighter_slugs[i : i + self.batch_size]
+            fighter_batch_pks = set().union(
+                *[fighter_pks[fighter_slug] for fighter_slug in fighter_slugs_batch]
+            )
+            payload_fighters = json.dumps(
+                {
+                    "query": build_batched_gql_query(
+                        FIGHTERS_GQL_QUERY, len(fighter_slugs_batch)
+                    ),
+                    "variables": {
+                        f"fighterSlug{j}": fighter_slug
+                        for j, fighter_slug in enumerate(fighter_slugs_batch)
+                    },
+                }
+            )
+
+            for pk in fighter_batch_pks:
+                self.update_pending_requests(pk, 1)
+            yield Request(
+                url=self.gql_url,
+                method="POST",
+                headers=self.headers,
+                body=payload_fighters,
+                callback=self.parse_fighter,
+                dont_filter=True,
+                cb_kwargs={
+                    "fighter_slugs": fighter_slugs_batch,
+                    "pks": fighter_batch_pks,
+                },
+                meta={"httpcache_ttl": 7 * 24 * 60 * 60},
+            )
+
+        payload_odds = json.dumps(
+            {
+                "query": build_batched_gql_query(EVENT_ODDS_GQL_QUERY, len(pks)),
+                "variables": {f"eventPk{j}": pk for j, pk in enumerate(pks)},
+            }
+        )
+
+        for pk in pks:
+            self.update_pending_requests(pk, 1)
+        yield Request(
+            url=self.gql_url,
+            method="POST",
+            headers=self.headers,
+            body=payload_odds,
+            callback=self.parse_bout_odds,
+            dont_filter=True,
+            cb_kwargs={"valid_bout_slugs": valid_bout_slugs, "pks": pks},
+            meta={
+                "httpcache_ttl": self.get_batch_ttl(
+                    [info_dict["node"]["date"] for info_dict in info_dicts]
+                )
+            },
+        )
+
+        for pk in pks:
+            self.update_pending_requests(pk, -1)
+
+    def get_bout_items(self, edges, info_dict):
+        """
+        Get the bout items of an event, each with the slugs of its fighters
+        """
+
+        bout_items = []
         confirmed = [
             edge
             for edge in edges
@@ -209,7 +474,6 @@ class FightOddsIOResultsSpider(Spider):
             or edge["node"]["slug"] in self.falsely_cancelled
         ]
 
-        valid_bout_slugs = []
         for bout in confirmed:
             if (
                 bout["node"]["slug"] in self.duplicates
@@ -290,93 +554,68 @@ class FightOddsIOResultsSpider(Spider):
                 bout_item["END_ROUND"]
                 or bout_item["END_ROUND_TIME_SECONDS"] is not None
             ):
-                yield bout_item
-
-                valid_bout_slugs.append(bout_slug)
-
-                fighter_slugs = [f1_slug, f2_slug]
-                for fighter_slug in fighter_slugs:
-                    payload_fighter = json.dumps(
-                        {
-                            "query": FIGHTERS_GQL_QUERY,
-                            "variables": {"fighterSlug": fighter_slug},
-                        }
-                    )
+                bout_items.append((bout_item, [f1_slug, f2_slug]))
 
-                    yield Request(
-                        url=self.gql_url,
-                        method="POST",
-                        headers=self.headers,
-                        body=payload_fighter,
-                        callback=self.parse_fighter,
-                        dont_filter=True,
-                        cb_kwargs={"fighter_slug": fighter_slug},
-                    )
+        return bout_items
 
-        payload_odds = json.dumps(
-            {"query": EVENT_ODDS_GQL_QUERY, "variables": {"eventPk": pk}}
-        )
+    def parse_fighter(self, response, fighter_slugs, pks):
+        json_resp = json.loads(response.body)
 
-        yield Request(
-            url=self.gql_url,
-            method="POST",
-            headers=self.headers,
-            body=payload_odds,
-            callback=self.parse_bout_odds,
-            dont_filter=True,
-            cb_kwargs={"valid_bout_slugs": valid_bout_slugs},
-        )
+        for i, fighter_slug in enumerate(fighter_slugs):
+            fighter_data = json_resp["data"][f"fighter{i}"]
 
-    def parse_fighter(self, response, fighter_slug):
-        json_resp = json.loads(response.body)
-        fighter_data = json_resp["data"]["fighter"]
+            fighter_item = FightOddsIOFighterItem()
 
-        fighter_item = FightOddsIOFighterItem()
+            fighter_item["FIGHTER_ID"] = int(fighter_slug.split("-")[-1])
+            fighter_item["FIGHTER_NAME"] = (
+                f"{fighter_data['firstName']} {fighter_data['lastName']}".strip()
+            )
+            fighter_item["FIGHTER_NICKNAME"] = (
+                fighter_data["nickName"] if fighter_data["nickName"] else None
+            )
+            fighter_item["HEIGHT_CENTIMETERS"] = (
+                float(fighter_data["height"])
+                if fighter_data["height"] and fighter_data["height"] != "0.0"
+                else None
+            )
+            fighter_item["REACH_INCHES"] = (
+                float(fighter_data["reach"])
+                if fighter_data["reach"] and fighter_data["reach"] != "0.0"
+                else None
+            )
+            fighter_item["LEG_REACH_INCHES"] = (
+                float(fighter_data["legReach"])
+                if fighter_data["legReach"] and fighter_data["legReach"] != "0.0"
+                else None
+            )
+            fighter_item["FIGHTING_STYLE"] = (
+                fighter_data["fightingStyle"] if fighter_data["fightingStyle"] else None
+            )
+            fighter_item["STANCE"] = (
+                fighter_data["stance"] if fighter_data["stance"] else None
+            )
+            # 1970-01-01 used as placeholder for missing DOB
+            fighter_item["DATE_OF_BIRTH"] = (
+                fighter_data["birthDate"]
+                if fighter_data["birthDate"]
+                and fighter_data["birthDate"] != "1970-01-01"
+                else None
+            )
 
-        fighter_item["FIGHTER_ID"] = int(fighter_slug.split("-")[-1])
-        fighter_item["FIGHTER_NAME"] = (
-            f"{fighter_data['firstName']} {fighter_data['lastName']}".strip()
-        )
-        fighter_item["FIGHTER_NICKNAME"] = (
-            fighter_data["nickName"] if fighter_data["nickName"] else None
-        )
-        fighter_item["HEIGHT_CENTIMETERS"] = (
-            float(fighter_data["height"])
-            if fighter_data["height"] and fighter_data["height"] != "0.0"
-            else None
-        )
-        fighter_item["REACH_INCHES"] = (
-            float(fighter_data["reach"])
-            if fighter_data["reach"] and fighter_data["reach"] != "0.0"
-            else None
-        )
-        fighter_item["LEG_REACH_INCHES"] = (
-            float(fighter_data["legReach"])
-            if fighter_data["legReach"] and fighter_data["legReach"] != "0.0"
-            else None
-        )
-        fighter_item["FIGHTING_STYLE"] = (
-            fighter_data["fightingStyle"] if fighter_data["fightingStyle"] else None
-        )
-        fighter_item["STANCE"] = (
-            fighter_data["stance"] if fighter_data["stance"] else None
-        )
-        # 1970-01-01 used as placeholder for missing DOB
-        fighter_item["DATE_OF_BIRTH"] = (
-            fighter_data["birthDate"]
-            if fighter_data["birthDate"] and fighter_data["birthDate"] != "1970-01-01"
-            else None
-        )
+            yield fighter_item
 
-        yield fighter_item
+        for pk in pks:
+            self.update_pending_requests(pk, -1)
 
-    def parse_bout_odds(self, response, valid_bout_slugs):
+    def parse_bout_odds(self, response, valid_bout_slugs, pks):
         json_resp = json.loads(response.body)
 
-        if json_resp["data"]["eventOfferTable"]:
-            fightoffer_edges = json_resp["data"]["eventOfferTable"]["fightOffers"][
-                "edges"
-            ]
+        for i in range(len(pks)):
+            event_offer_table = json_resp["data"][f"eventOfferTable{i}"]
+            if not event_offer_table:
+                continue
+
+            fightoffer_edges = event_offer_table["fightOffers"]["edges"]
             valid = [
                 edge
                 for edge in fightoffer_edges
@@ -417,6 +656,9 @@ class FightOddsIOResultsSpider(Spider):
 
                     yield closing_odds_item
 
+        for pk in pks:
+            self.update_pending_requests(pk, -1)
+
     def get_average_decimal_odds(self, odds):
         if not odds.size:
             return None
@@ -436,12 +678,17 @@ class FightOddsIOUpcomingEventSpider(Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS_PER_DOMAIN": 4,
-        "CONCURRENT_REQUESTS": 4,
+        "CONCURRENT_REQUESTS": 8,
         "COOKIES_ENABLED": False,
         "DOWNLOADER_MIDDLEWARES": {
             "scrapy.downloadermiddlewares.useragent.UserAgentMiddleware": None,
             "scrapy_user_agents.middlewares.RandomUserAgentMiddleware": 400,
+            "ufc_scrapy.middlewares.ScrapersDownloaderMiddleware": 543,
+        },
+        "EXTENSIONS": {
+            "ufc_scrapy.ratecontrol.AdaptiveRateController": 500,
         },
+        "ADAPTIVE_RATE_ENABLED": True,
         "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
         "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
         "FEED_EXPORT_ENCODING": "utf-8",
@@ -457,7 +704,7 @@ class FightOddsIOUpcomingEventSpider(Spider):
         "CLOSESPIDER_ERRORCOUNT": 1,
     }
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, date_today=None, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.gql_url = "https://api.fightinsider.io/gql"
@@ -465,7 +712,12 @@ class FightOddsIOUpcomingEventSpider(Spider):
             "X-Requested-With": "XMLHttpRequest",
             "Content-Type": "application/json",
         }
-        self.date_today = datetime.now(timezone.utc).date()
+        # Pinning the date keeps the request bodies, and so the replay keys, fixed
+        self.date_today = (
+            datetime.strptime(date_today, "%Y-%m-%d").date()
+            if date_today
+            else datetime.now(timezone.utc).date()
+        )
 
     def start_requests(self):
         payload = json.dumps(
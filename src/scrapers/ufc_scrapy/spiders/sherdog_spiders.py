@@ -7,12 +7,13 @@ from scrapy.http import Request
 from scrapy.spiders import Spider
 
 # local imports
-from src.scrapers.ufc_scrapy.items import (
-    SherdogBoutItem,
-    SherdogFighterBoutHistoryItem,
-    SherdogFighterItem,
+from src.scrapers.ufc_scrapy.httpcache import HTTPCACHE_DIR
+from src.scrapers.ufc_scrapy.items import SherdogBoutItem
+from src.scrapers.ufc_scrapy.parsers import (
+    create_parser_pool,
+    parse_sherdog_fighter,
+    run_parser,
 )
-from src.scrapers.ufc_scrapy.utils import convert_height
 
 
 class SherdogResultsSpider(Spider):
@@ -26,12 +27,17 @@ class SherdogResultsSpider(Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS_PER_DOMAIN": 4,
-        "CONCURRENT_REQUESTS": 4,
+        "CONCURRENT_REQUESTS": 8,
         "COOKIES_ENABLED": False,
         "DOWNLOADER_MIDDLEWARES": {
             "scrapy.downloadermiddlewares.useragent.UserAgentMiddleware": None,
             "scrapy_user_agents.middlewares.RandomUserAgentMiddleware": 400,
+            "ufc_scrapy.middlewares.ScrapersDownloaderMiddleware": 543,
         },
+        "EXTENSIONS": {
+            "ufc_scrapy.ratecontrol.AdaptiveRateController": 500,
+        },
+        "ADAPTIVE_RATE_ENABLED": True,
         "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
         "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
         "FEED_EXPORT_ENCODING": "utf-8",
@@ -47,12 +53,25 @@ class SherdogResultsSpider(Spider):
         },
         "CLOSESPIDER_ERRORCOUNT": 1,
         "DOWNLOAD_TIMEOUT": 600,
+        "HTTPCACHE_ENABLED": True,
+        "HTTPCACHE_POLICY": "ufc_scrapy.httpcache.FreshnessPolicy",
+        "HTTPCACHE_STORAGE": "scrapy.extensions.httpcache.FilesystemCacheStorage",
+        "HTTPCACHE_DIR": HTTPCACHE_DIR,
+        "HTTPCACHE_GZIP": True,
+        "HTTPCACHE_ALWAYS_STORE": True,
+        "HTTPCACHE_FRESHNESS_RULES": [
+            (r"/recent-events/", 60 * 60),
+            (r"/events/", None),
+            (r"/fighter/", 7 * 24 * 60 * 60),
+        ],
     }
 
-    def __init__(self, *args, scrape_type: str, **kwargs):
+    def __init__(self, *args, scrape_type: str, parser_workers: int = 0, **kwargs):
         super().__init__(*args, **kwargs)
         assert scrape_type in {"all", "most_recent"}
         self.scrape_type = scrape_type
+        # Fighter pages are parsed in this many worker processes (0 for inline)
+        self.parser_pool = create_parser_pool(int(parser_workers))
         self.outcome_map = {
             "win": "W",
             "loss": "L",
@@ -71,6 +90,10 @@ class SherdogResultsSpider(Spider):
             "Heavyweight": 265,
         }
 
+    def closed(self, reason):
+        if self.parser_pool is not None:
+            self.parser_pool.shutdown()
+
     def start_requests(self):
         start_url = "https://www.sherdog.com/organizations/Ultimate-Fighting-Championship-UFC-2/recent-events/1"
 
@@ -339,121 +362,12 @@ class SherdogResultsSpider(Spider):
                     callback=self.parse_fighter,
                 )
 
-    def parse_fighter(self, response):
-        fighter_item = SherdogFighterItem()
-
-        fighter_id = int(response.url.split("/")[-1].split("-")[-1])
-        fighter_item["FIGHTER_ID"] = fighter_id
-
-        fighter_name = response.css(
-            "div.fighter-line1 > h1[itemprop='name'] > span.fn::text"
-        ).get()
-        fighter_item["FIGHTER_NAME"] = fighter_name
-
-        nick = response.css("div.fighter-line2 > h1[itemprop='name'] > span.nickname")
-        fighter_item["FIGHTER_NICKNAME"] = nick.css("em::text").get() if nick else None
-        fighter_item["NATIONALITY"] = response.css(
-            """div.fighter-nationality > span.item.birthplace > 
-            strong[itemprop='nationality']::text"""
-        ).get()
-
-        dob = response.css(
-            """div.fighter-data > div.bio-holder > table > tr > 
-            td > span[itemprop='birthDate']::text"""
-        ).get()
-        fighter_item["DATE_OF_BIRTH"] = (
-            pd.to_datetime(dob).strftime("%Y-%m-%d") if dob else None
-        )
-
-        height = response.css(
-            "div.fighter-data > div.bio-holder > table > tr > td > b[itemprop='height']::text"
-        ).get()
-        fighter_item["HEIGHT_INCHES"] = (
-            convert_height(height.replace("'", "' ")) if height else None
+    async def parse_fighter(self, response):
+        items = await run_parser(
+            self.parser_pool,
+            parse_sherdog_fighter,
+            response,
+            outcome_map=self.outcome_map,
         )
-
-        pro_fight_history_table = response.css(
-            "div.module.fight_history > div.new_table_holder > table.new_table.fighter"
-        )[0]
-        fight_history_rows = pro_fight_history_table.css("tr:not([class='table_head'])")
-        pro_debut_date = pd.to_datetime(
-            fight_history_rows[-1].css("td > span.sub_line::text").get()
-        ).strftime("%Y-%m-%d")
-        fighter_item["PRO_DEBUT_DATE"] = pro_debut_date
-
-        yield fighter_item
-
-        for fighter_bout_ordinal, row in enumerate(reversed(fight_history_rows)):
-            fighter_bout_history_item = SherdogFighterBoutHistoryItem()
-
-            fighter_bout_history_item["FIGHTER_ID"] = fighter_id
-            fighter_bout_history_item["FIGHTER_BOUT_ORDINAL"] = fighter_bout_ordinal
-
-            tds = row.css("td")
-
-            fighter_bout_history_item["OUTCOME"] = self.outcome_map[
-                tds[0].css("span.final_result::text").get().lower()
-            ]
-            fighter_bout_history_item["OPPONENT_ID"] = (
-                int(tds[1].css("a::attr(href)").get().split("/")[-1].split("-")[-1])
-                if tds[1].css("a::attr(href)").get().split("/")[-1].split("-")[-1]
-                != "javascript:void();"
-                else None
-            )
-            fighter_bout_history_item["OPPONENT_NAME"] = (
-                tds[1].css("a::text").get()
-                if tds[1].css("a::text").get() != "Unknown Fighter"
-                else None
-            )
-            fighter_bout_history_item["EVENT_ID"] = int(
-                tds[2].css("a::attr(href)").get().split("/")[-1].split("-")[-1]
-            )
-            fighter_bout_history_item["EVENT_NAME"] = w3lib.html.remove_tags(
-                tds[2].css("a").get()
-            )
-            fighter_bout_history_item["DATE"] = pd.to_datetime(
-                tds[2].css("span.sub_line::text").get()
-            ).strftime("%Y-%m-%d")
-
-            method_full = tds[3].css("b::text").get()
-            method_full = method_full if method_full and method_full != "N/A" else None
-            method_split = method_full.split(" (") if method_full else None
-            fighter_bout_history_item["OUTCOME_METHOD"] = (
-                method_split[0].replace("DG", "DQ").strip() if method_split else None
-            )
-            fighter_bout_history_item["OUTCOME_METHOD_DETAILS"] = (
-                method_split[1].replace(")", "")
-                if method_split and len(method_split) > 1
-                else None
-            )
-
-            end_round = int(tds[4].css("::text").get().strip())
-            fighter_bout_history_item["END_ROUND"] = (
-                end_round if end_round != 0 else None
-            )
-
-            end_round_time = tds[5].css("::text").get().strip()
-            end_round_time_split = (
-                end_round_time.split(":")
-                if end_round_time not in ["N/A", "M/A"]
-                else None
-            )
-
-            if end_round_time_split is not None and len(end_round_time_split) == 1:
-                end_round_time_split = [end_round_time_split[0], "00"]
-            elif end_round_time_split is not None and end_round_time_split[0] == "":
-                end_round_time_split = ["00", end_round_time_split[1]]
-
-            end_round_time_seconds = (
-                60 * int(end_round_time_split[0]) + int(end_round_time_split[1])
-                if end_round_time_split is not None
-                else None
-            )
-            fighter_bout_history_item["END_ROUND_TIME_SECONDS"] = end_round_time_seconds
-            fighter_bout_history_item["TOTAL_TIME_SECONDS"] = (
-                (300 * (end_round - 1) + end_round_time_seconds)
-                if end_round_time_seconds is not None and end_round != 0
-                else None
-            )
-
-            yield fighter_bout_history_item
+        for item in items:
+            yield item
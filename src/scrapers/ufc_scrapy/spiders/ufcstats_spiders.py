@@ -1,24 +1,22 @@
 # standard library imports
+import os
+import sqlite3
 from datetime import datetime, timedelta, timezone
 
 # third party imports
 import pandas as pd
-import w3lib.html
 from scrapy.spiders import Spider
 
 # local imports
-from src.scrapers.ufc_scrapy.items import (
-    UFCStatsBoutOverallItem,
-    UFCStatsBoutRoundItem,
-    UFCStatsFighterItem,
-    UFCStatsUpcomingBoutItem,
-)
-from src.scrapers.ufc_scrapy.utils import (
-    convert_height,
-    ctrl_time,
-    extract_landed_attempted,
-    total_time,
+from src.databases.connection import connect_read_only, get_database_path
+from src.scrapers.ufc_scrapy.httpcache import HTTPCACHE_DIR
+from src.scrapers.ufc_scrapy.items import UFCStatsFighterItem, UFCStatsUpcomingBoutItem
+from src.scrapers.ufc_scrapy.parsers import (
+    create_parser_pool,
+    parse_ufcstats_bout,
+    run_parser,
 )
+from src.scrapers.ufc_scrapy.utils import convert_height
 
 
 class UFCStatsResultsSpider(Spider):
@@ -34,12 +32,17 @@ class UFCStatsResultsSpider(Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS_PER_DOMAIN": 10,
-        "CONCURRENT_REQUESTS": 10,
+        "CONCURRENT_REQUESTS": 16,
         "COOKIES_ENABLED": False,
         "DOWNLOADER_MIDDLEWARES": {
             "scrapy.downloadermiddlewares.useragent.UserAgentMiddleware": None,
             "scrapy_user_agents.middlewares.RandomUserAgentMiddleware": 400,
+            "ufc_scrapy.middlewares.ScrapersDownloaderMiddleware": 543,
+        },
+        "EXTENSIONS": {
+            "ufc_scrapy.ratecontrol.AdaptiveRateController": 500,
         },
+        "ADAPTIVE_RATE_ENABLED": True,
         "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
         "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
         "FEED_EXPORT_ENCODING": "utf-8",
@@ -53,12 +56,75 @@ class UFCStatsResultsSpider(Spider):
             "ufc_scrapy.scrapy_pipelines.ufcstats_pipelines.UFCStatsCompletedBoutsPipeline": 200,
         },
         "CLOSESPIDER_ERRORCOUNT": 1,
+        "HTTPCACHE_ENABLED": True,
+        "HTTPCACHE_POLICY": "ufc_scrapy.httpcache.FreshnessPolicy",
+        "HTTPCACHE_STORAGE": "scrapy.extensions.httpcache.FilesystemCacheStorage",
+        "HTTPCACHE_DIR": HTTPCACHE_DIR,
+        "HTTPCACHE_GZIP": True,
+        "HTTPCACHE_ALWAYS_STORE": True,
+        "HTTPCACHE_FRESHNESS_RULES": [
+            (r"/statistics/events/completed", 60 * 60),
+            (r"/event-details/", None),
+            (r"/fight-details/", None),
+            (r"/fighter-details/", 7 * 24 * 60 * 60),
+        ],
     }
 
-    def __init__(self, *args, scrape_type, **kwargs):
+    def __init__(self, *args, scrape_type, parser_workers=0, **kwargs):
         super().__init__(*args, **kwargs)
-        assert scrape_type in {"all", "most_recent"}
+        assert scrape_type in {"all", "most_recent", "incremental"}
         self.scrape_type = scrape_type
+        # Bout pages are parsed in this many worker processes (0 for inline)
+        self.parser_pool = create_parser_pool(int(parser_workers))
+
+        self.seen_event_ids = set()
+        self.seen_bout_ids = set()
+        self.seen_fighter_ids = set()
+        if self.scrape_type == "incremental":
+            self.load_seen_ids()
+
+    def closed(self, reason):
+        if self.parser_pool is not None:
+            self.parser_pool.shutdown()
+
+    def load_seen_ids(self):
+        """
+        Load the events, bouts and fighters already in the database, so only
+        the missing pages are scheduled
+        """
+
+        if not os.path.exists(get_database_path("ufcstats")):
+            return
+
+        conn = connect_read_only("ufcstats")
+        try:
+            for event_id, bout_id in conn.execute(
+                """
+                SELECT 
+                  EVENT_ID, 
+                  BOUT_ID 
+                FROM 
+                  UFCSTATS_BOUTS_OVERALL;
+                """
+            ):
+                self.seen_event_ids.add(event_id)
+                self.seen_bout_ids.add(bout_id)
+            self.seen_fighter_ids.update(
+                row[0]
+                for row in conn.execute(
+                    """
+                    SELECT 
+                      FIGHTER_ID 
+                    FROM 
+                      UFCSTATS_FIGHTERS;
+                    """
+                )
+            )
+        except sqlite3.OperationalError:
+            # Tables not created yet, so everything is missing
+            pass
+        finally:
+            conn.close()
 
     def parse(self, response):
         event_urls = ["http://ufcstats.com/event-details/6420efac0578988b"]
@@ -75,6 +141,12 @@ class UFCStatsResultsSpider(Spider):
 
         if self.scrape_type == "most_recent":
             event_urls = [event_urls[-1]]
+        elif self.scrape_type == "incremental":
+            event_urls = [
+                url
+                for url in event_urls
+                if url.split("/")[-1] not in self.seen_event_ids
+            ]
 
         yield from response.follow_all(event_urls, self.parse_event)
 
@@ -122,6 +194,9 @@ class UFCStatsResultsSpider(Spider):
         for bout_ordinal, (bout_url, weight_class) in enumerate(
             zip(reversed(bout_urls), reversed(weight_classes))
         ):
+            if bout_url.split("/")[-1] in self.seen_bout_ids:
+                continue
+
             yield response.follow(
                 bout_url,
                 callback=self.parse_bout,
@@ -141,10 +216,15 @@ class UFCStatsResultsSpider(Spider):
             a.b-link.b-link_style_black::attr(href)
             """
         ).getall()
+        fighter_urls = [
+            url
+            for url in fighter_urls
+            if url.split("/")[-1] not in self.seen_fighter_ids
+        ]
 
         yield from response.follow_all(fighter_urls, self.parse_fighter)
 
-    def parse_bout(
+    async def parse_bout(
         self,
         response,
         event_id,
@@ -154,199 +234,19 @@ class UFCStatsResultsSpider(Spider):
         bout_ordinal,
         weight_class,
     ):
-        bout_overall_item = UFCStatsBoutOverallItem()
-
-        bout_overall_item["BOUT_ID"] = response.url.split("/")[-1]
-        bout_overall_item["EVENT_ID"] = event_id
-        bout_overall_item["EVENT_NAME"] = event_name
-        bout_overall_item["DATE"] = pd.to_datetime(date).strftime("%Y-%m-%d")
-        bout_overall_item["LOCATION"] = location
-        bout_overall_item["BOUT_ORDINAL"] = bout_ordinal
-        bout_overall_item["WEIGHT_CLASS"] = weight_class
-
-        fighter_urls = response.css(
-            "a.b-link.b-fight-details__person-link::attr(href)"
-        ).getall()
-        bout_overall_item["RED_FIGHTER_ID"] = fighter_urls[0].split("/")[-1]
-        bout_overall_item["BLUE_FIGHTER_ID"] = fighter_urls[1].split("/")[-1]
-
-        outcomes = response.css("i.b-fight-details__person-status::text").getall()
-        bout_overall_item["RED_OUTCOME"] = outcomes[0].strip()
-        bout_overall_item["BLUE_OUTCOME"] = outcomes[1].strip()
-
-        bout_overall_item["BOUT_LONGNAME"] = [
-            x.strip()
-            for x in response.css("i.b-fight-details__fight-title::text").getall()
-            if x.strip()
-        ][0]
-
-        bonus_img_src = response.css(
-            "i.b-fight-details__fight-title > img::attr(src)"
-        ).getall()
-        if bonus_img_src:
-            bonus_img_names = [x.split("/")[-1] for x in bonus_img_src]
-            if any(x in ["perf.png", "sub.png", "ko.png"] for x in bonus_img_names):
-                bout_overall_item["BOUT_PERF_BONUS"] = 1
-            else:
-                bout_overall_item["BOUT_PERF_BONUS"] = 0
-        else:
-            bout_overall_item["BOUT_PERF_BONUS"] = 0
-
-        method_info = response.css("i.b-fight-details__text-item_first").getall()
-        bout_overall_item["OUTCOME_METHOD"] = (
-            w3lib.html.remove_tags(method_info[0]).replace("Method:", "").strip()
-        )
-
-        details = response.css("p.b-fight-details__text").getall()
-        method_details = " ".join(
-            w3lib.html.remove_tags(details[1]).replace("Details:", "").strip().split()
-        )
-        bout_overall_item["OUTCOME_METHOD_DETAILS"] = (
-            method_details if method_details else None
-        )
-
-        time_format_info = response.css("i.b-fight-details__text-item").getall()
-        bout_overall_item["END_ROUND"] = int(
-            w3lib.html.remove_tags(time_format_info[0]).replace("Round:", "").strip()
-        )
-        end_round_time_split = (
-            w3lib.html.remove_tags(time_format_info[1])
-            .replace("Time:", "")
-            .strip()
-            .split(":")
-        )
-        bout_overall_item["END_ROUND_TIME_SECONDS"] = int(
-            end_round_time_split[0]
-        ) * 60 + int(end_round_time_split[1])
-        bout_overall_item["BOUT_TIME_FORMAT"] = (
-            w3lib.html.remove_tags(time_format_info[2])
-            .replace("Time format:", "")
-            .strip()
-        )
-        total_time_seconds, per_round_times = total_time(
-            bout_overall_item["BOUT_TIME_FORMAT"],
-            bout_overall_item["END_ROUND"],
-            bout_overall_item["END_ROUND_TIME_SECONDS"],
+        items = await run_parser(
+            self.parser_pool,
+            parse_ufcstats_bout,
+            response,
+            event_id=event_id,
+            event_name=event_name,
+            date=date,
+            location=location,
+            bout_ordinal=bout_ordinal,
+            weight_class=weight_class,
         )
-        bout_overall_item["TOTAL_TIME_SECONDS"] = total_time_seconds
-
-        assert len(per_round_times) == bout_overall_item["END_ROUND"]
-
-        tables = response.css("tbody.b-fight-details__table-body")
-        if tables:
-            stats_by_round_rows = tables[1].css("tr.b-fight-details__table-row")
-            sig_stats_by_round_rows = tables[3].css("tr.b-fight-details__table-row")
-
-            assert len(stats_by_round_rows) == len(sig_stats_by_round_rows)
-
-            for i in range(len(stats_by_round_rows)):
-                bout_round_item = UFCStatsBoutRoundItem()
-
-                bout_round_item["BOUT_ID"] = bout_overall_item["BOUT_ID"]
-                bout_round_item["ROUND"] = i + 1
-                bout_round_item["TIME_FOUGHT_SECONDS"] = per_round_times[i]
-
-                stats_for_round = [
-                    x.strip()
-                    for x in stats_by_round_rows[i]
-                    .css("p.b-fight-details__table-text::text")
-                    .getall()
-                ]
-                bout_round_item["RED_KNOCKDOWNS"] = int(stats_for_round[4])
-                bout_round_item["BLUE_KNOCKDOWNS"] = int(stats_for_round[5])
-                (
-                    bout_round_item["RED_TOTAL_STRIKES_LANDED"],
-                    bout_round_item["RED_TOTAL_STRIKES_ATTEMPTED"],
-                ) = extract_landed_attempted(stats_for_round[10])
-                (
-                    bout_round_item["BLUE_TOTAL_STRIKES_LANDED"],
-                    bout_round_item["BLUE_TOTAL_STRIKES_ATTEMPTED"],
-                ) = extract_landed_attempted(stats_for_round[11])
-                (
-                    bout_round_item["RED_TAKEDOWNS_LANDED"],
-                    bout_round_item["RED_TAKEDOWNS_ATTEMPTED"],
-                ) = extract_landed_attempted(stats_for_round[12])
-                (
-                    bout_round_item["BLUE_TAKEDOWNS_LANDED"],
-                    bout_round_item["BLUE_TAKEDOWNS_ATTEMPTED"],
-                ) = extract_landed_attempted(stats_for_round[13])
-                bout_round_item["RED_SUBMISSION_ATTEMPTS"] = int(stats_for_round[16])
-                bout_round_item["BLUE_SUBMISSION_ATTEMPTS"] = int(stats_for_round[17])
-                bout_round_item["RED_REVERSALS"] = int(stats_for_round[18])
-                bout_round_item["BLUE_REVERSALS"] = int(stats_for_round[19])
-                bout_round_item["RED_CONTROL_TIME_SECONDS"] = ctrl_time(
-                    stats_for_round[20]
-                )
-                bout_round_item["BLUE_CONTROL_TIME_SECONDS"] = ctrl_time(
-                    stats_for_round[21]
-                )
-
-                sig_stats_for_round = [
-                    x.strip()
-                    for x in sig_stats_by_round_rows[i]
-                    .css("p.b-fight-details__table-text::text")
-                    .getall()
-                ]
-                (
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_LANDED"],
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[4])
-                (
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_LANDED"],
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[5])
-                (
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_HEAD_LANDED"],
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_HEAD_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[8])
-                (
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_HEAD_LANDED"],
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_HEAD_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[9])
-                (
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_BODY_LANDED"],
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_BODY_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[10])
-                (
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_BODY_LANDED"],
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_BODY_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[11])
-                (
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_LEG_LANDED"],
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_LEG_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[12])
-                (
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_LEG_LANDED"],
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_LEG_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[13])
-                (
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_DISTANCE_LANDED"],
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_DISTANCE_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[14])
-                (
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_DISTANCE_LANDED"],
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_DISTANCE_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[15])
-                (
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_CLINCH_LANDED"],
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_CLINCH_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[16])
-                (
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_CLINCH_LANDED"],
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_CLINCH_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[17])
-                (
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_GROUND_LANDED"],
-                    bout_round_item["RED_SIGNIFICANT_STRIKES_GROUND_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[18])
-                (
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_GROUND_LANDED"],
-                    bout_round_item["BLUE_SIGNIFICANT_STRIKES_GROUND_ATTEMPTED"],
-                ) = extract_landed_attempted(sig_stats_for_round[19])
-
-                yield bout_round_item
-
-        yield bout_overall_item
+        for item in items:
+            yield item
 
     def parse_fighter(self, response):
         fighter_item = UFCStatsFighterItem()
@@ -390,11 +290,16 @@ class UFCStatsUpcomingEventSpider(Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS_PER_DOMAIN": 10,
-        "CONCURRENT_REQUESTS": 10,
+        "CONCURRENT_REQUESTS": 16,
         "DOWNLOADER_MIDDLEWARES": {
             "scrapy.downloadermiddlewares.useragent.UserAgentMiddleware": None,
             "scrapy_user_agents.middlewares.RandomUserAgentMiddleware": 400,
+            "ufc_scrapy.middlewares.ScrapersDownloaderMiddleware": 543,
+        },
+        "EXTENSIONS": {
+            "ufc_scrapy.ratecontrol.AdaptiveRateController": 500,
         },
+        "ADAPTIVE_RATE_ENABLED": True,
         "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
         "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
         "FEED_EXPORT_ENCODING": "utf-8",
@@ -0,0 +1,163 @@
+# standard library imports
+import logging
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional
+
+# third party imports
+import pandas as pd
+
+# local imports
+
+logger = logging.getLogger(__name__)
+
+STAGING_CHUNK_SIZE = 1000
+
+
+class StagingWriter:
+    """
+    Streams scraped items into a staging table in fixed-size chunks, each
+    written with executemany and committed on its own, so a pipeline holds
+    at most one chunk in memory and the tables it feeds are only touched
+    once the crawl is complete. The staging table is named after the table
+    it feeds with a _STAGING suffix and has the same columns, or the given
+    ones if it feeds no single table. Pipelines move the staged rows into
+    their tables with set-based SQL in one transaction when the spider
+    closes, either their own or the upsert and delete_matching statements
+    built here, and then drop the staging table. Rows left staged by an
+    interrupted run are not merged, since the next run scrapes the same
+    pages again and the pipelines' SQL expects each item staged once, so
+    the stale table is replaced when the pipeline is created and the number
+    of rows discarded is logged.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        columns: Optional[List[str]] = None,
+        transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        chunk_size: int = STAGING_CHUNK_SIZE,
+    ) -> None:
+        """
+        Initialize StagingWriter class
+        """
+
+        self.conn = conn
+        self.table = table
+        self.staging_table = f"{table}_STAGING"
+        self.transform = transform
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.row_count = 0
+
+        self.discard_stale_rows()
+        if columns is None:
+            self.conn.execute(
+                f"CREATE TABLE {self.staging_table} AS SELECT * FROM {table} WHERE 0;"
+            )
+            columns = [
+                row[1]
+                for row in self.conn.execute(f"PRAGMA table_info({table});").fetchall()
+            ]
+        else:
+            self.conn.execute(
+                f"CREATE TABLE {self.staging_table} ({', '.join(columns)});"
+            )
+        self.conn.commit()
+
+        self.columns = columns
+        self.insert_statement = (
+            f"INSERT INTO {self.staging_table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['?'] * len(columns))});"
+        )
+
+    def discard_stale_rows(self) -> None:
+        """
+        Drop a staging table left by an interrupted run, logging how many
+        staged rows are lost with it
+        """
+
+        stale = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;",
+            (self.staging_table,),
+        ).fetchone()
+        if stale is None:
+            return
+
+        (row_count,) = self.conn.execute(
+            f"SELECT COUNT(*) FROM {self.staging_table};"
+        ).fetchone()
+        if row_count:
+            logger.warning(
+                f"Discarding {row_count} rows left in {self.staging_table} "
+                "by an interrupted run"
+            )
+        self.conn.execute(f"DROP TABLE {self.staging_table};")
+
+    def write(self, item: Dict[str, Any]) -> None:
+        """
+        Stage an item, writing out the buffered chunk once it is full
+        """
+
+        self.buffer.append(tuple(item.get(column) for column in self.columns))
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered items to the staging table in one transaction
+        """
+
+        if not self.buffer:
+            return
+
+        rows = self.buffer
+        if self.transform is not None:
+            chunk_df = self.transform(pd.DataFrame(rows, columns=self.columns))
+            rows = chunk_df.astype(object).where(chunk_df.notna(), None).values.tolist()
+
+        self.conn.executemany(self.insert_statement, rows)
+        self.conn.commit()
+        self.row_count += len(rows)
+        self.buffer = []
+
+    def upsert(self, key_columns: List[str]) -> None:
+        """
+        Insert the staged rows into the table they feed in one statement,
+        updating the rows whose key is already there
+        """
+
+        columns = ", ".join(self.columns)
+        updates = ", ".join(
+            f"{column} = excluded.{column}"
+            for column in self.columns
+            if column not in key_columns
+        )
+
+        # WHERE true tells the parser the ON CONFLICT clause is not a join
+        self.conn.execute(
+            f"INSERT INTO {self.table} ({columns}) "
+            f"SELECT {columns} FROM {self.staging_table} WHERE true "
+            f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates};"
+        )
+
+    def delete_matching(
+        self, key_columns: List[str], table: Optional[str] = None
+    ) -> None:
+        """
+        Delete in one statement the rows of a table, by default the one fed,
+        that share their key with a staged row
+        """
+
+        keys = ", ".join(key_columns)
+        self.conn.execute(
+            f"DELETE FROM {table or self.table} WHERE ({keys}) IN "
+            f"(SELECT {keys} FROM {self.staging_table});"
+        )
+
+    def drop(self) -> None:
+        """
+        Drop the staging table, in the transaction that moved its rows
+        """
+
+        self.conn.execute(f"DROP TABLE IF EXISTS {self.staging_table};")
@@ -1,9 +1,13 @@
 # standard library imports
+import re
+import unicodedata
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
 # local imports
 
 # third party imports
+import pandas as pd
 
 
 def convert_height(height: str) -> Optional[int]:
@@ -89,6 +93,16 @@ def total_time(
         raise ValueError(f"Unknown format: {format}")
 
 
+@lru_cache(maxsize=1024)
+def format_date(date: str) -> str:
+    """
+    Converts a date string to YYYY-MM-DD, cached as every bout of an event
+    repeats the date of the event
+    """
+
+    return pd.to_datetime(date).strftime("%Y-%m-%d")
+
+
 def extract_landed_attempted(landed_attempted: str) -> Tuple[int, int]:
     """
     Extracts the landed and attempted strikes from a string
@@ -110,6 +124,145 @@ def ctrl_time(time: str) -> Optional[int]:
         return 60 * int(temp[0]) + int(temp[1])
 
 
+def fold_name(name: Optional[str]) -> Optional[str]:
+    """
+    Folds a name to lowercase ASCII letters and digits separated by single
+    spaces, dropping diacritics and apostrophes
+    """
+
+    if not isinstance(name, str):
+        return None
+
+    # Letters that do not decompose into a base letter plus a diacritic
+    special_letters = str.maketrans(
+        {"ł": "l", "ø": "o", "đ": "d", "ß": "ss", "æ": "ae", "œ": "oe", "ı": "i"}
+    )
+    decomposed = unicodedata.normalize("NFKD", name.lower().translate(special_letters))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    stripped = re.sub(r"['\u2019`]", "", stripped)
+    folded = " ".join(re.sub(r"[^a-z0-9]", " ", stripped).split())
+
+    return folded or None
+
+
+def soundex(token: str) -> str:
+    """
+    Computes the American Soundex code of a single token
+    """
+
+    codes = {}
+    for letters, digit in [
+        ("bfpv", "1"),
+        ("cgjkqsxz", "2"),
+        ("dt", "3"),
+        ("l", "4"),
+        ("mn", "5"),
+        ("r", "6"),
+    ]:
+        for letter in letters:
+            codes[letter] = digit
+
+    letters = [c for c in token if c.isalpha()]
+    if not letters:
+        return token
+
+    code = letters[0].upper()
+    previous = codes.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = codes.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+        # h and w do not separate letters with the same code, vowels do
+        if letter not in "hw":
+            previous = digit
+
+    return (code + "000")[:4]
+
+
+def sort_name_tokens(folded_name: Optional[str]) -> Optional[str]:
+    """
+    Sorts the tokens of a folded name, so that name order does not matter
+    """
+
+    if not isinstance(folded_name, str):
+        return None
+
+    return " ".join(sorted(folded_name.split()))
+
+
+def phonetic_name_key(folded_name: Optional[str]) -> Optional[str]:
+    """
+    Computes an order-insensitive phonetic key from the Soundex codes of the
+    tokens of a folded name
+    """
+
+    if not isinstance(folded_name, str):
+        return None
+
+    return " ".join(sorted(soundex(token) for token in folded_name.split()))
+
+
+def create_name_keys(fighters_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Creates the normalized name keys used to link fighters across sources
+    """
+
+    folded_names = fighters_df["FIGHTER_NAME"].map(fold_name)
+    if "FIGHTER_NICKNAME" in fighters_df.columns:
+        folded_nicknames = fighters_df["FIGHTER_NICKNAME"].map(fold_name)
+    else:
+        folded_nicknames = None
+
+    return pd.DataFrame(
+        {
+            "FIGHTER_ID": fighters_df["FIGHTER_ID"],
+            "FOLDED_NAME": folded_names,
+            "FOLDED_NICKNAME": folded_nicknames,
+            "SORTED_TOKENS": folded_names.map(sort_name_tokens),
+            "PHONETIC_KEY": folded_names.map(phonetic_name_key),
+            "DATE_OF_BIRTH": fighters_df.get("DATE_OF_BIRTH"),
+        }
+    )
+
+
+@lru_cache(maxsize=None)
+def build_batched_gql_query(query: str, batch_size: int) -> str:
+    """
+    Builds a GraphQL document repeating the root field of a single-field
+    query batch_size times, suffixing the alias and variables of the i-th
+    copy with i, so that one request fetches many objects
+    """
+
+    operation_name, variables, root_field, fragments = re.match(
+        r"\s*query (\w+)\(\s*(.*?)\s*\) \{\n(.*?)\n\}\n(.*)", query, re.S
+    ).groups()
+    variables = re.findall(r"\$(\w+): ([\w!]+)", variables)
+
+    variable_lines = []
+    root_fields = []
+    for i in range(batch_size):
+        # Unaliased root fields are aliased by their own name
+        root_field_i = re.sub(
+            r"^(\s*)(?:(\w+): )?(\w+)\(",
+            lambda m: f"{m.group(1)}{m.group(2) or m.group(3)}{i}: {m.group(3)}(",
+            root_field,
+            count=1,
+        )
+        for name, type_ in variables:
+            variable_lines.append(f"  ${name}{i}: {type_}")
+            root_field_i = re.sub(rf"\${name}\b", f"${name}{i}", root_field_i)
+        root_fields.append(root_field_i)
+
+    return (
+        f"query {operation_name}Batch(\n"
+        + "\n".join(variable_lines)
+        + "\n) {\n"
+        + "\n".join(root_fields)
+        + "\n}\n"
+        + fragments
+    )
+
+
 EVENTS_RECENT_GQL_QUERY = """
 query EventsPromotionRecentQuery(
   $promotionSlug: String